@@ -0,0 +1,135 @@
+"""
+JWT-аутентификация с кэшем пользователей в памяти процесса.
+
+Стандартный JWTAuthentication на каждый запрос читает User из БД. Здесь найденный
+пользователь кэшируется на JWT_USER_CACHE_TTL секунд; проверки is_active и (если
+включена) отзыва токена по смене пароля выполняются над закэшированной копией.
+Запись удаляется сигналами post_save/post_delete модели User — смена пароля,
+деактивация и удаление в этом процессе действуют сразу. В других процессах
+(воркерах gunicorn) и при изменении через queryset.update() запись доживает до
+истечения TTL, поэтому он короткий.
+
+Для read-only эндпоинтов можно не обращаться к БД совсем: при JWT_STATELESS_READS
+безопасные запросы (GET/HEAD/OPTIONS) к view с атрибутом stateless_auth = True при
+промахе кэша получают User(id=...) из токена без остальных полей (is_staff=False).
+Таким view нужен только id пользователя для фильтрации.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+MAX_ENTRIES = 10000
+
+_users: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_ttl() -> float:
+    return float(getattr(settings, "JWT_USER_CACHE_TTL", 30))
+
+
+def forget_user(user_id) -> None:
+    with _lock:
+        _users.pop(str(user_id), None)
+
+
+def clear_user_cache() -> None:
+    with _lock:
+        _users.clear()
+
+
+def _cached(user_id):
+    key = str(user_id)
+    with _lock:
+        entry = _users.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del _users[key]
+            return None
+        _users.move_to_end(key)
+    # Копия: view не должны менять общий экземпляр
+    return copy.copy(user)
+
+
+def _remember(user_id, user) -> None:
+    with _lock:
+        _users[str(user_id)] = (time.monotonic() + _cache_ttl(), copy.copy(user))
+        _users.move_to_end(str(user_id))
+        while len(_users) > MAX_ENTRIES:
+            _users.popitem(last=False)
+
+
+def _on_user_changed(sender, instance, **kwargs) -> None:
+    forget_user(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+_user_model = get_user_model()
+post_save.connect(_on_user_changed, sender=_user_model, dispatch_uid="jwt_user_cache_save")
+post_delete.connect(_on_user_changed, sender=_user_model, dispatch_uid="jwt_user_cache_delete")
+
+
+def _stateless_allowed(request) -> bool:
+    if not getattr(settings, "JWT_STATELESS_READS", False) or request.method not in SAFE_METHODS:
+        return False
+    view = (getattr(request, "parser_context", None) or {}).get("view")
+    return bool(getattr(view, "stateless_auth", False))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.resolve_user(validated_token, stateless=_stateless_allowed(request)), validated_token
+
+    def get_user(self, validated_token):
+        return self.resolve_user(validated_token)
+
+    def resolve_user(self, validated_token, stateless: bool = False):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if _cache_ttl() <= 0:
+            return super().get_user(validated_token)
+
+        user = _cached(user_id)
+        if user is not None:
+            # Те же проверки, что у JWTAuthentication, над закэшированной копией
+            if not user.is_active:
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+            return user
+
+        if stateless:
+            return self.user_model(**{api_settings.USER_ID_FIELD: user_id, "is_active": True})
+
+        user = super().get_user(validated_token)
+        _remember(user_id, user)
+        return user
@@ -0,0 +1,53 @@
+"""
+SQLite-бэкенд с настройкой соединения для конкурентной записи.
+
+Поддерживает OPTIONS, появившиеся в Django 5.1, на Django 4.2:
+- init_command: PRAGMA-инструкции (через ";"), выполняемые на каждом новом соединении
+  (synchronous=NORMAL, busy_timeout, mmap_size — см. config.settings; journal_mode=WAL
+  хранится в файле базы и включается миграцией);
+- transaction_mode: режим BEGIN для atomic() (DEFERRED / IMMEDIATE / EXCLUSIVE).
+
+IMMEDIATE берёт блокировку записи в начале транзакции, поэтому конкурирующий писатель
+ждёт её в пределах busy_timeout, а не получает "database is locked" сразу при попытке
+повысить уже открытую читающую транзакцию до пишущей.
+"""
+
+from __future__ import annotations
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    init_command: str | None = None
+    transaction_mode: str | None = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.init_command = kwargs.pop("init_command", None)
+        transaction_mode = kwargs.pop("transaction_mode", None)
+        if transaction_mode is not None:
+            transaction_mode = transaction_mode.upper()
+            if transaction_mode not in TRANSACTION_MODES:
+                raise ImproperlyConfigured(
+                    "settings.DATABASES: transaction_mode must be one of %s." % ", ".join(TRANSACTION_MODES)
+                )
+        self.transaction_mode = transaction_mode
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.init_command:
+            for statement in self.init_command.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
@@ -0,0 +1,65 @@
+"""
+Конфигурация gunicorn для продакшн-запуска (вместо manage.py runserver).
+
+    gunicorn -c backend/config/gunicorn.conf.py
+
+Профиль выбирается SERVER_PROFILE:
+- "wsgi" (по умолчанию): config.wsgi, воркеры gthread — WEB_CONCURRENCY процессов
+  по GUNICORN_THREADS потоков;
+- "asgi": config.asgi под uvicorn-воркерами (один event loop на процесс) и async-view
+  для сводки и списков (ASYNC_VIEWS=0 — синхронные DRF-view под ASGI).
+
+preload_app загружает Django в мастер-процессе до fork, так что код и импортированные
+модули разделяются воркерами (copy-on-write). Плавная перезагрузка без потери запросов:
+`kill -HUP <pid мастера>` — новые воркеры стартуют, старые дообслуживают запросы
+в пределах graceful_timeout. Статику отдаёт WhiteNoise (см. config.settings).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from pathlib import Path
+
+
+profile = os.environ.get("SERVER_PROFILE", "wsgi")
+if profile not in ("wsgi", "asgi"):
+    raise RuntimeError(f"SERVER_PROFILE must be 'wsgi' or 'asgi', got {profile!r}")
+
+chdir = str(Path(__file__).resolve().parent.parent)
+wsgi_app = "config.asgi:application" if profile == "asgi" else "config.wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+if profile == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
+    # Под ASGI read-эндпоинты дашборда обслуживают async-view (finance.async_views)
+    os.environ.setdefault("ASYNC_VIEWS", "1")
+else:
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# Периодический перезапуск воркеров ограничивает рост памяти; jitter — чтобы не все сразу
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-") or None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
+
+# Кэш в памяти процесса у каждого воркера свой: инвалидация отчётов (finance.cache)
+# в одном воркере не видна другим. Без явного CACHE_URL используем общий файловый кэш.
+if workers > 1:
+    os.environ.setdefault("CACHE_URL", "filecache:///tmp/budget-cache")
+
+
+def post_fork(server, worker):
+    # Соединения с БД, открытые в мастере при preload, не должны наследоваться воркерами
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        conn.close()
@@ -0,0 +1,290 @@
+"""
+Метрики API по каждому view: длительность запроса, число SQL-запросов, время в БД,
+время сериализации и размер ответа.
+
+MetricsMiddleware (подключается при METRICS_ENABLED=1) копит значения в гистограммах процесса; MetricsView отдаёт их
+в текстовом формате Prometheus (/api/metrics/, только администраторам). Гистограммы
+живут в памяти процесса: под gunicorn каждый scrape видит данные того воркера,
+который обработал запрос, и счётчики обнуляются при перезапуске воркера.
+
+Для сотрудников (is_staff) есть разбор отдельного запроса: ?profile=1 — cProfile
+и список SQL-запросов, ?profile=sql — только SQL. Вместо ответа view возвращается
+JSON с разбором (сам view при этом выполняется как обычно).
+
+SQL-запросы считаются обёрткой execute_wrapper, которая ставится на каждое
+соединение (сигнал connection_created), а статистика запроса хранится в ContextVar —
+поэтому учитываются и запросы async-view, выполняемые в потоках sync_to_async.
+Сериализацию меряют сами списочные view и FastJSONRenderer (serialization_timer);
+у остальных view эта гистограмма не заполняется.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, JsonResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+
+PROFILE_MODES = {"1": "cprofile", "sql": "sql"}
+PROFILE_TOP = 40
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SERIALIZER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    # None — view не замерял сериализацию
+    serializer_time: float | None = None
+    serializer_depth: int = 0
+    # Список (sql, секунды) — только в режиме ?profile
+    trace: list | None = None
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("finance_request_stats", default=None)
+
+
+class Histogram:
+    """Гистограмма Prometheus с метками (view, method), накапливаемая в процессе."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [счётчики по корзинам..., сумма, количество]
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for (view, method), series in items:
+            base = f'view="{_escape(view)}",method="{method}"'
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_DURATION = Histogram(
+    "finance_request_duration_seconds", "Request duration including middleware.", DURATION_BUCKETS
+)
+DB_QUERIES = Histogram("finance_db_queries", "SQL queries per request.", QUERY_COUNT_BUCKETS)
+DB_DURATION = Histogram("finance_db_duration_seconds", "Time spent in SQL queries per request.", DURATION_BUCKETS)
+SERIALIZER_DURATION = Histogram(
+    "finance_serializer_duration_seconds",
+    "Time spent building and rendering list payloads per request (includes queries it triggers).",
+    SERIALIZER_BUCKETS,
+)
+RESPONSE_SIZE = Histogram("finance_response_size_bytes", "Response body size (non-streaming).", SIZE_BUCKETS)
+
+HISTOGRAMS = (REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZER_DURATION, RESPONSE_SIZE)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    return "\n".join(lines) + "\n"
+
+
+# --- Сбор данных -------------------------------------------------------------------------
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_time += elapsed
+        if stats.trace is not None:
+            stats.trace.append((sql, elapsed))
+
+
+def _install_query_wrapper(sender=None, connection=None, **kwargs) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def serialization_timer():
+    """
+    Засчитывает время блока в сериализацию текущего запроса. Вне измеряемого
+    запроса (метрики выключены, management-команда) ничего не делает.
+    """
+    stats = _current.get()
+    # Вложенный замер (рендер внутри уже измеряемого блока) не считаем повторно
+    if stats is None or stats.serializer_depth:
+        yield
+        return
+    stats.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_depth -= 1
+        stats.serializer_time = (stats.serializer_time or 0.0) + time.perf_counter() - started
+
+
+def install() -> None:
+    connection_created.connect(_install_query_wrapper, dispatch_uid="finance_metrics_queries")
+    for connection in connections.all(initialized_only=True):
+        _install_query_wrapper(connection=connection)
+
+
+# --- Middleware --------------------------------------------------------------------------
+
+
+def _is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+    # API аутентифицируется JWT внутри DRF-view — проверяем токен сами
+    from rest_framework.exceptions import AuthenticationFailed
+    from config.authentication import CachedJWTAuthentication
+
+    try:
+        auth = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return auth is not None and auth[0].is_staff
+
+
+def _view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        mode = PROFILE_MODES.get(request.GET.get("profile", ""))
+        if mode and not _is_staff(request):
+            mode = None
+        stats = RequestStats(trace=[] if mode else None)
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started, profiler)
+
+    async def __acall__(self, request):
+        mode = PROFILE_MODES.get(request.GET.get("profile", ""))
+        if mode and not await sync_to_async(_is_staff)(request):
+            mode = None
+        stats = RequestStats(trace=[] if mode else None)
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started, profiler)
+
+    def finish(self, request, response, stats: RequestStats, duration: float, profiler) -> HttpResponse:
+        labels = (_view_label(request), request.method)
+        size = None if response.streaming else len(response.content)
+        REQUEST_DURATION.observe(labels, duration)
+        DB_QUERIES.observe(labels, stats.queries)
+        DB_DURATION.observe(labels, stats.db_time)
+        if stats.serializer_time is not None:
+            SERIALIZER_DURATION.observe(labels, stats.serializer_time)
+        if size is not None:
+            RESPONSE_SIZE.observe(labels, size)
+
+        if stats.trace is None:
+            return response
+        report = {
+            "path": request.get_full_path(),
+            "view": labels[0],
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "db_queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 3),
+            "serializer_ms": None if stats.serializer_time is None else round(stats.serializer_time * 1000, 3),
+            "response_bytes": size,
+            "queries": [{"sql": sql, "ms": round(elapsed * 1000, 3)} for sql, elapsed in stats.trace],
+        }
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            report["profile"] = out.getvalue()
+        return JsonResponse(report, json_dumps_params={"ensure_ascii": False})
+
+
+class MetricsView(APIView):
+    """Гистограммы процесса в текстовом формате Prometheus (только администраторам)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from config.metrics import MetricsView
 from finance.views import (
     CategoryViewSet,
     TransactionViewSet,
     SummaryView,
+    DashboardView,
+    AnalyticsRangeView,
+    ForecastView,
+    CacheStatsView,
+    LimitStatusView,
     ResetCategoriesView,
     ResetTransactionsView,
     GoalViewSet,
+    JobViewSet,
     SettingsView,
     RegisterView,
     ForgotPasswordView,
@@ -21,11 +29,30 @@ router = DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="categories")
 router.register(r"transactions", TransactionViewSet, basename="transactions")
 router.register(r"goals", GoalViewSet, basename="goals")
+router.register(r"jobs", JobViewSet, basename="jobs")
+
+# Async-версии списков и сводки перекрывают синхронные маршруты (POST передают им сами)
+async_urlpatterns = []
+if settings.FINANCE_ASYNC_VIEWS:
+    from finance.async_views import AsyncCategoryListView, AsyncSummaryView, AsyncTransactionListView
+
+    async_urlpatterns = [
+        path("api/categories/", AsyncCategoryListView.as_view(), name="categories-list-async"),
+        path("api/transactions/", AsyncTransactionListView.as_view(), name="transactions-list-async"),
+        path("api/summary/", AsyncSummaryView.as_view(), name="summary-async"),
+    ]
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    *async_urlpatterns,
     path("api/", include(router.urls)),
     path("api/summary/", SummaryView.as_view(), name="summary"),
+    path("api/dashboard/", DashboardView.as_view(), name="dashboard"),
+    path("api/analytics/range/", AnalyticsRangeView.as_view(), name="analytics-range"),
+    path("api/forecast/", ForecastView.as_view(), name="forecast"),
+    path("api/cache/stats/", CacheStatsView.as_view(), name="cache_stats"),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+    path("api/limits/status/", LimitStatusView.as_view(), name="limit_status"),
     path("api/settings/", SettingsView.as_view(), name="settings"),
     path("api/reset/transactions/", ResetTransactionsView.as_view(), name="reset_transactions"),
     path("api/reset/categories/", ResetCategoriesView.as_view(), name="reset_categories"),
@@ -1,7 +1,10 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
 
-from finance.models import Category, Transaction
-from finance.models_settings_goals import Goal, UserSettings
+from finance.deletion import delete_user
+from finance.models import Category, DailyRollup, Job, Transaction
+from finance.models_settings_goals import Goal, GoalDeposit, UserSettings
 
 
 @admin.register(Category)
@@ -34,9 +37,42 @@ class GoalAdmin(admin.ModelAdmin):
     list_filter = ("due_date",)
 
 
+@admin.register(GoalDeposit)
+class GoalDepositAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "goal", "amount", "balance_after", "created_at")
+    search_fields = ("goal__name", "user__username")
+
+
 @admin.register(UserSettings)
 class UserSettingsAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "theme", "period_start_day", "notify_limit_exceeded", "notify_monthly_email", "updated_at")
     search_fields = ("user__username",)
 
 
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "date", "category", "is_income", "amount", "reserved_amount", "tx_count")
+    list_filter = ("is_income", "date")
+    search_fields = ("user__username", "category__name")
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "kind", "status", "progress_done", "progress_total", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    search_fields = ("user__username",)
+
+
+# Удаление пользователя из админки — через порционный движок finance.deletion,
+# а не через каскад Collector, который загружает в память все его операции
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    def delete_model(self, request, obj):
+        delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            delete_user(user)
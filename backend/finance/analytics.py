@@ -0,0 +1,324 @@
+"""
+Аналитика за диапазон периодов: доходы/расходы/баланс и ряды по категориям
+по дням, неделям или бюджетным месяцам (с учётом дня начала периода), с
+необязательным наложением того же диапазона год назад.
+
+Все данные — один сгруппированный запрос к DailyRollup (день × категория) по
+текущему диапазону и, при compare=previous_year, по диапазону год назад; строки
+раскладываются по периодам за один проход. Доходы считаются как в сводке
+(finance.summary): доходы-резервы — только доступной долей (её тот же запрос
+отдаёт строками исходных резервов), суммы — в целых копейках.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import MAXYEAR, MINYEAR, date, timedelta
+from decimal import Decimal
+
+from django.db import connections
+
+from finance.models import Category, DailyRollup, Transaction
+from finance.periods import MonthRange, month_to_range, period_to_range
+from finance.summary import CENTS, RESERVED_ROOT_SQL, reserve_share
+
+
+GRANULARITIES = ("day", "week", "month")
+COMPARE_MODES = ("previous_year",)
+MAX_PERIODS = 1000
+# Конец периода декабря — в следующем году, previous_year сдвигает диапазон на год назад
+MAX_YEAR = MAXYEAR - 1
+
+# Последняя часть — исходные доходы-резервы (name = NULL, последний столбец — reserve_months)
+_ANALYTICS_SQL = """
+SELECT r.date, c.{name}, r.is_income,
+       CAST(SUM(ROUND(r.amount * {cents})) AS BIGINT),
+       CAST(SUM(ROUND(r.reserved_amount * {cents})) AS BIGINT),
+       NULL
+FROM {rollups} r JOIN {categories} c ON c.id = r.category_id
+WHERE r.user_id = %s AND ({ranges_r})
+GROUP BY r.date, c.{name}, r.is_income
+UNION ALL
+SELECT t.date, NULL, NULL, CAST(ROUND(t.amount * {cents}) AS BIGINT), 0, t.reserve_months
+FROM {transactions} t
+WHERE t.user_id = %s AND {roots} AND ({ranges_t})
+"""
+
+
+class AnalyticsError(ValueError):
+    """Некорректные параметры диапазона (view превращает в 400)."""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+
+
+@dataclass(frozen=True)
+class Bucket:
+    label: str
+    range: MonthRange
+
+
+def _parse_month(value: str | None, field: str) -> tuple[int, int]:
+    try:
+        year_s, month_s = (value or "").split("-", 1)
+        year, month = int(year_s), int(month_s)
+        date(year, month, 1)
+    except ValueError:
+        raise AnalyticsError(field, "Ожидается месяц в формате YYYY-MM.")
+    return year, month
+
+
+def _months(start: tuple[int, int], end: tuple[int, int]):
+    y, m = start
+    while (y, m) <= end:
+        yield y, m
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def _shift_year(d: date, years: int) -> date:
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:
+        # 29 февраля -> 28 февраля
+        return d.replace(year=d.year + years, day=28)
+
+
+def _month_range(month: str, start_day: int | None) -> MonthRange:
+    return period_to_range(month, start_day) if start_day else month_to_range(month)
+
+
+def month_buckets(start: tuple[int, int], end: tuple[int, int], start_day: int | None) -> list[Bucket]:
+    buckets = []
+    for y, m in _months(start, end):
+        month = f"{y:04d}-{m:02d}"
+        buckets.append(Bucket(month, _month_range(month, start_day)))
+    return buckets
+
+
+def month_span(start: tuple[int, int], end: tuple[int, int], start_day: int | None) -> MonthRange:
+    """Диапазон дат от начала месяца start до конца месяца end (как у month_buckets)."""
+    first = _month_range(f"{start[0]:04d}-{start[1]:02d}", start_day)
+    last = _month_range(f"{end[0]:04d}-{end[1]:02d}", start_day)
+    return MonthRange(first.start, last.end)
+
+
+def period_count(start: tuple[int, int], end: tuple[int, int], span: MonthRange, granularity: str) -> int:
+    """Число периодов диапазона без построения списка (для проверки MAX_PERIODS)."""
+    if granularity == "month":
+        return (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+    days = (span.end - span.start).days
+    if granularity == "day":
+        return days
+    # Недели с понедельника, крайние обрезаны по span — как в split_buckets
+    return -(-(days + span.start.weekday()) // 7)
+
+
+def split_buckets(span: MonthRange, granularity: str) -> list[Bucket]:
+    """Дни или недели (ISO, с понедельника; крайние недели обрезаются по span)."""
+    buckets = []
+    d = span.start
+    while d < span.end:
+        if granularity == "day":
+            nxt = d + timedelta(days=1)
+            label = d.isoformat()
+        else:
+            nxt = min(span.end, d + timedelta(days=7 - d.weekday()))
+            iso = d.isocalendar()
+            label = f"{iso[0]}-W{iso[1]:02d}"
+        buckets.append(Bucket(label, MonthRange(d, nxt)))
+        d = nxt
+    return buckets
+
+
+def previous_year_buckets(buckets: list[Bucket], granularity: str, start_day: int | None) -> list[Bucket]:
+    """
+    Те же периоды год назад: месяцы — тот же бюджетный месяц прошлого года,
+    дни и недели — на 52 недели раньше (совпадают дни недели).
+    """
+    if granularity == "month":
+        result = []
+        for b in buckets:
+            y, m = _parse_month(b.label, "from")
+            month = f"{y - 1:04d}-{m:02d}"
+            result.append(Bucket(month, _month_range(month, start_day)))
+        return result
+    shift = timedelta(weeks=52)
+    return [
+        Bucket(
+            (b.range.start - shift).isoformat()
+            if granularity == "day"
+            else "{}-W{:02d}".format(*(b.range.start - shift).isocalendar()[:2]),
+            MonthRange(b.range.start - shift, b.range.end - shift),
+        )
+        for b in buckets
+    ]
+
+
+class _Series:
+    """Накопитель сумм по периодам (целые копейки; доли резервов — Decimal)."""
+
+    def __init__(self, buckets: list[Bucket]):
+        self.buckets = buckets
+        self.starts = [b.range.start for b in buckets]
+        n = len(buckets)
+        self.income = [0] * n  # копейки, доходы целиком
+        self.reserved = [0] * n  # копейки, исходные доходы-резервы
+        self.shares = [Decimal(0)] * n  # доступные доли резервов
+        self.expense = [0] * n
+        self.categories: dict[bool, dict[str, list[int]]] = {True: {}, False: {}}
+
+    def index(self, d: date) -> int | None:
+        i = bisect_right(self.starts, d) - 1
+        if i >= 0 and d < self.buckets[i].range.end:
+            return i
+        return None
+
+    def add(self, i: int, name: str, is_income: bool, amount: int, reserved: int) -> None:
+        if is_income:
+            self.income[i] += amount
+            self.reserved[i] += reserved
+        else:
+            self.expense[i] += amount
+        series = self.categories[is_income].setdefault(name, [0] * len(self.buckets))
+        series[i] += amount
+
+    def add_reserve(self, i: int, amount: int, months: int | None) -> None:
+        self.shares[i] += reserve_share(Decimal(amount).scaleb(-2), months)
+
+    def periods(self) -> list[dict]:
+        result = []
+        for i, b in enumerate(self.buckets):
+            income = Decimal(self.income[i] - self.reserved[i]).scaleb(-2) + self.shares[i]
+            expense = Decimal(self.expense[i]).scaleb(-2)
+            result.append(
+                {
+                    "label": b.label,
+                    "start": b.range.start.isoformat(),
+                    "end": b.range.end.isoformat(),
+                    "income": float(income),
+                    "expense": self.expense[i] / CENTS,
+                    "balance": float(income - expense),
+                }
+            )
+        return result
+
+    def category_series(self) -> dict[str, dict[str, list[float]]]:
+        def convert(series: dict[str, list[int]]) -> dict[str, list[float]]:
+            ordered = sorted(series.items(), key=lambda item: (-sum(item[1]), item[0]))
+            return {name: [v / CENTS for v in values] for name, values in ordered}
+
+        return {"income": convert(self.categories[True]), "expense": convert(self.categories[False])}
+
+
+def analytics_query(user, spans: list[MonthRange], using: str = "default") -> tuple[str, list]:
+    """SQL и параметры запроса по диапазонам spans (отдельно — для EXPLAIN в check_query_plans)."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    sql = _ANALYTICS_SQL.format(
+        name=qn("name"),
+        cents=CENTS,
+        roots=RESERVED_ROOT_SQL,
+        rollups=qn(DailyRollup._meta.db_table),
+        transactions=qn(Transaction._meta.db_table),
+        categories=qn(Category._meta.db_table),
+        ranges_r=" OR ".join(["(r.date >= %s AND r.date < %s)"] * len(spans)),
+        ranges_t=" OR ".join(["(t.date >= %s AND t.date < %s)"] * len(spans)),
+    )
+    params = [user.id]
+    for span in spans:
+        params += [connection.ops.adapt_datefield_value(span.start), connection.ops.adapt_datefield_value(span.end)]
+    return sql, params * 2
+
+
+def _fetch_rows(user, spans: list[MonthRange], using: str = "default") -> list[tuple]:
+    sql, params = analytics_query(user, spans, using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def parse_params(params) -> dict:
+    """Проверяет from/to/start_day/granularity/compare; ошибки — AnalyticsError."""
+    start = _parse_month(params.get("from"), "from")
+    end = _parse_month(params.get("to") or params.get("from"), "to")
+    if end < start:
+        raise AnalyticsError("to", "Конец диапазона раньше начала.")
+
+    start_day = params.get("start_day")
+    if start_day:
+        try:
+            start_day = int(start_day)
+        except ValueError:
+            raise AnalyticsError("start_day", "Ожидается число от 1 до 31.")
+        if not 1 <= start_day <= 31:
+            raise AnalyticsError("start_day", "Ожидается число от 1 до 31.")
+    else:
+        start_day = None
+
+    granularity = params.get("granularity") or "month"
+    if granularity not in GRANULARITIES:
+        raise AnalyticsError("granularity", f"Допустимые значения: {', '.join(GRANULARITIES)}.")
+    compare = params.get("compare") or None
+    if compare is not None and compare not in COMPARE_MODES:
+        raise AnalyticsError("compare", f"Допустимые значения: {', '.join(COMPARE_MODES)}.")
+
+    min_year = MINYEAR + 1 if compare == "previous_year" else MINYEAR
+    for field, (year, _) in (("from", start), ("to", end)):
+        if not min_year <= year <= MAX_YEAR:
+            raise AnalyticsError(field, f"Год должен быть от {min_year:04d} до {MAX_YEAR}.")
+    return {"start": start, "end": end, "start_day": start_day, "granularity": granularity, "compare": compare}
+
+
+def range_analytics(user, params) -> dict:
+    """Данные /api/analytics/range/ (JSON-совместимый dict)."""
+    opts = parse_params(params)
+    granularity = opts["granularity"]
+    span = month_span(opts["start"], opts["end"], opts["start_day"])
+    count = period_count(opts["start"], opts["end"], span, granularity)
+    if count > MAX_PERIODS:
+        raise AnalyticsError("granularity", f"Слишком много периодов ({count}), максимум {MAX_PERIODS}.")
+    if granularity == "month":
+        buckets = month_buckets(opts["start"], opts["end"], opts["start_day"])
+    else:
+        buckets = split_buckets(span, granularity)
+
+    current = _Series(buckets)
+    series = [current]
+    spans = [span]
+    previous = None
+    if opts["compare"] == "previous_year":
+        previous = _Series(previous_year_buckets(buckets, granularity, opts["start_day"]))
+        series.append(previous)
+        spans.append(MonthRange(previous.buckets[0].range.start, previous.buckets[-1].range.end))
+
+    for day, name, is_income, amount, reserved, months in _fetch_rows(user, spans):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        # Диапазоны могут пересекаться (больше года) — строка учитывается в обоих
+        for s in series:
+            i = s.index(day)
+            if i is None:
+                continue
+            if name is None:
+                s.add_reserve(i, amount, months)
+            else:
+                s.add(i, name, bool(is_income), amount, reserved)
+
+    result = {
+        "granularity": granularity,
+        "start": span.start.isoformat(),
+        "end": span.end.isoformat(),
+        "periods": current.periods(),
+        "categories": current.category_series(),
+    }
+    if previous is not None:
+        result["previous_year"] = {
+            "start": spans[1].start.isoformat(),
+            "end": spans[1].end.isoformat(),
+            "periods": previous.periods(),
+            "categories": previous.category_series(),
+        }
+    return result
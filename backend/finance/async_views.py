@@ -0,0 +1,145 @@
+"""
+Async-версии read-эндпоинтов главного экрана: сводка, список операций, список категорий.
+
+DRF 3.15 не поддерживает async-view, поэтому это обычные Django async View поверх
+async ORM: запрос не занимает поток воркера, пока ждёт БД, и один ASGI-процесс
+обслуживает параллельные запросы дашборда. Сводка — один запрос (finance.summary),
+строки которого читаются через async ORM.
+
+Поведение совпадает с синхронными view: JWT-аутентификация, ETag/304 по версии данных
+(finance.conditional), кэш сводки (finance.cache), keyset-пагинация и ?fields=.
+Остальные методы (POST и т.п.) передаются синхронному DRF-view (sync_view).
+Подключаются в config.urls при FINANCE_ASYNC_VIEWS (env ASYNC_VIEWS).
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from config.authentication import CachedJWTAuthentication
+from config.metrics import serialization_timer
+from finance import cache as summary_cache
+from finance.conditional import adata_version, make_etag
+from finance.fast_serializers import atransaction_page
+from finance.models import Category
+from finance.pagination import TransactionCursorPagination
+from finance.periods import resolve_period
+from finance.serializers import CategorySerializer
+from finance.summary import compute_summary
+from finance.views import (
+    CategoryViewSet,
+    SummaryView,
+    TransactionViewSet,
+    transaction_list_queryset,
+    transaction_projection,
+)
+
+
+_jwt = CachedJWTAuthentication()
+
+
+def json_response(data, status: int = 200) -> JsonResponse:
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+class AsyncAPIView(View):
+    """Основа async read-view: JWT, ETag/304, JSON; прочие методы — в sync_view."""
+
+    sync_view: Callable | None = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Как у DRF: аутентификация по токену, CSRF-проверка сессий не нужна
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Подкласс определяет async get(request, user); без него GET обрабатывается как прочие методы
+        if request.method not in ("GET", "HEAD") or not hasattr(self, "get"):
+            if self.sync_view is None:
+                # Django отдаёт корутину, только если у view есть async-обработчики
+                response = self.http_method_not_allowed(request, *args, **kwargs)
+                return await response if inspect.isawaitable(response) else response
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        try:
+            auth = await sync_to_async(_jwt.authenticate)(request)
+        except APIException as e:
+            return self.unauthorized(e.detail)
+        if auth is None:
+            return self.unauthorized("Учетные данные не были предоставлены.")
+        user = auth[0]
+
+        etag = make_etag(user.id, await adata_version(user), request.get_full_path())
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        try:
+            response = await self.get(request, user)
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, (dict, list)) else {"detail": e.detail}
+            return json_response(detail, status=e.status_code)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def unauthorized(self, detail) -> JsonResponse:
+        response = json_response(detail if isinstance(detail, dict) else {"detail": detail}, status=401)
+        response["WWW-Authenticate"] = _jwt.authenticate_header(request=None)
+        return response
+
+
+class AsyncSummaryView(AsyncAPIView):
+    sync_view = staticmethod(SummaryView.as_view())
+
+    @staticmethod
+    def cache_lookup(user_id: int, params) -> tuple[str, dict | None]:
+        key = summary_cache.summary_key(user_id, params.get("month"), params.get("start_day"), resolve_period(params))
+        data = cache.get(key)
+        summary_cache.record("summary", hit=data is not None)
+        return key, data
+
+    async def get(self, request, user):
+        params = request.GET
+        key, data = await sync_to_async(self.cache_lookup)(user.id, params)
+        if data is None:
+            data = await sync_to_async(compute_summary)(user, params)
+            await sync_to_async(cache.set)(key, data, summary_cache.summary_timeout())
+        return json_response(data)
+
+
+class AsyncTransactionListView(AsyncAPIView):
+    sync_view = staticmethod(TransactionViewSet.as_view({"get": "list", "post": "create"}))
+
+    async def get(self, request, user):
+        # DRF Request — ради query_params/build_absolute_uri в пагинаторе
+        drf_request = Request(request)
+        params = drf_request.query_params
+        fields = transaction_projection(params)
+        paginator = TransactionCursorPagination()
+        with serialization_timer():
+            data = await atransaction_page(
+                paginator, transaction_list_queryset(user, params, fields), drf_request, fields
+            )
+        return json_response({"next": paginator.get_next_link(), "results": data})
+
+
+class AsyncCategoryListView(AsyncAPIView):
+    sync_view = staticmethod(CategoryViewSet.as_view({"get": "list", "post": "create"}))
+
+    async def get(self, request, user):
+        categories = [c async for c in Category.objects.filter(user=user).order_by("type", "name")]
+        return json_response(CategorySerializer(categories, many=True).data)
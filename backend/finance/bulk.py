@@ -0,0 +1,147 @@
+"""
+Пакетные create/update/delete операций одним запросом.
+
+Все элементы проверяются вместе (категории и изменяемые операции загружаются одним
+запросом на пакет), затем применяются в одном atomic() через bulk_create / bulk_update /
+DELETE ... WHERE id IN. Побочные эффекты записи (распределение резервов, пересчёт
+агрегатов, инвалидация кэша и ETag) выполняются один раз на пакет, а не на строку.
+Пакет применяется целиком или не применяется вовсе.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction as db_transaction
+
+from finance.models import Category, Transaction
+from finance.reserves import distribute_reserves, rebalance_reserves
+from finance.rollups import deferred_rollups, refresh_rollups
+from finance.serializers import TransactionSerializer
+
+
+OPS = ("create", "update", "delete")
+
+
+@dataclass
+class BulkResult:
+    ok: bool = True
+    results: list[dict] = field(default_factory=list)
+
+
+def _error(index: int, op, errors) -> dict:
+    return {"index": index, "op": op, "status": "error", "errors": errors}
+
+
+def apply_bulk_operations(user, operations: list, request=None) -> BulkResult:
+    """
+    operations: [{"op": "create", "data": {...}},
+                 {"op": "update", "id": 1, "data": {...}},
+                 {"op": "delete", "id": 2}, ...]
+    """
+    result = BulkResult()
+
+    ids = set()
+    for item in operations:
+        if isinstance(item, dict) and item.get("op") in ("update", "delete"):
+            try:
+                ids.add(int(item.get("id")))
+            except (TypeError, ValueError):
+                pass
+
+    # Один запрос на категории и один — на изменяемые/удаляемые операции
+    categories = {c.id: c for c in Category.objects.filter(user=user)}
+    instances = {tx.id: tx for tx in Transaction.objects.filter(user=user, id__in=ids)}
+    context = {"request": request, "categories": categories}
+
+    planned = []  # (index, op, serializer | instance)
+    seen_ids: set[int] = set()
+    for index, item in enumerate(operations):
+        op = item.get("op") if isinstance(item, dict) else None
+        if op not in OPS:
+            result.results.append(_error(index, op, {"op": "Ожидалось create, update или delete."}))
+            continue
+
+        instance = None
+        if op in ("update", "delete"):
+            try:
+                tx_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                result.results.append(_error(index, op, {"id": "Укажите id операции."}))
+                continue
+            instance = instances.get(tx_id)
+            if instance is None:
+                result.results.append(_error(index, op, {"id": "Операция не найдена."}))
+                continue
+            if tx_id in seen_ids:
+                result.results.append(_error(index, op, {"id": "Операция уже изменяется в этом пакете."}))
+                continue
+            seen_ids.add(tx_id)
+
+        if op == "delete":
+            planned.append((index, op, instance))
+            result.results.append({"index": index, "op": op, "status": "ok", "id": instance.id})
+            continue
+
+        ser = TransactionSerializer(
+            instance, data=item.get("data") or {}, partial=op == "update", context=context
+        )
+        if not ser.is_valid():
+            result.results.append(_error(index, op, ser.errors))
+            continue
+        planned.append((index, op, ser))
+        result.results.append({"index": index, "op": op, "status": "ok"})
+
+    result.ok = all(r["status"] == "ok" for r in result.results)
+    if not result.ok:
+        for r in result.results:
+            if r["status"] == "ok":
+                r["status"] = "not_applied"
+        return result
+
+    to_create: list[Transaction] = []
+    to_update: list[Transaction] = []
+    update_fields: set[str] = set()
+    to_delete: list[int] = []
+    touched: dict[int, set] = defaultdict(set)
+    by_index: dict[int, Transaction] = {}
+
+    for index, op, payload in planned:
+        if op == "create":
+            tx = Transaction(user=user, **payload.validated_data)
+            to_create.append(tx)
+        elif op == "update":
+            tx = payload.instance
+            touched[tx.user_id].add(tx.date)  # старая дата
+            for name, value in payload.validated_data.items():
+                setattr(tx, name, value)
+                update_fields.add(name)
+            to_update.append(tx)
+        else:
+            tx = payload
+            to_delete.append(tx.id)
+        touched[tx.user_id].add(tx.date)
+        by_index[index] = tx
+
+    with db_transaction.atomic(), deferred_rollups():
+        Transaction.objects.bulk_create(to_create)
+        if to_update and update_fields:
+            Transaction.objects.bulk_update(to_update, sorted(update_fields))
+        if to_delete:
+            # Каскадно удаляются и доли резервов; их дни пересчитаются через сигналы
+            Transaction.objects.filter(user=user, id__in=to_delete).delete()
+
+        # Резервы: новые распределяются, у изменённых доли перебалансируются — по разу на пакет
+        deleted = set(to_delete)
+        distribute_reserves(to_create)
+        rebalance_reserves(tx for tx in to_update if tx.id not in deleted)
+        for user_id, dates in touched.items():
+            refresh_rollups(user_id, dates)
+
+    for r in result.results:
+        tx = by_index[r["index"]]
+        if r["op"] != "delete":
+            r["data"] = TransactionSerializer(tx, context=context).data
+            r["id"] = tx.id
+    return result
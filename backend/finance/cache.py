@@ -0,0 +1,138 @@
+"""
+Кэш ответов отчётов с точечной инвалидацией по периодам.
+
+Ключ записи включает "поколения" (generation tokens) календарных месяцев, которые
+покрывает период отчёта, а также поколение пользователя (epoch) и глобальное поколение.
+Изменение операций за день D меняет токен только месяца D, поэтому все закэшированные
+отчёты, затрагивающие этот месяц (в т.ч. периоды с custom start_day), перестают
+находиться, а остальные продолжают отдаваться из кэша. Ключи не перебираются и не
+удаляются — устаревшие записи вытесняются по таймауту.
+
+Работает на любом бэкенде Django cache framework (locmem/file по умолчанию).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+from finance.periods import as_date
+
+
+PREFIX = "finance"
+GLOBAL_GEN = f"{PREFIX}:gen:global"
+
+
+def _epoch_gen(user_id: int) -> str:
+    # Меняется при изменениях, затрагивающих все периоды пользователя (категории, пересборка)
+    return f"{PREFIX}:gen:{user_id}:epoch"
+
+
+def _data_gen(user_id: int) -> str:
+    # Меняется при любом изменении операций пользователя (для отчёта за всю историю)
+    return f"{PREFIX}:gen:{user_id}:data"
+
+
+def _month_gen(user_id: int, year: int, month: int) -> str:
+    return f"{PREFIX}:gen:{user_id}:{year:04d}-{month:02d}"
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def months_between(start: date, end: date) -> list[tuple[int, int]]:
+    """Календарные месяцы (год, месяц), пересекающиеся с [start, end)."""
+    result = []
+    y, m = start.year, start.month
+    while date(y, m, 1) < end:
+        result.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return result
+
+
+def generations(user_id: int, start: date | None = None, end: date | None = None) -> str:
+    """
+    Текущие токены поколений данных пользователя в диапазоне [start, end)
+    (без диапазона — за всю историю), склеенные в одну строку для ключа кэша.
+    """
+    keys = [GLOBAL_GEN, _epoch_gen(user_id)]
+    if start is not None and end is not None:
+        keys += [_month_gen(user_id, y, m) for y, m in months_between(start, end)]
+    else:
+        keys.append(_data_gen(user_id))
+
+    found = cache.get_many(keys)
+    missing = {k: _new_token() for k in keys if k not in found}
+    if missing:
+        # Вытесненное поколение заменяем новым токеном, чтобы не совпасть со старыми записями
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return ".".join(found[k] for k in keys)
+
+
+def _bump(keys: list[str]) -> None:
+    def apply():
+        cache.set_many({k: _new_token() for k in keys}, timeout=None)
+
+    # После коммита: иначе параллельный запрос может закэшировать ещё незафиксированные данные
+    db_transaction.on_commit(apply)
+
+
+def invalidate_dates(user_id: int, dates: Iterable[date]) -> None:
+    """Инвалидирует отчёты пользователя, затрагивающие месяцы указанных дней."""
+    months = {(d.year, d.month) for d in map(as_date, dates)}
+    if months:
+        _bump([_data_gen(user_id)] + [_month_gen(user_id, y, m) for y, m in sorted(months)])
+
+
+def invalidate_user(user_id: int) -> None:
+    """Инвалидирует все отчёты пользователя (например, переименована категория)."""
+    _bump([_epoch_gen(user_id)])
+
+
+def invalidate_all() -> None:
+    _bump([GLOBAL_GEN])
+
+
+def _stat_key(name: str, event: str) -> str:
+    return f"{PREFIX}:stats:{name}:{event}"
+
+
+def record(name: str, hit: bool) -> None:
+    """Счётчики попаданий/промахов кэша (для мониторинга)."""
+    key = _stat_key(name, "hit" if hit else "miss")
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats(names: Iterable[str]) -> dict[str, dict[str, int]]:
+    keys = {(n, e): _stat_key(n, e) for n in names for e in ("hit", "miss")}
+    found = cache.get_many(keys.values())
+    result: dict[str, dict[str, int]] = {}
+    for (name, event), key in keys.items():
+        result.setdefault(name, {})[event] = int(found.get(key, 0))
+    return result
+
+
+def summary_key(user_id: int, month: str | None, start_day: str | None, r=None) -> str:
+    gens = generations(user_id, r.start if r else None, r.end if r else None)
+    return f"{PREFIX}:summary:{user_id}:{month or '-'}:{start_day or '-'}:{gens}"
+
+
+def summary_timeout() -> int:
+    return int(getattr(settings, "SUMMARY_CACHE_TIMEOUT", 3600))
+
+
+def forecast_key(user_id: int, version: int, today: date, opts: dict, start_day: int) -> str:
+    # Версия данных меняется при любой записи пользователя, дата — при смене "сегодня"
+    params = f"{opts['months']}:{opts['history']}:{opts['method']}:{start_day}"
+    return f"{PREFIX}:forecast:{user_id}:{version}:{today.isoformat()}:{params}"
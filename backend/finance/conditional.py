@@ -0,0 +1,95 @@
+"""
+Conditional GET (ETag / If-None-Match) для read-эндпоинтов finance.
+
+Валидатор строится из счётчика версии данных пользователя (UserSettings.data_version),
+который увеличивается при любой записи его категорий, операций, целей и настроек.
+Если клиент прислал актуальный ETag, сервер отвечает 304 Not Modified, не выполняя
+queryset'ы и сериализаторы — достаточно одного запроса к строке настроек.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from typing import Iterable
+
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from finance.models_settings_goals import UserSettings
+
+
+def bump_data_version(user_ids: Iterable[int] | None) -> None:
+    """Увеличивает версию данных пользователей (None — всех пользователей)."""
+    qs = UserSettings.objects.all()
+    if user_ids is not None:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return
+        qs = qs.filter(user_id__in=user_ids)
+    qs.update(data_version=F("data_version") + 1)
+
+
+def data_version(user) -> int:
+    version = UserSettings.objects.filter(user=user).values_list("data_version", flat=True).first()
+    if version is None:
+        # Без строки настроек увеличивать было бы нечего — создаём её
+        settings, _ = UserSettings.objects.get_or_create(user=user)
+        version = settings.data_version
+    return version
+
+
+async def adata_version(user) -> int:
+    version = await UserSettings.objects.filter(user=user).values_list("data_version", flat=True).afirst()
+    if version is None:
+        settings, _ = await UserSettings.objects.aget_or_create(user=user)
+        version = settings.data_version
+    return version
+
+
+def make_etag(user_id: int, version: int, full_path: str) -> str:
+    # Дата входит в валидатор: часть полей (статус цели, months_left) зависит от "сегодня"
+    raw = "|".join([str(user_id), str(version), date.today().isoformat(), full_path])
+    return 'W/"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = "Not modified."
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag к GET-ответам view и отвечает 304, если он совпал с If-None-Match.
+
+    Проверка выполняется в initial(), т.е. после аутентификации и проверки прав,
+    но до обработчика (list/retrieve/get).
+    """
+
+    def get_etag(self, request) -> str:
+        return make_etag(request.user.id, data_version(request.user), request.get_full_path())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        self.etag = self.get_etag(request)
+        if self.etag in parse_etags(request.headers.get("If-None-Match", "")):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": self.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "etag", None) and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = self.etag
+            # Браузер хранит ответ, но перед использованием всегда перепроверяет ETag
+            response["Cache-Control"] = "private, no-cache"
+        return response
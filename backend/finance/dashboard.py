@@ -0,0 +1,87 @@
+"""
+Данные главного экрана одним запросом: категории, операции периода (первая страница),
+сводка и цели.
+
+Категории загружаются один раз: это и секция categories, и имена категорий для сводки
+(группировка агрегатов по category_id без JOIN). Операции и цели собираются быстрым
+путём finance.fast_serializers (без сериализаторов DRF). Для каждой секции считается свой ETag по содержимому;
+секции, ETag которых клиент прислал в If-None-Match, возвращаются без данных
+({"etag": ..., "not_modified": true}) — клиент оставляет у себя прежние.
+
+Версию данных пользователя (ETag ответа целиком) проверяет ConditionalGetMixin в initial(),
+до build_dashboard: если она не изменилась, view отвечает 304 и секции не собираются вовсе.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.utils.http import parse_etags
+
+from finance.models import Category
+from finance.models_settings_goals import Goal
+from finance.pagination import TransactionCursorPagination
+from finance.fast_serializers import goals_data, transaction_page
+from finance.serializers import CategorySerializer
+
+
+SECTIONS = ("categories", "transactions", "summary", "goals")
+
+# Параметры списка операций, которые переносятся в ссылку next (на /api/transactions/)
+_TRANSACTION_PARAMS = ("month", "start_day", "page_size", "fields")
+
+
+def section_etag(data) -> str:
+    raw = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return 'W/"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def _transactions_page(request) -> dict:
+    from finance.views import transaction_list_queryset, transaction_projection
+
+    params = request.query_params
+    fields = transaction_projection(params)
+    # Категория отдаётся как id — JOIN не нужен
+    qs = transaction_list_queryset(request.user, params, fields).select_related(None)
+    paginator = TransactionCursorPagination()
+    results = transaction_page(paginator, qs, request, fields)
+
+    next_link = None
+    if paginator.next_cursor is not None:
+        query = {name: params[name] for name in _TRANSACTION_PARAMS if params.get(name)}
+        query["cursor"] = paginator.next_cursor
+        next_link = request.build_absolute_uri(f"{reverse('transactions-list')}?{urlencode(query)}")
+    return {"next": next_link, "results": results}
+
+
+def build_dashboard(request, sections=SECTIONS) -> dict:
+    from finance.views import cached_summary
+
+    user = request.user
+    known = set(parse_etags(request.headers.get("If-None-Match", "")))
+
+    # Нужны только секциям categories и summary
+    categories = None
+    if "categories" in sections or "summary" in sections:
+        categories = list(Category.objects.filter(user=user).order_by("type", "name"))
+
+    builders = {
+        "categories": lambda: CategorySerializer(categories, many=True).data,
+        "transactions": lambda: _transactions_page(request),
+        "summary": lambda: cached_summary(user, request.query_params, {c.id: c.name for c in categories}),
+        "goals": lambda: goals_data(Goal.objects.filter(user=user).order_by("due_date", "-created_at")),
+    }
+
+    result = {}
+    for name in sections:
+        data = builders[name]()
+        etag = section_etag(data)
+        if etag in known:
+            result[name] = {"etag": etag, "not_modified": True}
+        else:
+            result[name] = {"etag": etag, "data": data}
+    return result
@@ -0,0 +1,178 @@
+"""
+Порционное удаление больших объёмов данных без Django Collector.
+
+qs.delete() сначала загружает в память все удаляемые объекты и их зависимости
+(каскад reserve_children, проверка RESTRICT у категорий), а затем удаляет всё в одной
+транзакции — на больших аккаунтах это много памяти и долгая блокировка записи.
+
+Здесь удаление идёт порциями по диапазонам id: для каждой порции сначала одним
+DELETE ... WHERE reserve_parent_id IN (...) удаляются доли резервов, затем сами
+операции, и агрегаты DailyRollup пересчитываются только за затронутые дни. Каждая
+порция — отдельная транзакция, так что блокировка отпускается между порциями.
+Сигналы post_delete при этом не отправляются — их работу (агрегаты, кэш, версия данных)
+выполняет сам движок.
+
+Любое удаление пользователя (User.delete(), удаление queryset пользователей, админка)
+проходит через delete_user_data(): его вызывает сигнал pre_delete у User, до DELETE
+Collector'а. Связи finance с User остаются CASCADE: что бы ни собрал Collector, удалять
+ему уже нечего, а пути мимо сигнала не оставляют осиротевших строк.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from django.db import connections
+from django.db import transaction as db_transaction
+from django.db.models import QuerySet
+
+from finance.cache import invalidate_user
+from finance.models import Category, DailyRollup, Job, Transaction
+from finance.models_settings_goals import Goal, GoalDeposit, UserSettings
+from finance.rollups import refresh_rollups
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+Progress = Callable[[int], None]
+
+
+@dataclass
+class UserDeletionStats:
+    transactions: int = 0
+    rollups: int = 0
+    goals: int = 0
+    categories: int = 0
+    other: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.transactions + self.rollups + self.goals + self.categories + self.other
+
+
+def _raw_delete(qs: QuerySet) -> int:
+    """DELETE ... WHERE id IN (<qs>) одним запросом, без загрузки объектов."""
+    connection = connections[qs.db]
+    sql, params = qs.order_by().values("id").query.sql_with_params()
+    table = connection.ops.quote_name(qs.model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({sql})", params)
+        return cursor.rowcount
+
+
+def iter_id_chunks(qs: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[QuerySet]:
+    """Разбивает qs на порции-диапазоны id (каждая — не более chunk_size строк)."""
+    last_id = None
+    while True:
+        page = qs if last_id is None else qs.filter(id__gt=last_id)
+        ids = list(page.order_by("id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return
+        last_id = ids[-1]
+        yield qs.filter(id__gte=ids[0], id__lte=last_id)
+
+
+def delete_in_chunks(
+    qs: QuerySet,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    on_progress: Progress | None = None,
+) -> int:
+    """Удаляет строки qs порциями (модель без зависимых CASCADE/RESTRICT-связей)."""
+    deleted = 0
+    for chunk in iter_id_chunks(qs, chunk_size):
+        with db_transaction.atomic(using=qs.db):
+            n = _raw_delete(chunk)
+        deleted += n
+        if on_progress:
+            on_progress(n)
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def delete_transactions(
+    qs: QuerySet,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    on_progress: Progress | None = None,
+    update_rollups: bool = True,
+) -> int:
+    """
+    Удаляет операции qs вместе с долями их резервов (как CASCADE по reserve_parent).
+    Возвращает число удалённых строк, включая доли.
+    """
+    deleted = 0
+    for chunk in iter_id_chunks(qs, chunk_size):
+        children = Transaction.objects.filter(reserve_parent__in=chunk.values("id"))
+        with db_transaction.atomic(using=qs.db):
+            touched: dict[int, set] = defaultdict(set)
+            if update_rollups:
+                for source in (chunk, children):
+                    for user_id, d in source.order_by().values_list("user_id", "date").distinct():
+                        touched[user_id].add(d)
+            # Сначала доли, затем исходные операции — FK reserve_parent не нарушается
+            n = _raw_delete(children)
+            n += _raw_delete(chunk)
+            for user_id, dates in touched.items():
+                refresh_rollups(user_id, dates)
+        deleted += n
+        if on_progress:
+            on_progress(n)
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def count_transactions(qs: QuerySet) -> int:
+    """Сколько строк удалит delete_transactions(qs) (с долями резервов вне qs)."""
+    return qs.count() + Transaction.objects.filter(reserve_parent__in=qs.values("id")).exclude(
+        id__in=qs.values("id")
+    ).count()
+
+
+def delete_user_data(
+    user_id: int,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    on_progress: Progress | None = None,
+) -> UserDeletionStats:
+    """
+    Порционно удаляет все данные finance пользователя: операции, агрегаты, цели,
+    категории (после операций — RESTRICT не мешает), задачи и настройки.
+    Саму строку User не удаляет — см. delete_user().
+    """
+    opts = {"chunk_size": chunk_size, "pause": pause, "on_progress": on_progress}
+    stats = UserDeletionStats()
+    # Агрегаты всё равно удаляются целиком — пересчитывать их по дням незачем
+    stats.transactions = delete_transactions(
+        Transaction.objects.filter(user_id=user_id), update_rollups=False, **opts
+    )
+    stats.rollups = delete_in_chunks(DailyRollup.objects.filter(user_id=user_id), **opts)
+    # Журнал пополнений — до самих целей (FK goal)
+    stats.goals = delete_in_chunks(GoalDeposit.objects.filter(user_id=user_id), **opts)
+    stats.goals += delete_in_chunks(Goal.objects.filter(user_id=user_id), **opts)
+    stats.categories = delete_in_chunks(Category.objects.filter(user_id=user_id), **opts)
+    stats.other = delete_in_chunks(Job.objects.filter(user_id=user_id), **opts)
+    stats.other += delete_in_chunks(UserSettings.objects.filter(user_id=user_id), **opts)
+    invalidate_user(user_id)
+    return stats
+
+
+def delete_user(user, **kwargs) -> UserDeletionStats:
+    """
+    Удаляет пользователя: сначала порционно его данные finance (каждая порция — своя
+    транзакция), затем саму строку User (оставшиеся связи — сессии, записи админки —
+    удаляет обычный каскад Django; сигналу pre_delete удалять уже нечего).
+    Просто user.delete() удалит данные тем же движком, но в одной транзакции и после
+    того, как Collector загрузит связанные строки.
+    """
+    stats = delete_user_data(user.id, **kwargs)
+    user.delete()
+    return stats
@@ -0,0 +1,218 @@
+"""
+Быстрый read-only путь для списков операций и целей.
+
+ModelSerializer на каждый объект создаёт экземпляр модели, проходит по полям и
+вызывает to_representation каждого поля; у GoalSerializer ещё четыре
+SerializerMethodField, каждый со своим date.today(). На больших страницах это
+основная часть времени ответа. Здесь строки берутся из .values_list() кортежами
+и сразу превращаются в dict того же вида, что отдаёт сериализатор: тот же порядок
+ключей, Decimal строкой с двумя знаками, даты ISO, created_at в текущем часовом
+поясе (формат DRF), today — один на весь список.
+
+FastJSONRenderer рендерит через orjson. Вывод совпадает с JSONRenderer байт в байт
+для таких данных (строки, целые, bool, None и float с копейками); orjson иначе
+пишет float меньше 1e-4 (0.000001 вместо 1e-06), поэтому рендерер ставится только
+на списки, а сводка остаётся на JSONRenderer. Совпадение обоих путей проверяет
+`manage.py bench_serializers`.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from operator import itemgetter
+
+import orjson
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from config.metrics import serialization_timer
+from finance.serializers import GoalSerializer, TransactionSerializer
+
+
+TRANSACTION_FIELDS = TransactionSerializer.Meta.fields
+GOAL_FIELDS = GoalSerializer.Meta.fields
+
+# Поле сериализатора -> колонка values_list (связи отдаются как pk)
+_TRANSACTION_COLUMNS = {"category": "category_id", "reserve_parent": "reserve_parent_id"}
+_GOAL_COLUMNS = ("id", "name", "target_amount", "saved_amount", "due_date", "created_at")
+# Ключ keyset-пагинации (TransactionCursorPagination.ordering)
+_CURSOR_KEY = ("date", "created_at", "id")
+
+_LINE_SEPARATORS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+
+def _money(value) -> str:
+    # То же, что '{:f}'.format(quantize(0.01)) у DecimalField(decimal_places=2), но быстрее
+    return f"{value:.2f}"
+
+
+def _iso_date(value) -> str:
+    return value.isoformat()
+
+
+def _money_formatter():
+    if api_settings.COERCE_DECIMAL_TO_STRING:
+        return _money
+    return serializers.DecimalField(max_digits=12, decimal_places=2).to_representation
+
+
+def _date_formatter():
+    if (api_settings.DATE_FORMAT or "").lower() == ISO_8601:
+        return _iso_date
+    return serializers.DateField().to_representation
+
+
+def _datetime_formatter():
+    """Как DateTimeField.to_representation; часовой пояс определяется один раз на список."""
+    if (api_settings.DATETIME_FORMAT or "").lower() != ISO_8601:
+        return serializers.DateTimeField().to_representation
+    if not settings.USE_TZ:
+        return lambda value: value.isoformat() if value else None
+    tz = timezone.get_current_timezone()
+
+    def fmt(value):
+        if not value:
+            return None
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return fmt
+
+
+# --- Операции --------------------------------------------------------------------------
+
+
+def transaction_columns(fields: list[str] | None = None) -> tuple[list[str], list[str], itemgetter]:
+    """
+    Поля ответа (в порядке сериализатора), колонки для values_list и функция,
+    достающая из строки ключ курсора (date, created_at, id).
+    """
+    names = [f for f in TRANSACTION_FIELDS if fields is None or f in fields]
+    columns = [_TRANSACTION_COLUMNS.get(name, name) for name in names]
+    for column in _CURSOR_KEY:
+        if column not in columns:
+            columns.append(column)
+    return names, columns, itemgetter(*(columns.index(c) for c in _CURSOR_KEY))
+
+
+def transactions_data(rows, names: list[str]) -> list[dict]:
+    """Строки values_list (первые len(names) колонок — поля ответа) -> dict как у TransactionSerializer."""
+    formatters = {
+        "amount": _money_formatter(),
+        "date": _date_formatter(),
+        "created_at": _datetime_formatter(),
+    }
+    if names == list(TRANSACTION_FIELDS):
+        # Полный набор полей — самый частый случай, без цикла по полям
+        money, day, moment = formatters["amount"], formatters["date"], formatters["created_at"]
+        return [
+            {
+                "id": r[0],
+                "category": r[1],
+                "amount": money(r[2]),
+                "date": day(r[3]),
+                "is_income": r[4],
+                "is_reserved": r[5],
+                "reserve_months": r[6],
+                "reserve_parent": r[7],
+                "comment": r[8],
+                "created_at": moment(r[9]),
+            }
+            for r in rows
+        ]
+    plan = [(name, i, formatters.get(name)) for i, name in enumerate(names)]
+    return [{name: fmt(r[i]) if fmt else r[i] for name, i, fmt in plan} for r in rows]
+
+
+def transaction_page(paginator, queryset, request, fields: list[str] | None = None) -> list[dict]:
+    """Страница списка операций без сериализатора (paginator — TransactionCursorPagination)."""
+    names, columns, key = transaction_columns(fields)
+    rows = list(paginator.page_queryset(queryset, request).values_list(*columns))
+    return transactions_data(paginator.finish_page(rows, key=key), names)
+
+
+async def atransaction_page(paginator, queryset, request, fields: list[str] | None = None) -> list[dict]:
+    """То же через async ORM (для finance.async_views)."""
+    names, columns, key = transaction_columns(fields)
+    rows = [row async for row in paginator.page_queryset(queryset, request).values_list(*columns)]
+    return transactions_data(paginator.finish_page(rows, key=key), names)
+
+
+# --- Цели --------------------------------------------------------------------------------
+
+
+def goals_data(queryset, today: date | None = None) -> list[dict]:
+    """Цели как у GoalSerializer (percent/remaining_amount/status/months_left — от одного today)."""
+    today = today or date.today()
+    money, day, moment = _money_formatter(), _date_formatter(), _datetime_formatter()
+    result = []
+    for pk, name, target, saved, due_date, created_at in queryset.values_list(*_GOAL_COLUMNS):
+        if target <= 0:
+            percent = 0
+        else:
+            percent = max(0, min(100, int((saved / target) * 100)))
+        remaining = target - saved
+        if saved >= target:
+            status = "completed"
+        elif due_date < today:
+            status = "expired"
+        else:
+            status = "active"
+        result.append(
+            {
+                "id": pk,
+                "name": name,
+                "target_amount": money(target),
+                "saved_amount": money(saved),
+                "due_date": day(due_date),
+                "created_at": moment(created_at),
+                "percent": percent,
+                "remaining_amount": float(remaining) if remaining > 0 else 0.0,
+                "status": status,
+                # ceil(days / 30) в целых числах
+                "months_left": -(-(due_date - today).days // 30) if due_date > today else 0,
+            }
+        )
+    return result
+
+
+# --- Рендерер ----------------------------------------------------------------------------
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson для списков. Отступы (?indent / Browsable API), ASCII-режим
+    и типы, которые orjson не умеет, уходят в обычный JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with serialization_timer():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как JSONRenderer: U+2028/U+2029 экранируются (JSON — подмножество JavaScript)
+        if _LINE_SEPARATORS[0] in ret or _LINE_SEPARATORS[1] in ret:
+            ret = ret.replace(_LINE_SEPARATORS[0], b"\\u2028").replace(_LINE_SEPARATORS[1], b"\\u2029")
+        return ret
+
@@ -0,0 +1,323 @@
+"""
+Прогноз денежного потока на ближайшие бюджетные периоды (/api/forecast/).
+
+История за history полных периодов до текущего сводится одним запросом в
+компактную матрицу «категория × период» в копейках. В неё не входят исходные
+доходы-резервы и их доли: это разовые поступления, а не регулярный доход, и их
+будущие доли и так известны. Прогноз категории считается над её строкой целиком:
+усечённое среднее (method=trimmed, отбрасываются TRIM крайних значений с каждой
+стороны) или то же среднее с сезонным коэффициентом месяца года (method=seasonal;
+при одном-двух годах истории коэффициент сглаживается к 1). К прогнозу добавляются:
+- доли резервов, уже запланированные на будущие периоды (дети-резервы);
+- взносы на цели: остаток цели поровну на периоды до срока (копейки — как у долей
+  резервов, остаток на первые периоды).
+
+Результат кэшируется по версии данных пользователя (UserSettings.data_version),
+то есть до следующего изменения операций, категорий, целей или настроек.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connections
+
+from finance import cache as report_cache
+from finance.analytics import Bucket, month_buckets
+from finance.models import Category, DailyRollup, Transaction
+from finance.models_settings_goals import Goal, UserSettings
+from finance.periods import period_to_range
+from finance.summary import CENTS
+
+
+METHODS = ("trimmed", "seasonal")
+DEFAULT_MONTHS = 3
+MAX_MONTHS = 24
+DEFAULT_HISTORY = 12
+MAX_HISTORY = 36
+# Доля крайних значений, отбрасываемая с каждой стороны (от 5 периодов — хотя бы по одному)
+TRIM = 0.1
+# Вес «нейтрального» коэффициента 1 при сглаживании сезонности (в наблюдениях месяца)
+SEASONAL_SHRINK = 1
+
+# kind: h — история по агрегатам, c — доли резервов (вычитаются из истории,
+# в будущих периодах — запланированный доход)
+_FORECAST_SQL = """
+SELECT 'h', {period_r}, c.{name}, r.is_income,
+       CAST(SUM(ROUND((r.amount - r.reserved_amount) * {cents})) AS BIGINT)
+FROM {rollups} r JOIN {categories} c ON c.id = r.category_id
+WHERE r.user_id = %s AND r.date >= %s AND r.date < %s
+GROUP BY 2, 3, 4
+UNION ALL
+SELECT 'c', {period_t}, c.{name}, t.is_income, CAST(SUM(ROUND(t.amount * {cents})) AS BIGINT)
+FROM {transactions} t JOIN {categories} c ON c.id = t.category_id
+WHERE t.user_id = %s AND t.reserve_parent_id IS NOT NULL AND t.date >= %s AND t.date < %s
+GROUP BY 2, 3, 4
+"""
+
+
+class ForecastError(ValueError):
+    """Некорректные параметры прогноза (view превращает в 400)."""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+
+
+def _int_param(params, name: str, default: int | None, low: int, high: int) -> int | None:
+    raw = params.get(name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = None
+    if value is None or not low <= value <= high:
+        raise ForecastError(name, f"Ожидается число от {low} до {high}.")
+    return value
+
+
+def parse_params(params) -> dict:
+    method = params.get("method") or "trimmed"
+    if method not in METHODS:
+        raise ForecastError("method", f"Допустимые значения: {', '.join(METHODS)}.")
+    return {
+        "months": _int_param(params, "months", DEFAULT_MONTHS, 1, MAX_MONTHS),
+        "history": _int_param(params, "history", DEFAULT_HISTORY, 1, MAX_HISTORY),
+        "start_day": _int_param(params, "start_day", None, 1, 31),
+        "method": method,
+    }
+
+
+def _shift_month(month: tuple[int, int], n: int) -> tuple[int, int]:
+    index = month[0] * 12 + month[1] - 1 + n
+    return index // 12, index % 12 + 1
+
+
+def _budget_month(d: date, start_day: int) -> tuple[int, int]:
+    """Бюджетный месяц (год, месяц), в период которого попадает день d."""
+    month = (d.year, d.month)
+    if d < period_to_range(f"{d.year:04d}-{d.month:02d}", start_day).start:
+        month = _shift_month(month, -1)
+    return month
+
+
+# --- Операции над матрицей «категория × период» ---------------------------------------
+
+
+def trimmed_means(matrix: list[list[int]], trim: float = TRIM) -> list[float]:
+    """Усечённое среднее каждой строки (доля trim с каждой стороны, с округлением)."""
+    result = []
+    for row in matrix:
+        k = int(len(row) * trim + 0.5)
+        kept = sorted(row)[k : len(row) - k] if len(row) > 2 * k else row
+        result.append(sum(kept) / len(kept) if kept else 0.0)
+    return result
+
+
+def seasonal_factors(matrix: list[list[int]], months: list[int], shrink: float = SEASONAL_SHRINK) -> list[dict[int, float]]:
+    """
+    Сезонные коэффициенты строк по месяцам года (months — месяц года каждого столбца):
+    среднее столбцов месяца / среднее строки, сглаженное к 1 весом shrink.
+    """
+    columns: dict[int, list[int]] = {}
+    for j, m in enumerate(months):
+        columns.setdefault(m, []).append(j)
+    result = []
+    for row in matrix:
+        mean = sum(row) / len(row) if row else 0
+        factors = {}
+        for m, js in columns.items():
+            raw = (sum(row[j] for j in js) / len(js)) / mean if mean else 1.0
+            factors[m] = (raw * len(js) + shrink) / (len(js) + shrink)
+        result.append(factors)
+    return result
+
+
+def _spread(total: int, parts: int) -> list[int]:
+    """total копеек поровну на parts частей, остаток — по копейке на первые."""
+    per, rest = divmod(total, parts)
+    return [per + (1 if i < rest else 0) for i in range(parts)]
+
+
+# --- Расчёт ------------------------------------------------------------------------------
+
+
+def forecast_buckets(today: date, start_day: int, n_history: int, n_future: int) -> list[Bucket]:
+    """Периоды прогноза: n_history прошедших, текущий и n_future будущих."""
+    current = _budget_month(today, start_day)
+    first = _shift_month(current, -n_history)
+    last = _shift_month(current, n_future)
+    return month_buckets(first, last, start_day if start_day > 1 else None)
+
+
+def forecast_query(user, buckets: list[Bucket], n_history: int, using="default") -> tuple[str, list]:
+    """
+    SQL и параметры запроса истории и долей резервов по периодам buckets (первые
+    n_history — история); отдельно — для EXPLAIN в check_query_plans.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    adapt = connection.ops.adapt_datefield_value
+
+    boundaries = [b.range.end for b in buckets]
+    history = (buckets[0].range.start, buckets[n_history - 1].range.end)
+    children = (buckets[0].range.start, buckets[-1].range.end)
+
+    def period_case(alias: str) -> str:
+        whens = " ".join(f"WHEN {alias}.date < %s THEN {i}" for i in range(len(boundaries)))
+        return f"CASE {whens} END"
+
+    sql = _FORECAST_SQL.format(
+        period_r=period_case("r"),
+        period_t=period_case("t"),
+        name=qn("name"),
+        cents=CENTS,
+        rollups=qn(DailyRollup._meta.db_table),
+        transactions=qn(Transaction._meta.db_table),
+        categories=qn(Category._meta.db_table),
+    )
+    ends = [adapt(d) for d in boundaries]
+    params = [*ends, user.id, adapt(history[0]), adapt(history[1])]
+    params += [*ends, user.id, adapt(children[0]), adapt(children[1])]
+    return sql, params
+
+
+def _fetch_rows(user, buckets: list[Bucket], n_history: int, using="default"):
+    """Строки (kind, period, category, is_income, cents); period — индекс периода в buckets."""
+    sql, params = forecast_query(user, buckets, n_history, using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def build_forecast(user, opts: dict, start_day: int, today: date | None = None) -> dict:
+    today = today or date.today()
+    n_history, n_future = opts["history"], opts["months"]
+
+    current = _budget_month(today, start_day)
+    buckets = forecast_buckets(today, start_day, n_history, n_future)
+    history, future = buckets[:n_history], buckets[n_history + 1 :]
+
+    # Матрицы «категория × период»: история (копейки) и запланированные доли резервов
+    hist: dict[tuple[bool, str], list[int]] = {}
+    scheduled: dict[tuple[bool, str], list[int]] = {}
+    rows = _fetch_rows(user, buckets, n_history)
+    for kind, period, name, is_income, cents in rows:
+        key = (bool(is_income), name)
+        if period < n_history:
+            # Доли резервов в истории — не регулярный доход: вычитаем из агрегатов
+            hist.setdefault(key, [0] * n_history)[period] += cents if kind == "h" else -cents
+        elif period > n_history and kind == "c":
+            scheduled.setdefault(key, [0] * n_future)[period - n_history - 1] += cents
+
+    # Периоды до первой записи (новый пользователь) не считаем нулевыми месяцами
+    used = n_history
+    while used and not any(series[n_history - used] for series in hist.values()):
+        used -= 1
+    keys = sorted(set(hist) | set(scheduled), key=lambda k: (not k[0], k[1]))
+    matrix = [hist.get(k, [0] * n_history)[n_history - used :] for k in keys]
+
+    levels = trimmed_means(matrix) if used else [0.0] * len(keys)
+    if opts["method"] == "seasonal" and used:
+        months = [int(b.label[5:7]) for b in history[n_history - used :]]
+        factors = seasonal_factors(matrix, months)
+        future_months = [int(b.label[5:7]) for b in future]
+        projected = [[round(level * f.get(m, 1.0)) for m in future_months] for level, f in zip(levels, factors)]
+    else:
+        projected = [[round(level)] * n_future for level in levels]
+
+    # Категории: прогноз + запланированные доли
+    series = {True: {}, False: {}}
+    for (is_income, name), values in zip(keys, projected):
+        extra = scheduled.get((is_income, name), [0] * n_future)
+        series[is_income][name] = [max(0, v) + s for v, s in zip(values, extra)]
+
+    income = [sum(col) for col in zip(*series[True].values())] or [0] * n_future
+    expense = [sum(col) for col in zip(*series[False].values())] or [0] * n_future
+    scheduled_income = [
+        sum(col) for col in zip(*(v for (is_income, _), v in scheduled.items() if is_income))
+    ] or [0] * n_future
+
+    # Цели: остаток поровну на периоды от первого прогнозного до периода срока
+    goal_savings = [0] * n_future
+    goals = []
+    first_future = _shift_month(current, 1)
+    for pk, name, target, saved, due_date in (
+        Goal.objects.filter(user_id=user.id, due_date__gte=future[0].range.start)
+        .order_by("due_date", "id")
+        .values_list("id", "name", "target_amount", "saved_amount", "due_date")
+    ):
+        remaining = int(round((target - saved) * CENTS))
+        if remaining <= 0:
+            continue
+        due = _budget_month(due_date, start_day)
+        periods_left = (due[0] - first_future[0]) * 12 + due[1] - first_future[1] + 1
+        parts = _spread(remaining, periods_left)
+        for i, cents in enumerate(parts[:n_future]):
+            goal_savings[i] += cents
+        goals.append(
+            {
+                "id": pk,
+                "name": name,
+                "remaining": remaining / CENTS,
+                "due_date": due_date.isoformat(),
+                "periods_left": periods_left,
+                "per_period": parts[0] / CENTS,
+            }
+        )
+
+    periods = []
+    running = 0
+    for i, b in enumerate(future):
+        balance = income[i] - expense[i] - goal_savings[i]
+        running += balance
+        periods.append(
+            {
+                "label": b.label,
+                "start": b.range.start.isoformat(),
+                "end": b.range.end.isoformat(),
+                "income": income[i] / CENTS,
+                "scheduled_income": scheduled_income[i] / CENTS,
+                "expense": expense[i] / CENTS,
+                "goal_savings": goal_savings[i] / CENTS,
+                "balance": balance / CENTS,
+                "cumulative_balance": running / CENTS,
+            }
+        )
+
+    def convert(named: dict[str, list[int]]) -> dict[str, list[float]]:
+        ordered = sorted(named.items(), key=lambda item: (-sum(item[1]), item[0]))
+        return {name: [v / CENTS for v in values] for name, values in ordered}
+
+    return {
+        "method": opts["method"],
+        "start_day": start_day,
+        "history_periods": used,
+        "periods": periods,
+        "categories": {"income": convert(series[True]), "expense": convert(series[False])},
+        "goals": goals,
+    }
+
+
+def cached_forecast(user, params, today: date | None = None) -> dict:
+    """Прогноз через кэш: ключ — версия данных пользователя, параметры и текущий день."""
+    opts = parse_params(params)
+    today = today or date.today()
+    # Версия читается до расчёта: изменения во время расчёта попадут уже под новый ключ
+    row = UserSettings.objects.filter(user_id=user.id).values_list("period_start_day", "data_version").first()
+    if row is None:
+        settings_obj, _ = UserSettings.objects.get_or_create(user_id=user.id)
+        row = (settings_obj.period_start_day, settings_obj.data_version)
+    start_day = opts["start_day"] or row[0] or 1
+
+    key = report_cache.forecast_key(user.id, row[1], today, opts, start_day)
+    data = cache.get(key)
+    report_cache.record("forecast", hit=data is not None)
+    if data is None:
+        data = build_forecast(user, opts, start_day, today)
+        cache.set(key, data, report_cache.summary_timeout())
+    return data
+
@@ -0,0 +1,70 @@
+"""
+Пополнение целей с журналом GoalDeposit.
+
+Пополнение — одна транзакция: UPDATE накопленной суммы (F-выражение, без чтения
+перед записью, поэтому параллельные пополнения не теряются), запись в журнал с
+суммой после пополнения и увеличение версии данных. На PostgreSQL и SQLite >= 3.35
+UPDATE сразу возвращает обновлённую строку (RETURNING) — отдельный SELECT не нужен;
+на прочих базах строка перечитывается в той же транзакции.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db import connections
+from django.db import transaction as db_transaction
+from django.db.models import F
+
+from finance.conditional import bump_data_version
+from finance.models_settings_goals import Goal, GoalDeposit
+
+
+_DEPOSIT_SQL = "UPDATE {goal} SET {saved} = {saved} + %s WHERE {id} = %s AND {user} = %s RETURNING {columns}"
+
+
+def update_returning_supported(connection) -> bool:
+    if connection.vendor == "postgresql":
+        return True
+    # В SQLite UPDATE ... RETURNING появился вместе с INSERT ... RETURNING (3.35);
+    # MariaDB умеет RETURNING только у INSERT/DELETE
+    return connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+
+
+def _update_returning(user, goal_id, amount: Decimal, using: str) -> Goal | None:
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = Goal._meta
+    sql = _DEPOSIT_SQL.format(
+        goal=qn(opts.db_table),
+        saved=qn(opts.get_field("saved_amount").column),
+        id=qn(opts.pk.column),
+        user=qn(opts.get_field("user").column),
+        columns=", ".join(qn(f.column) for f in opts.concrete_fields),
+    )
+    # raw() применяет конвертеры полей — Decimal и даты приходят как из ORM
+    rows = list(Goal.objects.using(using).raw(sql, [amount, goal_id, user.id]))
+    return rows[0] if rows else None
+
+
+def deposit_to_goal(user, goal_id, amount: Decimal, using: str = "default") -> tuple[Goal, GoalDeposit] | None:
+    """
+    Пополняет цель пользователя на amount. Возвращает (цель после пополнения,
+    запись журнала) или None, если цели нет.
+    """
+    with db_transaction.atomic(using=using):
+        if update_returning_supported(connections[using]):
+            goal = _update_returning(user, goal_id, amount, using)
+        else:
+            updated = Goal.objects.using(using).filter(id=goal_id, user=user).update(
+                saved_amount=F("saved_amount") + amount
+            )
+            goal = Goal.objects.using(using).get(id=goal_id) if updated else None
+        if goal is None:
+            return None
+        entry = GoalDeposit.objects.using(using).create(
+            goal=goal, user_id=goal.user_id, amount=amount, balance_after=goal.saved_amount
+        )
+        # update() не отправляет сигналы — версию данных для ETag увеличиваем явно
+        bump_data_version([user.id])
+    return goal, entry
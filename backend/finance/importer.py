@@ -0,0 +1,251 @@
+"""
+Потоковый импорт операций из CSV / JSON Lines (выгрузки банков и т.п.).
+
+Файл читается построчно, строки валидируются без ModelSerializer (категории
+разрешаются по имени через одну карту на запрос) и пишутся чанками через bulk_create.
+Каждый чанк — отдельная транзакция БД: блокировка записи отпускается между чанками,
+а память не зависит от размера файла (в ней держится только текущий чанк и первые
+max_errors ошибок).
+
+Формат строки (CSV-заголовок или ключи JSON):
+    date (YYYY-MM-DD), amount, category (имя), is_income | type (income/expense),
+    comment, is_reserved, reserve_months
+
+Строки с заполненным reserve_parent (доли резервов из выгрузки finance.exporter)
+пропускаются: доли заново создаются распределением исходного резерва.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import IO, Callable, Iterable, Iterator
+
+from django.db import transaction as db_transaction
+
+from finance.models import Category, Transaction
+from finance.reserves import distribute_reserves
+from finance.rollups import refresh_rollups
+
+
+TRUE_VALUES = {"1", "true", "yes", "y", "да", "+"}
+FALSE_VALUES = {"0", "false", "no", "n", "нет", "-", ""}
+
+MAX_AMOUNT = Decimal("9999999999.99")  # max_digits=12, decimal_places=2
+
+
+class RowError(Exception):
+    def __init__(self, errors: dict[str, str]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    failed: int = 0
+    skipped: int = 0
+    errors: list[dict] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ImportResult":
+        return cls(**data)
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[dict]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+    yield from csv.DictReader(text, dialect=dialect)
+
+
+def iter_jsonl_rows(stream: IO[bytes]) -> Iterator[dict]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield {"__error__": "Некорректная JSON-строка."}
+            continue
+        yield row if isinstance(row, dict) else {"__error__": "Ожидался JSON-объект."}
+
+
+def _text(row: dict, key: str) -> str:
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _bool(row: dict, key: str, default: bool | None = None) -> bool | None:
+    value = row.get(key)
+    if isinstance(value, bool):
+        return value
+    raw = _text(row, key).lower()
+    if raw == "" and default is not None:
+        return default
+    if raw in TRUE_VALUES:
+        return True
+    if raw in FALSE_VALUES:
+        return False
+    raise RowError({key: "Ожидалось логическое значение."})
+
+
+class RowValidator:
+    """Проверки TransactionSerializer.validate для "сырых" строк импорта."""
+
+    def __init__(self, user):
+        self.user = user
+        # Одна выборка категорий на весь импорт
+        self.categories: dict[str, Category] = {
+            c.name.strip().lower(): c for c in Category.objects.filter(user=user)
+        }
+
+    def build(self, row: dict) -> Transaction:
+        if "__error__" in row:
+            raise RowError({"row": row["__error__"]})
+        errors: dict[str, str] = {}
+
+        try:
+            tx_date = date.fromisoformat(_text(row, "date"))
+        except ValueError:
+            errors["date"] = "Ожидалась дата в формате YYYY-MM-DD."
+            tx_date = None
+
+        try:
+            amount = Decimal(_text(row, "amount").replace(" ", "").replace(",", "."))
+            if not amount.is_finite() or amount.as_tuple().exponent < -2 or abs(amount) > MAX_AMOUNT:
+                raise InvalidOperation
+        except InvalidOperation:
+            errors["amount"] = "Некорректная сумма."
+            amount = None
+
+        category = self.categories.get(_text(row, "category").lower())
+        if category is None:
+            errors["category"] = "Категория не найдена."
+
+        try:
+            if _text(row, "type"):
+                typ = _text(row, "type").lower()
+                if typ not in ("income", "expense"):
+                    raise RowError({"type": "Ожидалось 'income' или 'expense'."})
+                is_income = typ == "income"
+            elif _text(row, "is_income") or isinstance(row.get("is_income"), bool):
+                is_income = _bool(row, "is_income")
+            else:
+                is_income = category.type == "income" if category is not None else None
+            is_reserved = _bool(row, "is_reserved", default=False)
+        except RowError as e:
+            errors.update(e.errors)
+            is_income = is_reserved = None
+
+        if category is not None and is_income is not None:
+            expected_type = "income" if is_income else "expense"
+            if category.type != expected_type:
+                errors["is_income"] = "Тип операции не соответствует типу выбранной категории."
+
+        reserve_months = None
+        if is_reserved:
+            if not is_income:
+                errors["is_reserved"] = "Резервирование возможно только для доходов."
+            try:
+                reserve_months = int(_text(row, "reserve_months"))
+                if reserve_months <= 0:
+                    raise ValueError
+            except ValueError:
+                errors["reserve_months"] = "Укажите количество месяцев распределения."
+
+        if errors:
+            raise RowError(errors)
+        return Transaction(
+            user=self.user,
+            category=category,
+            amount=amount,
+            date=tx_date,
+            is_income=is_income,
+            is_reserved=bool(is_reserved),
+            reserve_months=reserve_months,
+            comment=_text(row, "comment"),
+        )
+
+
+def _write_chunk(user, chunk: list[Transaction]) -> None:
+    # bulk_create минует Transaction.save и сигналы: резервы и агрегаты — пакетно
+    with db_transaction.atomic():
+        Transaction.objects.bulk_create(chunk)
+        children = distribute_reserves(chunk, update_rollups=False)
+        refresh_rollups(user.id, {tx.date for tx in chunk} | {tx.date for tx in children})
+
+
+def import_transactions(
+    user,
+    rows: Iterable[dict],
+    *,
+    chunk_size: int = 2000,
+    max_errors: int = 1000,
+    on_chunk: Callable[[int], None] | None = None,
+    start_row: int = 0,
+    result: ImportResult | None = None,
+    checkpoint: Callable[[int, ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    Валидирует и записывает строки чанками.
+    Ошибки возвращаются по номерам строк данных (с 1, без заголовка CSV).
+    on_chunk(n) вызывается после записи каждого чанка (для отчёта о прогрессе).
+    checkpoint(row, result) вызывается в транзакции чанка: номер последней учтённой строки
+    и итоги на этот момент. Продолжение прерванного импорта — start_row и result из него.
+    """
+    validator = RowValidator(user)
+    result = result or ImportResult()
+    chunk: list[Transaction] = []
+
+    def flush(last_row: int) -> None:
+        with db_transaction.atomic():
+            _write_chunk(user, chunk)
+            result.created += len(chunk)
+            if checkpoint:
+                checkpoint(last_row, result)
+        if on_chunk:
+            on_chunk(len(chunk))
+
+    line_no = 0
+    for line_no, row in enumerate(rows, start=1):
+        if line_no <= start_row:
+            continue
+        if _text(row, "reserve_parent"):
+            result.skipped += 1
+            continue
+        try:
+            chunk.append(validator.build(row))
+        except RowError as e:
+            result.failed += 1
+            if len(result.errors) < max_errors:
+                result.errors.append({"row": line_no, "errors": e.errors})
+            else:
+                result.errors_truncated = True
+            continue
+        if len(chunk) >= chunk_size:
+            flush(line_no)
+            chunk = []
+
+    if chunk:
+        flush(line_no)
+    return result
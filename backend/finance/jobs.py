@@ -0,0 +1,321 @@
+"""
+Локальная очередь фоновых задач поверх таблицы Job.
+
+enqueue() создаёт задачу и (после коммита) передаёт её исполнителю. Исполнителей два,
+оба без внешних сервисов:
+- JOBS_BACKEND="thread" (по умолчанию): пул потоков внутри процесса веб-сервера,
+  размер — JOBS_THREAD_WORKERS;
+- JOBS_BACKEND="worker": задачи только ставятся в очередь, выполняет их отдельный
+  процесс `manage.py run_jobs --workers N`.
+
+Задача захватывается условным UPDATE ... WHERE status='queued', поэтому потоки и
+процессы-воркеры могут работать одновременно и не выполнят задачу дважды. Брошенные
+задачи (процесс перезапущен посреди выполнения) подбирает recover_stale(): её вызывают
+enqueue(), чтение статуса задачи и цикл воркера, не чаще раза в JOBS_RECOVERY_SECONDS. Обработчик
+получает JobContext и сообщает прогресс через ctx.set_total()/ctx.advance(); каждая
+порция работы — отдельная транзакция БД, чтобы блокировка записи отпускалась между ними.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from finance.models_jobs import Job
+
+
+logger = logging.getLogger(__name__)
+
+HANDLERS: dict[str, Callable[["JobContext"], dict | None]] = {}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+_last_recovery = 0.0
+_recovery_lock = threading.Lock()
+
+
+def register(kind: str):
+    """Декоратор обработчика задачи: handler(ctx) -> dict (сохраняется в Job.result)."""
+
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+class JobContext:
+    def __init__(self, job: Job):
+        self.job = job
+        self.params = job.params or {}
+        self.user_id = job.user_id
+        self.done = 0
+
+    def set_total(self, total: int | None) -> None:
+        self.job.progress_total = total
+        Job.objects.filter(id=self.job.id).update(progress_total=total, heartbeat_at=timezone.now())
+
+    def advance(self, n: int = 1) -> None:
+        self.done += n
+        self.job.progress_done = self.done
+        Job.objects.filter(id=self.job.id).update(progress_done=self.done, heartbeat_at=timezone.now())
+
+    def save_checkpoint(self, state: dict) -> None:
+        """
+        Сохраняет состояние для повторной попытки. Вызывается внутри транзакции порции,
+        поэтому фиксируется вместе с ней.
+        """
+        self.job.checkpoint = state
+        Job.objects.filter(id=self.job.id).update(checkpoint=state, heartbeat_at=timezone.now())
+
+
+def worker_name(suffix: str = "") -> str:
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{suffix}" if suffix else name
+
+
+def enqueue(kind: str, user=None, **params) -> Job:
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job.objects.create(kind=kind, user=user, params=params)
+    if _thread_backend():
+        db_transaction.on_commit(lambda: _submit(job.id))
+    recover_stale()
+    return job
+
+
+def _thread_backend() -> bool:
+    return getattr(settings, "JOBS_BACKEND", "thread") == "thread"
+
+
+def _claim_filter(qs, worker: str) -> bool:
+    now = timezone.now()
+    return bool(
+        qs.filter(status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+    )
+
+
+def claim_next(worker: str, kinds: Iterable[str] | None = None) -> Job | None:
+    """Захватывает самую старую задачу из очереди (None — очередь пуста)."""
+    qs = Job.objects.filter(status=Job.STATUS_QUEUED)
+    if kinds:
+        qs = qs.filter(kind__in=list(kinds))
+    # Кандидата мог перехватить другой воркер — тогда пробуем следующего
+    for job_id in qs.order_by("id").values_list("id", flat=True)[:10]:
+        if _claim_filter(Job.objects.filter(id=job_id), worker):
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def run_job(job: Job) -> Job:
+    """Выполняет уже захваченную (status=running) задачу и записывает результат."""
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        result = handler(JobContext(job))
+    except Exception as e:
+        logger.exception("Job %s failed", job.id)
+        Job.objects.filter(id=job.id).update(
+            status=Job.STATUS_FAILED,
+            error=str(e) or e.__class__.__name__,
+            finished_at=timezone.now(),
+        )
+    else:
+        Job.objects.filter(id=job.id).update(
+            status=Job.STATUS_DONE,
+            result=result,
+            finished_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale(timeout_seconds: int | None = None, max_attempts: int = 3) -> int:
+    """
+    Возвращает в очередь задачи, воркер которых перестал сообщать прогресс
+    (процесс упал или был перезапущен); после max_attempts попыток — failed.
+    """
+    timeout_seconds = timeout_seconds or getattr(settings, "JOBS_STALE_SECONDS", 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout_seconds)
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=Job.STATUS_FAILED,
+        error="Воркер перестал отвечать.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, worker="")
+    return failed + requeued
+
+
+def recover_stale(force: bool = False) -> int:
+    """
+    requeue_stale() не чаще раза в JOBS_RECOVERY_SECONDS на процесс (force — сразу).
+
+    С пулом потоков (JOBS_BACKEND="thread") очередь никто не опрашивает: задачи, которые
+    ждут в ней дольше JOBS_STALE_SECONDS (возвращённые requeue_stale или поставленные
+    процессом, перезапущенным до их выполнения), передаются пулу этого процесса.
+    Повторная передача безопасна — задачу выполнит только тот, кто её захватит.
+    """
+    global _last_recovery
+    now = time.monotonic()
+    with _recovery_lock:
+        if not force and now - _last_recovery < getattr(settings, "JOBS_RECOVERY_SECONDS", 30):
+            return 0
+        _last_recovery = now
+
+    recovered = requeue_stale()
+    if _thread_backend():
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, "JOBS_STALE_SECONDS", 600))
+        orphans = list(
+            Job.objects.filter(status=Job.STATUS_QUEUED, created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:100]
+        )
+        for job_id in orphans:
+            _submit(job_id)
+    return recovered
+
+
+def _run_one(job_id: int) -> None:
+    close_old_connections()
+    try:
+        if _claim_filter(Job.objects.filter(id=job_id), worker_name(threading.current_thread().name)):
+            run_job(Job.objects.get(id=job_id))
+    finally:
+        # Соединение потока пула не переиспользуется Django — закрываем сами
+        connection.close()
+
+
+def _submit(job_id: int) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "JOBS_THREAD_WORKERS", 2),
+                thread_name_prefix="finance-job",
+            )
+    _executor.submit(_run_one, job_id)
+
+
+def run_worker(
+    worker: str,
+    *,
+    kinds: Iterable[str] | None = None,
+    poll_interval: float = 1.0,
+    stop: threading.Event | None = None,
+    burst: bool = False,
+) -> int:
+    """
+    Цикл воркера: захватывает и выполняет задачи, пока не установлен stop
+    (burst=True — до опустошения очереди). Возвращает число выполненных задач.
+    """
+    stop = stop or threading.Event()
+    processed = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            recover_stale()
+            job = claim_next(worker, kinds)
+            if job is None:
+                if burst:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+            processed += 1
+    finally:
+        connection.close()
+    return processed
+
+
+# --- Обработчики -------------------------------------------------------------------------
+
+
+@register("reset_transactions")
+def reset_transactions_job(ctx: JobContext) -> dict:
+    """
+    Удаление операций пользователя (за период month/start_day или всех) порциями.
+    Повтор после падения воркера безопасен: удаляется то, что осталось.
+    """
+    from finance.deletion import count_transactions, delete_transactions
+    from finance.models import Transaction
+    from finance.periods import filter_by_period
+
+    qs = filter_by_period(Transaction.objects.filter(user_id=ctx.user_id), ctx.params)
+    # Вместе с исходными резервами удаляются их доли (в т.ч. вне периода)
+    ctx.set_total(count_transactions(qs))
+    deleted = delete_transactions(
+        qs,
+        chunk_size=int(ctx.params.get("chunk_size") or 1000),
+        on_progress=ctx.advance,
+    )
+    return {"deleted_transactions": deleted, "month": ctx.params.get("month")}
+
+
+@register("import_transactions")
+def import_transactions_job(ctx: JobContext) -> dict:
+    """
+    Импорт из файла, сохранённого view в JOBS_UPLOAD_DIR; файл удаляется после импорта.
+
+    Каждый чанк коммитится вместе с checkpoint задачи (номер последней строки и итоги);
+    после падения воркера повторная попытка пропускает уже записанные строки.
+    """
+    from django.contrib.auth.models import User
+
+    from finance.importer import ImportResult, import_transactions, iter_csv_rows, iter_jsonl_rows
+
+    path = ctx.params["path"]
+    user = User.objects.get(id=ctx.user_id)
+    resume = ctx.job.checkpoint or {}
+    ctx.set_total(os.path.getsize(path))
+    try:
+        with open(path, "rb") as f:
+            rows = iter_csv_rows(f) if ctx.params.get("file_format") == "csv" else iter_jsonl_rows(f)
+
+            def progress(chunk_rows: int) -> None:
+                # Прогресс — в байтах прочитанного файла (после последнего чанка файл уже закрыт)
+                pos = ctx.job.progress_total if f.closed else f.tell()
+                ctx.advance(max(0, pos - ctx.done))
+
+            result = import_transactions(
+                user,
+                rows,
+                on_chunk=progress,
+                start_row=resume.get("row", 0),
+                result=ImportResult.from_dict(resume["result"]) if "result" in resume else None,
+                checkpoint=lambda row, partial: ctx.save_checkpoint({"row": row, "result": partial.as_dict()}),
+            )
+    finally:
+        os.remove(path)
+    return result.as_dict()
+
+
+@register("rebuild_rollups")
+def rebuild_rollups_job(ctx: JobContext) -> dict:
+    from finance.rollups import rebuild_rollups
+
+    ctx.set_total(1)
+    written = rebuild_rollups(user_id=ctx.user_id)
+    ctx.advance()
+    return {"rows": written}
+
@@ -0,0 +1,154 @@
+"""
+Оценка лимитов бюджета (Category.limit) на сервере.
+
+Потраченное по категориям берётся одним сгруппированным запросом к агрегатам
+DailyRollup, поэтому клиенту не нужно скачивать все операции периода. Пакетная
+проверка для уведомлений (UserSettings.notify_limit_exceeded) обрабатывает всех
+пользователей сразу: по одному запросу на каждый встречающийся день начала периода.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from finance.models import Category
+from finance.models_settings_goals import UserSettings
+from finance.periods import MonthRange, period_to_range
+
+
+# Доля лимита, начиная с которой категория считается "близкой к лимиту"
+WARNING_RATIO = Decimal("0.8")
+
+
+@dataclass(frozen=True)
+class LimitStatus:
+    category_id: int
+    name: str
+    limit: Decimal | None
+    spent: Decimal
+    projected: Decimal
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.limit or self.limit <= 0:
+            return None
+        return float(self.spent / self.limit)
+
+    @property
+    def status(self) -> str:
+        ratio = self.ratio
+        if ratio is None:
+            return "no_limit"
+        if ratio >= 1:
+            return "exceeded"
+        if ratio >= WARNING_RATIO:
+            return "warning"
+        return "ok"
+
+    def as_dict(self) -> dict:
+        ratio = self.ratio
+        projected_ratio = None if ratio is None else float(self.projected / self.limit)
+        return {
+            "category_id": self.category_id,
+            "name": self.name,
+            "limit": None if self.limit is None else float(self.limit),
+            "spent": float(self.spent),
+            "ratio": ratio,
+            "projected": float(self.projected),
+            "projected_ratio": projected_ratio,
+            "status": self.status,
+        }
+
+
+def _spent_annotation(r: MonthRange):
+    zero = Value(Decimal("0.00"), output_field=DecimalField(max_digits=14, decimal_places=2))
+    return Coalesce(
+        Sum(
+            "daily_rollups__amount",
+            filter=Q(
+                daily_rollups__is_income=False,
+                daily_rollups__date__gte=r.start,
+                daily_rollups__date__lt=r.end,
+            ),
+        ),
+        zero,
+    )
+
+
+def project_spend(spent: Decimal, r: MonthRange, today: date) -> Decimal:
+    """Линейный прогноз расходов на конец периода по темпу с его начала."""
+    total_days = (r.end - r.start).days
+    if today >= r.end or today < r.start:
+        return spent
+    elapsed = (today - r.start).days + 1
+    return (spent * total_days / elapsed).quantize(Decimal("0.01"))
+
+
+def limit_status(user, r: MonthRange, today: date | None = None) -> list[LimitStatus]:
+    """Статус по всем расходным категориям пользователя за период r."""
+    today = today or date.today()
+    rows = (
+        Category.objects.filter(user=user, type="expense")
+        .annotate(spent=_spent_annotation(r))
+        .values_list("id", "name", "limit", "spent")
+        .order_by("name")
+    )
+    items = [
+        LimitStatus(
+            category_id=pk,
+            name=name,
+            limit=limit,
+            spent=spent,
+            projected=project_spend(spent, r, today),
+        )
+        for pk, name, limit, spent in rows
+    ]
+    items.sort(key=lambda s: s.ratio if s.ratio is not None else -1, reverse=True)
+    return items
+
+
+def current_period(start_day: int, today: date) -> MonthRange:
+    """Бюджетный период (с днём начала start_day), содержащий today."""
+    month = today.strftime("%Y-%m")
+    r = period_to_range(month, start_day)
+    if today < r.start:
+        prev = (today.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+        r = period_to_range(prev, start_day)
+    return r
+
+
+def exceeded_limits_for_all(today: date | None = None, ratio: Decimal = Decimal("1")) -> dict[int, list[dict]]:
+    """
+    Категории с превышенным (spent >= limit * ratio) лимитом в текущем периоде
+    у всех пользователей с включённым notify_limit_exceeded: {user_id: [статусы]}.
+    """
+    today = today or date.today()
+    result: dict[int, list[dict]] = {}
+    start_days = (
+        UserSettings.objects.filter(notify_limit_exceeded=True)
+        .values_list("period_start_day", flat=True)
+        .distinct()
+    )
+    for start_day in start_days:
+        r = current_period(start_day, today)
+        rows = (
+            Category.objects.filter(
+                type="expense",
+                limit__gt=0,
+                user__settings__notify_limit_exceeded=True,
+                user__settings__period_start_day=start_day,
+            )
+            .annotate(spent=_spent_annotation(r))
+            .filter(spent__gte=F("limit") * ratio)
+            .values_list("user_id", "id", "name", "limit", "spent")
+            .order_by("user_id", "name")
+        )
+        for user_id, pk, name, limit, spent in rows:
+            status = LimitStatus(pk, name, limit, spent, project_spend(spent, r, today))
+            result.setdefault(user_id, []).append(status.as_dict())
+    return result
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.authentication import CachedJWTAuthentication, clear_user_cache
+from finance.views import SummaryView
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark of JWT authentication overhead per request: simplejwt's JWTAuthentication "
+        "(User lookup on every request) vs CachedJWTAuthentication (warm cache) vs stateless reads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", type=str, required=True, help="User to issue the token for")
+        parser.add_argument("--requests", type=int, default=5000, help="Authentications per mode")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if not user:
+            raise CommandError(f"User '{options['username']}' not found.")
+        token = str(AccessToken.for_user(user))
+        factory = RequestFactory()
+        view = SummaryView()
+
+        def make_request() -> Request:
+            request = factory.get("/api/summary/", HTTP_AUTHORIZATION=f"Bearer {token}")
+            return Request(request, parser_context={"view": view})
+
+        modes = [
+            ("simplejwt", JWTAuthentication, {}),
+            ("cached", CachedJWTAuthentication, {"JWT_STATELESS_READS": False}),
+            ("stateless", CachedJWTAuthentication, {"JWT_STATELESS_READS": True}),
+        ]
+        n = options["requests"]
+        self.stdout.write(f"{'mode':<10} {'us/req':>8} {'p95 us':>8} {'queries/req':>12}")
+        for name, auth_class, overrides in modes:
+            clear_user_cache()
+            auth = auth_class()
+            with override_settings(**overrides):
+                # Прогрев (в т.ч. заполнение кэша)
+                auth.authenticate(make_request())
+                requests = [make_request() for _ in range(n)]
+                samples = []
+                with CaptureQueriesContext(connection) as ctx:
+                    for request in requests:
+                        t0 = time.perf_counter()
+                        auth.authenticate(request)
+                        samples.append((time.perf_counter() - t0) * 1e6)
+            samples.sort()
+            self.stdout.write(
+                f"{name:<10} {statistics.mean(samples):>8.1f} {samples[int(len(samples) * 0.95)]:>8.1f} "
+                f"{len(ctx.captured_queries) / n:>12.2f}"
+            )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db import transaction as db_transaction
+from django.db.models import F
+
+from finance.conditional import bump_data_version
+from finance.deletion import delete_user
+from finance.models import Category, Transaction
+from finance.models_settings_goals import Goal
+
+
+BENCH_USERNAME = "bench-db-writes"
+
+
+def describe_database() -> list[str]:
+    db = settings.DATABASES["default"]
+    lines = [f"engine={db['ENGINE']} vendor={connection.vendor} CONN_MAX_AGE={db.get('CONN_MAX_AGE')}"]
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            pragmas = []
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas.append(f"{name}={cursor.fetchone()[0]}")
+        lines.append(" ".join(pragmas) + f" transaction_mode={db.get('OPTIONS', {}).get('transaction_mode')}")
+    return lines
+
+
+def set_journal_mode(mode: str) -> str:
+    """Меняет journal_mode SQLite и возвращает прежний."""
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        previous = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA journal_mode={mode}")
+    return previous
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent write benchmark (goal deposits + transaction inserts) against the configured "
+        "database. Compare configurations by re-running with different env, e.g. "
+        "SQLITE_TRANSACTION_MODE=DEFERRED or DATABASE_URL=postgres://..., and --journal-mode DELETE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=str, default="1,4,8", help="Comma-separated thread counts")
+        parser.add_argument("--ops", type=int, default=200, help="Write operations per thread")
+        parser.add_argument(
+            "--deposit-share", type=float, default=0.5, help="Share of goal deposits (rest: transaction inserts)"
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--journal-mode",
+            type=str,
+            default=None,
+            help="SQLite only: switch journal_mode (e.g. DELETE) for the run and restore it afterwards",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            thread_counts = [int(x) for x in options["threads"].split(",") if x.strip()]
+        except ValueError:
+            raise CommandError("--threads must be a comma-separated list of integers.")
+        ops = int(options["ops"])
+        deposit_share = float(options["deposit_share"])
+        journal_mode = options["journal_mode"]
+        if journal_mode and connection.vendor != "sqlite":
+            raise CommandError("--journal-mode applies to SQLite only.")
+
+        # Режим журнала хранится в файле базы — после прогона возвращаем прежний
+        previous_mode = set_journal_mode(journal_mode) if journal_mode else None
+        try:
+            self._run(thread_counts, ops, deposit_share, options["seed"])
+        finally:
+            if previous_mode:
+                set_journal_mode(previous_mode)
+
+    def _run(self, thread_counts: list[int], ops: int, deposit_share: float, seed: int) -> None:
+        for line in describe_database():
+            self.stdout.write(line)
+
+        User.objects.filter(username=BENCH_USERNAME).delete()
+        user = User.objects.create(username=BENCH_USERNAME)
+        category = Category.objects.create(user=user, name="Bench", type="expense")
+        goal = Goal.objects.create(
+            user=user, name="Bench", target_amount=Decimal("1000000"), due_date=date.today() + timedelta(days=365)
+        )
+
+        def deposit() -> None:
+            with db_transaction.atomic():
+                Goal.objects.filter(id=goal.id).update(saved_amount=F("saved_amount") + Decimal("1.00"))
+                bump_data_version([user.id])
+
+        def insert(rnd: random.Random) -> None:
+            # save() + сигналы: пересчёт агрегатов дня, инвалидация кэша, версия данных
+            Transaction.objects.create(
+                user=user,
+                category=category,
+                amount=Decimal(rnd.randint(100, 100000)) / 100,
+                date=date.today() - timedelta(days=rnd.randint(0, 60)),
+                is_income=False,
+            )
+
+        try:
+            self.stdout.write(f"{'threads':>7} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}  errors")
+            for n_threads in thread_counts:
+                latencies: list[float] = []
+                errors: Counter = Counter()
+                lock = threading.Lock()
+
+                def worker(i: int) -> None:
+                    rnd = random.Random(seed * 1000 + i)
+                    local_lat, local_err = [], Counter()
+                    try:
+                        for _ in range(ops):
+                            t0 = time.perf_counter()
+                            try:
+                                deposit() if rnd.random() < deposit_share else insert(rnd)
+                            except OperationalError as e:
+                                local_err[str(e)] += 1
+                                continue
+                            local_lat.append(time.perf_counter() - t0)
+                    finally:
+                        connection.close()
+                    with lock:
+                        latencies.extend(local_lat)
+                        errors.update(local_err)
+
+                threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+                started = time.perf_counter()
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                elapsed = time.perf_counter() - started
+
+                lat_ms = sorted(x * 1000 for x in latencies) or [0.0]
+                p95 = lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.95))]
+                err = ", ".join(f"{msg}: {cnt}" for msg, cnt in errors.items()) or "0"
+                self.stdout.write(
+                    f"{n_threads:>7} {len(latencies) / elapsed:>9.1f} {statistics.median(lat_ms):>8.1f} "
+                    f"{p95:>8.1f} {lat_ms[-1]:>8.1f}  {err}"
+                )
+        finally:
+            delete_user(user)
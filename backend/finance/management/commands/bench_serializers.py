@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from finance.deletion import delete_user
+from finance.fast_serializers import FastJSONRenderer, goals_data, transaction_columns, transactions_data
+from finance.models import Category, Transaction
+from finance.models_settings_goals import Goal
+from finance.pagination import TransactionCursorPagination
+from finance.serializers import GoalSerializer, TransactionSerializer
+
+
+BENCH_PREFIX = "bench-serializers-"
+# Проекции ?fields=..., на которых сверяются оба пути (None — все поля)
+PROJECTIONS = (None, ["id", "amount", "date"], ["comment", "created_at", "category", "is_income"])
+COMMENTS = ("", "Продукты", "кофе ☕", 'кавычки "и" \\ слэш', "строка\u2028разделитель", "x" * 200)
+
+
+def transaction_queryset(user):
+    return Transaction.objects.filter(user=user).order_by(*TransactionCursorPagination.ordering)
+
+
+def goal_queryset(user):
+    return Goal.objects.filter(user=user).order_by("due_date", "-created_at")
+
+
+def reference_transactions(user, fields=None) -> bytes:
+    return JSONRenderer().render(TransactionSerializer(transaction_queryset(user), many=True, fields=fields).data)
+
+
+def fast_transactions(user, fields=None) -> bytes:
+    names, columns, _ = transaction_columns(fields)
+    rows = transaction_queryset(user).values_list(*columns)
+    return FastJSONRenderer().render(transactions_data(rows, names))
+
+
+def reference_goals(user) -> bytes:
+    return JSONRenderer().render(GoalSerializer(goal_queryset(user), many=True).data)
+
+
+def fast_goals(user) -> bytes:
+    return FastJSONRenderer().render(goals_data(goal_queryset(user)))
+
+
+def seed(user, rows: int, rnd: random.Random) -> None:
+    """rows операций и rows целей (в т.ч. выполненные, просроченные и с нулевой суммой)."""
+    income = Category.objects.create(user=user, name="Зарплата", type="income")
+    expense = Category.objects.create(user=user, name="Продукты", type="expense")
+    today = date.today()
+    Transaction.objects.bulk_create(
+        (
+            Transaction(
+                user=user,
+                category=income if i % 7 == 0 else expense,
+                amount=Decimal(rnd.randint(1, 10**11)) / 100,
+                date=today - timedelta(days=rnd.randrange(730)),
+                is_income=i % 7 == 0,
+                is_reserved=i % 70 == 0,
+                reserve_months=3 if i % 70 == 0 else None,
+                comment=rnd.choice(COMMENTS),
+            )
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+    Goal.objects.bulk_create(
+        (
+            Goal(
+                user=user,
+                name=f"Цель {i}",
+                target_amount=Decimal(rnd.choice((0, rnd.randint(1, 10**9)))) / 100,
+                saved_amount=Decimal(rnd.randint(0, 10**9)) / 100,
+                due_date=today + timedelta(days=rnd.randint(-400, 1200)),
+            )
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+
+
+def timed(func, repeat: int) -> float:
+    """Медиана времени вызова, мс."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        "Byte-for-byte check and benchmark of the lean list path (finance.fast_serializers + orjson) "
+        "against DRF serializers + JSONRenderer for transactions and goals. Seeds a throwaway user "
+        "per size (--rows 1000,10000,100000), or with --verify-only compares both on existing users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=str, default="1000,10000,100000", help="Comma-separated row counts")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Keep seeded users")
+        parser.add_argument(
+            "--verify-only", action="store_true", help="Only compare both paths for existing users"
+        )
+
+    def verify(self, user) -> int:
+        failures = 0
+        checks = [
+            (f"transactions fields={fields}", reference_transactions(user, fields), fast_transactions(user, fields))
+            for fields in PROJECTIONS
+        ]
+        checks.append(("goals", reference_goals(user), fast_goals(user)))
+        for label, expected, actual in checks:
+            if expected != actual:
+                failures += 1
+                at = next(
+                    (i for i, (a, b) in enumerate(zip(expected, actual)) if a != b),
+                    min(len(expected), len(actual)),
+                )
+                self.stderr.write(
+                    f"{user.username} {label}: differs at byte {at}: "
+                    f"{expected[max(0, at - 40):at + 40]!r} != {actual[max(0, at - 40):at + 40]!r}"
+                )
+        return failures
+
+    def handle(self, *args, **options):
+        if options["verify_only"]:
+            failures = sum(self.verify(user) for user in User.objects.exclude(username__startswith=BENCH_PREFIX))
+            if failures:
+                raise CommandError(f"Output mismatches: {failures}")
+            self.stdout.write(self.style.SUCCESS("OK: fast path output matches the serializers byte for byte"))
+            return
+
+        try:
+            sizes = [int(x) for x in options["rows"].split(",") if x.strip()]
+        except ValueError:
+            raise CommandError("--rows must be a comma-separated list of integers.")
+        rnd = random.Random(options["seed"])
+        repeat = options["repeat"]
+
+        self.stdout.write(f"{'rows':>8} {'list':<13} {'serializer ms':>14} {'fast ms':>9} {'speedup':>8} {'bytes':>10}")
+        for size in sizes:
+            username = f"{BENCH_PREFIX}{size}"
+            for stale in User.objects.filter(username=username):
+                delete_user(stale)
+            user = User.objects.create(username=username)
+            try:
+                seed(user, size, rnd)
+                failures = self.verify(user)
+                if failures:
+                    raise CommandError(f"{username}: output mismatches: {failures}")
+                cases = (
+                    ("transactions", lambda: reference_transactions(user), lambda: fast_transactions(user)),
+                    ("goals", lambda: reference_goals(user), lambda: fast_goals(user)),
+                )
+                for label, reference, fast in cases:
+                    ref = timed(reference, repeat)
+                    new = timed(fast, repeat)
+                    self.stdout.write(
+                        f"{size:>8} {label:<13} {ref:>14.2f} {new:>9.2f} {ref / new:>7.1f}x {len(fast()):>10}"
+                    )
+            finally:
+                if not options["keep"]:
+                    delete_user(user)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import math
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min, Max, Q, Sum
+
+from finance.deletion import delete_user
+from finance.models import Category, DailyRollup, Transaction
+from finance.periods import resolve_period
+from finance.rollups import rebuild_rollups
+from finance.summary import compute_summary
+
+
+BENCH_PREFIX = "bench-summary-"
+CATEGORIES = (
+    ("Зарплата", "income"),
+    ("Фриланс", "income"),
+    ("Продукты", "expense"),
+    ("Транспорт", "expense"),
+    ("Кафе", "expense"),
+    ("Жильё", "expense"),
+    ("Связь", "expense"),
+    ("Здоровье", "expense"),
+)
+
+
+def reference_summary(user, params, category_names=None) -> dict:
+    """
+    Эталон: исходный расчёт SummaryView по сырым операциям на Decimal (до агрегатов
+    DailyRollup). category_names на результат не влияет — параметр для единообразия.
+    """
+    qs = Transaction.objects.filter(user=user)
+    r = resolve_period(params)
+    if r is not None:
+        qs = qs.filter(date__gte=r.start, date__lt=r.end)
+
+    reserved_roots = qs.filter(is_income=True, is_reserved=True, reserve_parent__isnull=True)
+    reserved_future_total = 0
+    reserved_available_total = 0
+    for tx in reserved_roots:
+        months = int(tx.reserve_months or 1)
+        if months <= 0:
+            months = 1
+        per = tx.amount / months
+        reserved_available_total += per
+        reserved_future_total += tx.amount - per
+
+    non_reserved_income_total = (
+        qs.filter(is_income=True)
+        .exclude(is_reserved=True, reserve_parent__isnull=True)
+        .aggregate(total=Sum("amount"))
+        .get("total")
+        or 0
+    )
+    income_total = non_reserved_income_total + reserved_available_total
+    expense_total = qs.filter(is_income=False).aggregate(total=Sum("amount")).get("total") or 0
+
+    def by_category(is_income: bool) -> dict[str, float]:
+        rows = qs.filter(is_income=is_income).values("category__name").annotate(total=Sum("amount"))
+        totals = {row["category__name"]: row["total"] for row in rows}
+        # Порядок при равных суммах в исходном view не задан — берём порядок движка (по имени)
+        return {name: float(total) for name, total in sorted(totals.items(), key=lambda item: (-item[1], item[0]))}
+
+    running = 0
+    daily_balance: dict[str, float] = {}
+    daily_rows = (
+        qs.values("date")
+        .annotate(income=Sum("amount", filter=Q(is_income=True)), expense=Sum("amount", filter=Q(is_income=False)))
+        .order_by("date")
+    )
+    for row in daily_rows:
+        running += (row["income"] or 0) - (row["expense"] or 0)
+        daily_balance[row["date"].isoformat()] = float(running)
+
+    return {
+        "balance": float(income_total - expense_total),
+        "income_total": float(income_total),
+        "expense_total": float(expense_total),
+        "income_by_category": by_category(True),
+        "expenses_by_category": by_category(False),
+        "daily_balance": daily_balance,
+        "reserved_future_total": float(reserved_future_total),
+    }
+
+
+def period_params(user) -> list[dict]:
+    """Все месяцы с данными (календарные и со start_day=10) и период «за всё время»."""
+    bounds = DailyRollup.objects.filter(user=user).aggregate(first=Min("date"), last=Max("date"))
+    params = [{}]
+    if bounds["first"] is None:
+        return params
+    y, m = bounds["first"].year, bounds["first"].month
+    while (y, m) <= (bounds["last"].year, bounds["last"].month):
+        month = f"{y:04d}-{m:02d}"
+        params += [{"month": month}, {"month": month, "start_day": "10"}]
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return params
+
+
+def same(a: float, b: float | None) -> bool:
+    # На SQLite эталон суммирует REAL, а Django приводит сумму к Decimal с 15 значащими
+    # цифрами, поэтому на больших итогах эталон расходится в последних разрядах
+    # (7122590.50999999 вместо .51) — это погрешность эталона, а не движка
+    return b is not None and math.isclose(a, b, rel_tol=1e-14, abs_tol=1e-6)
+
+
+def diff(expected: dict, actual: dict) -> list[str]:
+    """Расхождения сводок; порядок категорий сравнивается тоже (ключи JSON)."""
+    problems = []
+    for key, value in expected.items():
+        other = actual.get(key)
+        if isinstance(value, dict):
+            other = other or {}
+            if list(value) != list(other) or not all(same(v, other[k]) for k, v in value.items()):
+                problems.append(f"{key}: {value} != {other}")
+        elif not same(value, other):
+            problems.append(f"{key}: {value} != {other}")
+    return problems
+
+
+def seed(user, rows: int, days: int, rnd: random.Random) -> None:
+    """rows операций за последние days дней; ~1% из них — доходы-резервы с долями в следующих месяцах."""
+    categories = [
+        Category.objects.create(user=user, name=name, type=kind) for name, kind in CATEGORIES
+    ]
+    income = [c for c in categories if c.type == "income"]
+    expense = [c for c in categories if c.type == "expense"]
+    today = date.today()
+    batch: list[Transaction] = []
+    roots: list[Transaction] = []
+
+    def flush() -> None:
+        Transaction.objects.bulk_create(batch, batch_size=5000)
+        batch.clear()
+
+    for i in range(rows):
+        d = today - timedelta(days=rnd.randrange(days))
+        if rnd.random() < 0.15:
+            tx = Transaction(
+                user=user,
+                category=rnd.choice(income),
+                amount=Decimal(rnd.randint(1000, 20000000)) / 100,
+                date=d,
+                is_income=True,
+            )
+            if rnd.random() < 0.07:
+                tx.is_reserved = True
+                tx.reserve_months = rnd.choice((2, 3, 7))
+                roots.append(tx)
+        else:
+            tx = Transaction(
+                user=user,
+                category=rnd.choice(expense),
+                amount=Decimal(rnd.randint(1, 1000000)) / 100,
+                date=d,
+                is_income=False,
+            )
+        batch.append(tx)
+        if len(batch) >= 50000:
+            flush()
+    flush()
+
+    # Доли резервов в следующих месяцах (как distribute_to_future, без сигналов)
+    for root in roots:
+        share = (root.amount / root.reserve_months).quantize(Decimal("0.01"))
+        for k in range(1, root.reserve_months):
+            batch.append(
+                Transaction(
+                    user=user,
+                    category=root.category,
+                    amount=share,
+                    date=root.date + timedelta(days=31 * k),
+                    is_income=True,
+                    is_reserved=True,
+                    reserve_parent=root,
+                )
+            )
+    flush()
+    rebuild_rollups(user_id=user.id)
+
+
+def timed(func, repeat: int) -> float:
+    """Медиана времени вызова, мс."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark of the single-pass summary engine (finance.summary) against the original "
+        "Decimal implementation over raw transactions. Seeds a throwaway user per size "
+        "(--rows 1000,100000,1000000) and checks both agree before timing; the parity test "
+        "itself is finance.tests.test_summary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=str, default="1000,100000,1000000", help="Comma-separated row counts")
+        parser.add_argument("--days", type=int, default=730, help="Spread of seeded dates, days back from today")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per period")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Keep seeded users")
+
+    def verify(self, user) -> int:
+        names = dict(Category.objects.filter(user=user).values_list("id", "name"))
+        failures = 0
+        for params in period_params(user):
+            for category_names in (None, names):
+                expected = reference_summary(user, params, category_names)
+                problems = diff(expected, compute_summary(user, params, category_names))
+                if problems:
+                    failures += 1
+                    self.stderr.write(f"{user.username} {params}: " + "; ".join(problems))
+        return failures
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(x) for x in options["rows"].split(",") if x.strip()]
+        except ValueError:
+            raise CommandError("--rows must be a comma-separated list of integers.")
+        rnd = random.Random(options["seed"])
+        month = date.today().strftime("%Y-%m")
+
+        self.stdout.write(
+            f"{'rows':>9} {'rollups':>8} {'period':<8} {'reference ms':>13} {'engine ms':>10} {'speedup':>8}"
+        )
+        for size in sizes:
+            username = f"{BENCH_PREFIX}{size}"
+            for stale in User.objects.filter(username=username):
+                delete_user(stale)
+            user = User.objects.create(username=username)
+            try:
+                seed(user, size, options["days"], rnd)
+                failures = self.verify(user)
+                if failures:
+                    raise CommandError(f"{username}: summary mismatches: {failures}")
+                rollups = DailyRollup.objects.filter(user=user).count()
+                for label, params in (("all", {}), ("month", {"month": month})):
+                    ref = timed(lambda: reference_summary(user, params), options["repeat"])
+                    eng = timed(lambda: compute_summary(user, params), options["repeat"])
+                    self.stdout.write(
+                        f"{size:>9} {rollups:>8} {label:<8} {ref:>13.2f} {eng:>10.2f} {ref / eng:>7.1f}x"
+                    )
+            finally:
+                if not options["keep"]:
+                    delete_user(user)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.limits import exceeded_limits_for_all
+
+
+class Command(BaseCommand):
+    help = "Evaluate category limits for all users with notify_limit_exceeded enabled (batched)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=str, default=None, help="Evaluate as of YYYY-MM-DD (default: today)")
+        parser.add_argument(
+            "--ratio",
+            type=str,
+            default="1",
+            help="Report categories with spent >= limit * ratio (e.g. 0.8 for warnings)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options["date"]) if options["date"] else date.today()
+            ratio = Decimal(options["ratio"])
+        except (ValueError, ArithmeticError):
+            raise CommandError("Invalid --date or --ratio.")
+
+        result = exceeded_limits_for_all(today=today, ratio=ratio)
+        usernames = dict(User.objects.filter(id__in=result.keys()).values_list("id", "username"))
+        for user_id, items in result.items():
+            self.stdout.write(f"{usernames.get(user_id, user_id)}:")
+            for item in items:
+                self.stdout.write(
+                    f"  {item['name']}: spent={item['spent']:.2f} limit={item['limit']:.2f} "
+                    f"({item['ratio'] * 100:.0f}%, projected {item['projected']:.2f})"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Users over limit: {len(result)}"))
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from finance.models import Transaction
+from finance.query_plans import FULL_SCAN_PATTERNS, full_scans, hot_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on hot finance querysets and the hand-written report SQL (summary, "
+        "analytics, forecast) and fail if any of them falls back to a full table scan. "
+        "Run against a seeded DB (see seed_demo)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", type=str, default="admin")
+        parser.add_argument("--month", type=str, default=date.today().strftime("%Y-%m"))
+        parser.add_argument("--start-day", type=int, default=1)
+        parser.add_argument("--verbose-plans", action="store_true", help="Print full plans")
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f"Unsupported database vendor: {vendor}")
+
+        user = User.objects.filter(username=options["username"]).first()
+        if not user:
+            raise CommandError(f"User '{options['username']}' not found. Seed it first.")
+        if not Transaction.objects.filter(user=user).exists():
+            raise CommandError("User has no transactions; plans on empty tables are meaningless.")
+
+        failures = []
+        for name, plan in hot_plans(user, options["month"], options["start_day"]).items():
+            scans = full_scans(plan, vendor)
+            status = "FULL SCAN: " + ", ".join(scans) if scans else "ok"
+            self.stdout.write(f"{name}: {status}")
+            if options["verbose_plans"] or scans:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            if scans:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Full table scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot querysets and report queries use indexes"))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from finance.deletion import delete_user
+from finance.models import Category, Transaction, build_reserve_children
+from finance.views import TransactionViewSet
+
+
+CHECK_USERNAME = "check-reserve-edits"
+
+
+def children(root_id: int) -> list[tuple]:
+    return list(
+        Transaction.objects.filter(reserve_parent_id=root_id)
+        .order_by("date", "id")
+        .values_list("amount", "date", "comment")
+    )
+
+
+def expected_children(root: Transaction) -> list[tuple]:
+    return [(c.amount, c.date, c.comment) for c in build_reserve_children(root)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that edits of a reserved income keep its reserve shares consistent: PATCH and "
+        "/api/transactions/bulk/ partial updates (reserve_months only, amount, comment only, "
+        "unreserve) on a throwaway user. Exits non-zero on any mismatch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", action="store_true", help="Keep the check user and its data")
+
+    def handle(self, *args, **options):
+        for stale in User.objects.filter(username=CHECK_USERNAME):
+            delete_user(stale)
+        user = User.objects.create(username=CHECK_USERNAME)
+        factory = APIRequestFactory()
+        problems: list[str] = []
+
+        def call(method: str, path: str, view, data: dict, **kwargs):
+            request = getattr(factory, method)(path, data, format="json")
+            force_authenticate(request, user=user)
+            response = view(request, **kwargs)
+            if response.status_code >= 400:
+                problems.append(f"{method.upper()} {path} {data}: HTTP {response.status_code} {response.data}")
+            return response
+
+        patch = TransactionViewSet.as_view({"patch": "partial_update"})
+        bulk = TransactionViewSet.as_view({"post": "bulk"})
+
+        def expect(step: str, root_id: int, wanted: list[tuple] | None = None) -> None:
+            root = Transaction.objects.get(pk=root_id)
+            if root.is_reserved and not root.reserve_months:
+                problems.append(f"{step}: parent is_reserved without reserve_months")
+            actual = children(root_id)
+            wanted = expected_children(root) if wanted is None else wanted
+            if actual != wanted:
+                problems.append(f"{step}: shares {actual} != expected {wanted}")
+
+        try:
+            category = Category.objects.create(user=user, name="Фриланс", type="income")
+            root = Transaction.objects.create(
+                user=user,
+                category=category,
+                amount=Decimal("1000.00"),
+                date=date(2025, 1, 31),
+                is_income=True,
+                is_reserved=True,
+                reserve_months=3,
+                comment="x",
+            )
+            expect("create", root.id)
+            path = f"/api/transactions/{root.id}/"
+
+            call("patch", path, patch, {"reserve_months": 6}, pk=str(root.id))
+            expect("PATCH reserve_months only", root.id)
+            if len(children(root.id)) != 5:
+                problems.append("PATCH reserve_months only: expected 5 shares")
+
+            call("patch", path, patch, {"amount": "1200.00"}, pk=str(root.id))
+            expect("PATCH amount", root.id)
+
+            # Доля, изменённая вручную, переживает правку комментария исходной операции
+            edited = Transaction.objects.filter(reserve_parent_id=root.id).order_by("date").first()
+            if edited is not None:
+                Transaction.objects.filter(pk=edited.pk).update(amount=Decimal("1.00"))
+            before = children(root.id)
+            call("patch", path, patch, {"comment": "y"}, pk=str(root.id))
+            expect("PATCH comment only", root.id, before)
+
+            operations = [{"op": "update", "id": root.id, "data": {"reserve_months": 4}}]
+            call("post", "/api/transactions/bulk/", bulk, {"operations": operations})
+            expect("bulk reserve_months only", root.id)
+            if len(children(root.id)) != 3:
+                problems.append("bulk reserve_months only: expected 3 shares")
+
+            call("patch", path, patch, {"is_reserved": False}, pk=str(root.id))
+            expect("PATCH unreserve", root.id, [])
+            if Transaction.objects.get(pk=root.id).reserve_months is not None:
+                problems.append("PATCH unreserve: reserve_months not cleared")
+
+            if problems:
+                for problem in problems:
+                    self.stderr.write(problem)
+                raise CommandError("Reserve edit check failed")
+            self.stdout.write(self.style.SUCCESS("OK: reserve shares stay consistent across edits"))
+        finally:
+            if not options["keep"]:
+                delete_user(user)
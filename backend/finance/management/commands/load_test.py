@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+BACKEND_DIR = Path(settings.BASE_DIR)
+# asgi — async-view (finance.async_views), asgi-sync — те же синхронные DRF-view под ASGI
+PROFILES = ("runserver", "wsgi", "asgi", "asgi-sync")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(profile: str, port: int, workers: int, threads: int) -> subprocess.Popen:
+    env = {**os.environ, "DEBUG": "0", "ALLOWED_HOSTS": "127.0.0.1,localhost"}
+    if profile == "runserver":
+        cmd = [sys.executable, str(BACKEND_DIR / "manage.py"), "runserver", "--noreload", f"127.0.0.1:{port}"]
+    else:
+        env.update(
+            SERVER_PROFILE="asgi" if profile.startswith("asgi") else profile,
+            ASYNC_VIEWS="0" if profile == "asgi-sync" else "1",
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            WEB_CONCURRENCY=str(workers),
+            GUNICORN_THREADS=str(threads),
+            GUNICORN_ACCESSLOG="",
+            GUNICORN_LOGLEVEL="warning",
+        )
+        cmd = [sys.executable, "-m", "gunicorn", "-c", str(BACKEND_DIR / "config" / "gunicorn.conf.py")]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(host: str, port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/api/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server on {host}:{port} did not start in {timeout}s.")
+
+
+def run_load(host: str, port: int, path: str, token: str, concurrency: int, total: int) -> dict:
+    """total запросов к path из concurrency потоков (keep-alive соединение на поток)."""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker() -> None:
+        nonlocal errors
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local, local_errors = [], 0
+        headers = {"Authorization": f"Bearer {token}"}
+        for _ in iter(lambda: next(counter, None), None):
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    local_errors += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            local.append(time.perf_counter() - t0)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    lat_ms = sorted(x * 1000 for x in latencies) or [0.0]
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(lat_ms),
+        "p95": lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.95))],
+        "errors": errors,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "HTTP load test of /api/summary/, /api/transactions/ and /api/categories/: requests/sec and "
+        "p95 latency. Either against a running server (--url) or by spawning each serving profile (--profiles)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", type=str, required=True, help="User whose data is requested")
+        parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="Running server")
+        parser.add_argument(
+            "--profiles",
+            type=str,
+            default="",
+            help=f"Comma-separated profiles to spawn and compare: {', '.join(PROFILES)}",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Gunicorn processes for spawned profiles")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per process (wsgi profile)")
+        parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+        parser.add_argument("--path", action="append", default=None, help="Endpoint(s) to test (repeatable)")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if not user:
+            raise CommandError(f"User '{options['username']}' not found.")
+        token = str(AccessToken.for_user(user))
+
+        month = date.today().strftime("%Y-%m")
+        paths = options["path"] or [
+            f"/api/summary/?month={month}",
+            f"/api/transactions/?month={month}",
+            "/api/categories/",
+        ]
+        profiles = [p.strip() for p in options["profiles"].split(",") if p.strip()]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        targets = []
+        if profiles:
+            targets = [(p, "127.0.0.1", None) for p in profiles]
+        else:
+            url = urlsplit(options["url"])
+            targets = [(options["url"], url.hostname, url.port or 80)]
+
+        self.stdout.write(f"{'profile':<24} {'endpoint':<36} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+        for name, host, port in targets:
+            proc = None
+            if port is None:
+                port = free_port()
+                proc = spawn_server(name, port, options["workers"], options["threads"])
+            try:
+                wait_ready(host, port)
+                for path in paths:
+                    # Прогрев: соединения с БД, кэш отчётов
+                    run_load(host, port, path, token, options["concurrency"], options["concurrency"])
+                    r = run_load(host, port, path, token, options["concurrency"], options["requests"])
+                    self.stdout.write(
+                        f"{name:<24} {path.split('?')[0]:<36} {r['rps']:>8.1f} {r['p50']:>8.1f} "
+                        f"{r['p95']:>8.1f} {r['errors']:>6}"
+                    )
+            finally:
+                if proc is not None:
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=30)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
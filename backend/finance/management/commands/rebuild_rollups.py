@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.rollups import rebuild_rollups, verify_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailyRollup aggregates from raw transactions and/or verify them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", type=str, default=None, help="Only this user (default: all)")
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Do not rebuild, only compare stored aggregates with raw transactions",
+        )
+        parser.add_argument("--show", type=int, default=10, help="How many mismatches to print")
+
+    def handle(self, *args, **options):
+        username: str | None = options["username"]
+        verify_only: bool = bool(options["verify_only"])
+        show: int = int(options["show"])
+
+        user_id = None
+        if username:
+            user = User.objects.filter(username=username).first()
+            if not user:
+                raise CommandError(f"User '{username}' not found.")
+            user_id = user.id
+
+        if not verify_only:
+            written = rebuild_rollups(user_id=user_id)
+            self.stdout.write(f"Rebuilt rollups: rows={written}")
+
+        mismatches = verify_rollups(user_id=user_id)
+        for m in mismatches[:show]:
+            self.stdout.write(f"  {m.key}: expected={m.expected} actual={m.actual}")
+        if mismatches:
+            raise CommandError(f"Rollups differ from raw transactions: mismatches={len(mismatches)}")
+
+        self.stdout.write(self.style.SUCCESS("Rollups match raw transactions"))
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from finance.jobs import recover_stale, run_worker, worker_name
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (finance.jobs) against the database queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Worker threads in this process")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between queue polls")
+        parser.add_argument("--kind", action="append", default=None, help="Only these job kinds (repeatable)")
+        parser.add_argument("--burst", action="store_true", help="Exit when the queue is empty")
+
+    def handle(self, *args, **options):
+        workers = max(1, int(options["workers"]))
+        stop = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after current jobs...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        requeued = recover_stale(force=True)
+        if requeued:
+            self.stdout.write(f"Requeued/failed stale jobs: {requeued}")
+
+        counts = [0] * workers
+
+        def loop(i: int) -> None:
+            counts[i] = run_worker(
+                worker_name(f"w{i}"),
+                kinds=options["kind"],
+                poll_interval=options["poll_interval"],
+                stop=stop,
+                burst=options["burst"],
+            )
+
+        threads = [threading.Thread(target=loop, args=(i,), name=f"run_jobs-{i}") for i in range(workers)]
+        for t in threads:
+            t.start()
+        self.stdout.write(f"Started {workers} worker(s)")
+        # join() с таймаутом, чтобы главный поток продолжал получать сигналы
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=0.5)
+        self.stdout.write(self.style.SUCCESS(f"Processed jobs: {sum(counts)}"))
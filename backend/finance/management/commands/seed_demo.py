@@ -5,11 +5,15 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction as db_transaction
 
 from finance.models import Category, Transaction
+from finance.onboarding import create_user_defaults
+from finance.reserves import distribute_reserves
+from finance.rollups import deferred_rollups, rebuild_rollups
 
 
 @dataclass(frozen=True)
@@ -41,6 +45,86 @@ def money(v: float) -> Decimal:
     return Decimal(str(v)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
+def month_starts(months: int) -> list[date]:
+    """Первые числа последних N месяцев, включая текущий."""
+    today = date.today()
+    y, m = today.year, today.month
+    result: list[date] = []
+    for i in range(months):
+        mm = m - i
+        yy = y
+        while mm <= 0:
+            mm += 12
+            yy -= 1
+        result.append(date(yy, mm, 1))
+    return result
+
+
+def random_tx_fields(ms: date, days: int, income_cats: list[Category], expense_cats: list[Category]) -> dict:
+    """Случайная операция внутри месяца ms (поля для Transaction)."""
+    d = ms + timedelta(days=random.randint(0, max(0, days - 1)))
+
+    # Decide income vs expense (roughly 25% income)
+    is_income = random.random() < 0.25
+
+    if is_income:
+        cat = random.choice(income_cats)
+        # Salaries higher, gifts smaller, etc.
+        base = {
+            "Зарплата": random.uniform(60000, 140000),
+            "Стипендия": random.uniform(3000, 12000),
+            "Фриланс": random.uniform(5000, 45000),
+            "Подарки": random.uniform(500, 8000),
+        }.get(cat.name, random.uniform(3000, 30000))
+        amt = money(base)
+        is_reserved = random.random() < 0.12
+        # Резерв без количества месяцев не прошёл бы валидацию API. Срок берётся из суммы,
+        # а не из random: иначе тот же --seed дал бы другой набор операций
+        reserve_months = (2, 3, 6)[int(amt * 100) % 3] if is_reserved else None
+        comment = random.choice(
+            [
+                "",
+                "перевод",
+                "премия",
+                "подработка",
+                "бонус",
+            ]
+        )
+    else:
+        cat = random.choice(expense_cats)
+        base = {
+            "Еда": random.uniform(250, 2500),
+            "Жильё": random.uniform(15000, 45000),
+            "Транспорт": random.uniform(80, 1200),
+            "Связь": random.uniform(300, 1200),
+            "Развлечения": random.uniform(200, 5000),
+            "Здоровье": random.uniform(200, 6000),
+            "Покупки": random.uniform(300, 15000),
+        }.get(cat.name, random.uniform(100, 5000))
+        amt = money(base)
+        is_reserved = False
+        reserve_months = None
+        comment = random.choice(
+            [
+                "",
+                "карта",
+                "наличные",
+                "онлайн",
+                "скидка",
+            ]
+        )
+
+    return {
+        "category": cat,
+        "amount": amt,
+        "date": d,
+        "is_income": is_income,
+        "is_reserved": is_reserved,
+        "reserve_months": reserve_months,
+        "comment": comment,
+    }
+
+
 class Command(BaseCommand):
     help = "Seed demo categories and transactions for a user (no external libs)."
 
@@ -50,6 +134,18 @@ class Command(BaseCommand):
         parser.add_argument("--tx-per-month", type=int, default=60)
         parser.add_argument("--clear", action="store_true", help="Clear existing user data first")
         parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Build rows in memory and write them with bulk_create (fast path for load tests)",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk_create chunk")
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=None,
+            help="Seed N users named <username>1..<username>N (created if missing) instead of <username>",
+        )
 
     def handle(self, *args, **options):
         username: str = options["username"]
@@ -57,135 +153,126 @@ class Command(BaseCommand):
         tx_per_month: int = int(options["tx_per_month"])
         clear: bool = bool(options["clear"])
         seed: int = int(options["seed"])
+        bulk: bool = bool(options["bulk"])
+        batch_size: int = int(options["batch_size"])
+        users_count: int | None = options["users"]
 
         if months <= 0 or tx_per_month <= 0:
             raise CommandError("--months and --tx-per-month must be > 0")
+        if batch_size <= 0 or (users_count is not None and users_count <= 0):
+            raise CommandError("--batch-size and --users must be > 0")
 
         random.seed(seed)
 
-        user = User.objects.filter(username=username).first()
-        if not user:
-            raise CommandError(f"User '{username}' not found. Create it first.")
+        if users_count is None:
+            user = User.objects.filter(username=username).first()
+            if not user:
+                raise CommandError(f"User '{username}' not found. Create it first.")
+            users = [user]
+        else:
+            users = self._ensure_users([f"{username}{i}" for i in range(1, users_count + 1)])
 
-        with db_transaction.atomic():
-            if clear:
-                Transaction.objects.filter(user=user).delete()
-                Category.objects.filter(user=user).delete()
-
-            # Ensure categories exist
-            income_cats = []
-            for c in INCOME_CATS:
-                obj, _ = Category.objects.get_or_create(
-                    user=user, name=c.name, defaults={"type": c.type, "limit": None}
-                )
-                # In case it existed with different type, normalize
-                if obj.type != "income":
-                    obj.type = "income"
-                    obj.limit = None
-                    obj.save(update_fields=["type", "limit"])
-                income_cats.append(obj)
-
-            expense_cats = []
-            for c in EXPENSE_CATS:
-                obj, _ = Category.objects.get_or_create(
-                    user=user,
-                    name=c.name,
-                    defaults={"type": c.type, "limit": c.limit},
-                )
-                if obj.type != "expense":
-                    obj.type = "expense"
-                obj.limit = c.limit
-                obj.save(update_fields=["type", "limit"])
-                expense_cats.append(obj)
-
-            # Generate transactions across last N months, including current month
-            today = date.today()
-            first_month = date(today.year, today.month, 1)
-            month_starts: list[date] = []
-            y, m = first_month.year, first_month.month
-            for i in range(months):
-                mm = m - i
-                yy = y
-                while mm <= 0:
-                    mm += 12
-                    yy -= 1
-                month_starts.append(date(yy, mm, 1))
-
-            created = 0
-            for ms in month_starts:
-                # month end (exclusive)
-                if ms.month == 12:
-                    me = date(ms.year + 1, 1, 1)
+        created = 0
+        for user in users:
+            with db_transaction.atomic(), deferred_rollups():
+                if clear:
+                    Transaction.objects.filter(user=user).delete()
+                    Category.objects.filter(user=user).delete()
+
+                income_cats, expense_cats = self._ensure_categories(user)
+                if bulk:
+                    created += self._seed_bulk(user, months, tx_per_month, batch_size, income_cats, expense_cats)
                 else:
-                    me = date(ms.year, ms.month + 1, 1)
-
-                days = (me - ms).days
-                # Distribute tx through the month
-                for _ in range(tx_per_month):
-                    d = ms + timedelta(days=random.randint(0, max(0, days - 1)))
-
-                    # Decide income vs expense (roughly 25% income)
-                    is_income = random.random() < 0.25
-
-                    if is_income:
-                        cat = random.choice(income_cats)
-                        # Salaries higher, gifts smaller, etc.
-                        base = {
-                            "Зарплата": random.uniform(60000, 140000),
-                            "Стипендия": random.uniform(3000, 12000),
-                            "Фриланс": random.uniform(5000, 45000),
-                            "Подарки": random.uniform(500, 8000),
-                        }.get(cat.name, random.uniform(3000, 30000))
-                        amt = money(base)
-                        is_reserved = random.random() < 0.12
-                        comment = random.choice(
-                            [
-                                "",
-                                "перевод",
-                                "премия",
-                                "подработка",
-                                "бонус",
-                            ]
-                        )
-                    else:
-                        cat = random.choice(expense_cats)
-                        base = {
-                            "Еда": random.uniform(250, 2500),
-                            "Жильё": random.uniform(15000, 45000),
-                            "Транспорт": random.uniform(80, 1200),
-                            "Связь": random.uniform(300, 1200),
-                            "Развлечения": random.uniform(200, 5000),
-                            "Здоровье": random.uniform(200, 6000),
-                            "Покупки": random.uniform(300, 15000),
-                        }.get(cat.name, random.uniform(100, 5000))
-                        amt = money(base)
-                        is_reserved = False
-                        comment = random.choice(
-                            [
-                                "",
-                                "карта",
-                                "наличные",
-                                "онлайн",
-                                "скидка",
-                            ]
-                        )
-
-                    Transaction.objects.create(
-                        user=user,
-                        category=cat,
-                        amount=amt,
-                        date=d,
-                        is_income=is_income,
-                        is_reserved=is_reserved,
-                        comment=comment,
-                    )
-                    created += 1
+                    created += self._seed_rows(user, months, tx_per_month, income_cats, expense_cats)
 
+        target = f"user={username}" if users_count is None else f"users={username}1..{username}{users_count}"
         self.stdout.write(
             self.style.SUCCESS(
-                f"Seeded for user={username}: categories={len(INCOME_CATS)+len(EXPENSE_CATS)}, transactions_created={created}"
+                f"Seeded for {target}: categories={len(INCOME_CATS)+len(EXPENSE_CATS)}, transactions_created={created}"
             )
         )
 
+    def _ensure_users(self, usernames: list[str]) -> list[User]:
+        existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        new_names = [name for name in usernames if name not in existing]
+        with db_transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=name, password=make_password(None)) for name in new_names],
+                batch_size=1000,
+            )
+            # bulk_create не отправляет post_save — настройки и стартовые категории
+            # создаём тем же помощником, что и регистрация
+            create_user_defaults(User.objects.filter(username__in=new_names).values_list("id", flat=True))
+        return list(User.objects.filter(username__in=usernames).order_by("id"))
+
+    def _ensure_categories(self, user: User) -> tuple[list[Category], list[Category]]:
+        income_cats = []
+        for c in INCOME_CATS:
+            obj, _ = Category.objects.get_or_create(
+                user=user, name=c.name, defaults={"type": c.type, "limit": None}
+            )
+            # In case it existed with different type, normalize
+            if obj.type != "income":
+                obj.type = "income"
+                obj.limit = None
+                obj.save(update_fields=["type", "limit"])
+            income_cats.append(obj)
+
+        expense_cats = []
+        for c in EXPENSE_CATS:
+            obj, _ = Category.objects.get_or_create(
+                user=user,
+                name=c.name,
+                defaults={"type": c.type, "limit": c.limit},
+            )
+            if obj.type != "expense":
+                obj.type = "expense"
+            obj.limit = c.limit
+            obj.save(update_fields=["type", "limit"])
+            expense_cats.append(obj)
+        return income_cats, expense_cats
+
+    def _iter_tx_fields(self, months: int, tx_per_month: int, income_cats, expense_cats):
+        # Generate transactions across last N months, including current month
+        for ms in month_starts(months):
+            # month end (exclusive)
+            if ms.month == 12:
+                me = date(ms.year + 1, 1, 1)
+            else:
+                me = date(ms.year, ms.month + 1, 1)
+
+            days = (me - ms).days
+            # Distribute tx through the month
+            for _ in range(tx_per_month):
+                yield random_tx_fields(ms, days, income_cats, expense_cats)
+
+    def _seed_rows(self, user, months, tx_per_month, income_cats, expense_cats) -> int:
+        created = 0
+        for fields in self._iter_tx_fields(months, tx_per_month, income_cats, expense_cats):
+            Transaction.objects.create(user=user, **fields)
+            created += 1
+        return created
+
+    def _seed_bulk(self, user, months, tx_per_month, batch_size, income_cats, expense_cats) -> int:
+        """Пишет операции чанками через bulk_create, минуя Transaction.save и сигналы."""
+        created = 0
+        chunk: list[Transaction] = []
+
+        def flush() -> int:
+            Transaction.objects.bulk_create(chunk)
+            # pk родителей уже известны — дети-резервы пишутся одним запросом на чанк
+            distribute_reserves(chunk, update_rollups=False, batch_size=batch_size)
+            n = len(chunk)
+            chunk.clear()
+            return n
 
+        for fields in self._iter_tx_fields(months, tx_per_month, income_cats, expense_cats):
+            chunk.append(Transaction(user=user, **fields))
+            if len(chunk) >= batch_size:
+                created += flush()
+        if chunk:
+            created += flush()
 
+        # Сигналы при bulk_create не срабатывают — пересобираем агрегаты пользователя разом
+        rebuild_rollups(user_id=user.id)
+        return created
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from finance.deletion import delete_user
+from finance.goals import update_returning_supported
+from finance.management.commands.bench_db_writes import describe_database
+from finance.models_settings_goals import Goal, GoalDeposit
+from finance.views import GoalViewSet
+
+
+STRESS_USERNAME = "stress-goal-deposits"
+
+
+def check_ledger(goal: Goal, initial: Decimal, amounts: list[Decimal]) -> list[str]:
+    """
+    Проверяет, что ни одно пополнение не потеряно: итог цели и журнал сходятся
+    с успешными запросами, а balance_after журнала образуют непрерывную цепочку
+    (каждое пополнение применено поверх предыдущего ровно один раз).
+    """
+    problems = []
+    goal.refresh_from_db()
+    expected = initial + sum(amounts, Decimal("0"))
+    if goal.saved_amount != expected:
+        problems.append(f"saved_amount {goal.saved_amount} != expected {expected}")
+
+    entries = list(goal.deposits.order_by("balance_after", "id").values_list("amount", "balance_after"))
+    if len(entries) != len(amounts):
+        problems.append(f"ledger has {len(entries)} entries, {len(amounts)} deposits succeeded")
+    if sorted(a for a, _ in entries) != sorted(amounts):
+        problems.append("ledger amounts differ from the successful deposits")
+    balance = initial
+    for i, (amount, balance_after) in enumerate(entries):
+        balance += amount
+        if balance_after != balance:
+            problems.append(f"ledger chain broken at entry {i}: balance_after {balance_after} != {balance}")
+            break
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency stress test for goal deposits: runs --deposits POST .../deposit/ calls through "
+        "GoalViewSet from --threads threads against one goal, then verifies the goal balance and the "
+        "GoalDeposit ledger (no lost or duplicated deposits). Exits non-zero on any mismatch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--deposits", type=int, default=800, help="Total deposits across all threads")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Keep the stress user and its ledger")
+
+    def handle(self, *args, **options):
+        n_threads = max(1, options["threads"])
+        total = max(1, options["deposits"])
+        for line in describe_database():
+            self.stdout.write(line)
+        self.stdout.write(f"UPDATE ... RETURNING: {'yes' if update_returning_supported(connection) else 'no'}")
+
+        for stale in User.objects.filter(username=STRESS_USERNAME):
+            delete_user(stale)
+        user = User.objects.create(username=STRESS_USERNAME)
+        initial = Decimal("100.00")
+        goal = Goal.objects.create(
+            user=user,
+            name="Stress",
+            target_amount=Decimal("9999999999.99"),
+            saved_amount=initial,
+            due_date=date.today() + timedelta(days=365),
+        )
+        view = GoalViewSet.as_view({"post": "deposit"})
+        factory = APIRequestFactory()
+
+        succeeded: list[Decimal] = []
+        latencies: list[float] = []
+        errors: Counter = Counter()
+        lock = threading.Lock()
+        start = threading.Barrier(n_threads)
+
+        def worker(i: int) -> None:
+            rnd = random.Random(options["seed"] * 1000 + i)
+            count = total // n_threads + (1 if i < total % n_threads else 0)
+            local_ok, local_lat, local_err = [], [], Counter()
+            try:
+                start.wait()
+                for _ in range(count):
+                    amount = Decimal(rnd.randint(1, 100000)) / 100
+                    request = factory.post(f"/api/goals/{goal.id}/deposit/", {"amount": str(amount)}, format="json")
+                    force_authenticate(request, user=user)
+                    t0 = time.perf_counter()
+                    try:
+                        response = view(request, pk=str(goal.id))
+                    except Exception as e:  # noqa: BLE001 — считаем и продолжаем
+                        local_err[f"{type(e).__name__}: {e}"] += 1
+                        continue
+                    if response.status_code != 200:
+                        local_err[f"HTTP {response.status_code}"] += 1
+                        continue
+                    local_lat.append(time.perf_counter() - t0)
+                    local_ok.append(amount)
+            finally:
+                connection.close()
+            with lock:
+                succeeded.extend(local_ok)
+                latencies.extend(local_lat)
+                errors.update(local_err)
+
+        try:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            lat_ms = sorted(x * 1000 for x in latencies) or [0.0]
+            p95 = lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.95))]
+            self.stdout.write(
+                f"threads={n_threads} deposits={len(succeeded)}/{total} {len(succeeded) / elapsed:.1f}/s "
+                f"p50={statistics.median(lat_ms):.1f}ms p95={p95:.1f}ms max={lat_ms[-1]:.1f}ms"
+            )
+            for message, count in errors.items():
+                self.stderr.write(f"  {count} x {message}")
+
+            problems = check_ledger(goal, initial, succeeded)
+            if errors:
+                problems.append(f"{sum(errors.values())} deposits failed")
+            if problems:
+                for problem in problems:
+                    self.stderr.write(problem)
+                raise CommandError("Goal deposit stress test failed")
+            entries = GoalDeposit.objects.filter(goal=goal).count()
+            self.stdout.write(
+                self.style.SUCCESS(f"OK: {entries} ledger entries, balance {initial} -> {goal.saved_amount}")
+            )
+        finally:
+            if not options["keep"]:
+                delete_user(user)
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:15
+
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model("finance", "Transaction")
+    DailyRollup = apps.get_model("finance", "DailyRollup")
+    root_q = models.Q(is_income=True, is_reserved=True, reserve_parent__isnull=True)
+
+    rows = {}
+    grouped = (
+        Transaction.objects.values("user_id", "date", "category_id", "is_income")
+        .annotate(
+            total=models.Sum("amount"),
+            reserved_total=models.Sum("amount", filter=root_q),
+            cnt=models.Count("id"),
+        )
+        .order_by()
+    )
+    for row in grouped:
+        key = (row["user_id"], row["date"], row["category_id"], row["is_income"])
+        rows[key] = DailyRollup(
+            user_id=row["user_id"],
+            date=row["date"],
+            category_id=row["category_id"],
+            is_income=row["is_income"],
+            amount=row["total"] or Decimal("0.00"),
+            reserved_amount=row["reserved_total"] or Decimal("0.00"),
+            reserved_available=Decimal("0"),
+            tx_count=row["cnt"],
+        )
+    roots = Transaction.objects.filter(root_q).values_list(
+        "user_id", "date", "category_id", "amount", "reserve_months"
+    )
+    for user_id, d, category_id, amount, months in roots:
+        months = max(1, int(months or 1))
+        rows[(user_id, d, category_id, True)].reserved_available += amount / months
+    for obj in rows.values():
+        obj.reserved_available = obj.reserved_available.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+    DailyRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0004_transaction_reserve_parent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_income', models.BooleanField()),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('reserved_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('reserved_available', models.DecimalField(decimal_places=6, default=Decimal('0.000000'), max_digits=18)),
+                ('tx_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'date', 'category', 'is_income'), name='finance_dailyrollup_unique_key'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_dailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='finance_tx_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'is_income', 'date'], name='finance_tx_user_income_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_reserved', True), ('reserve_parent__isnull', True)), fields=['user', 'date'], name='finance_tx_reserved_root_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersettings',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
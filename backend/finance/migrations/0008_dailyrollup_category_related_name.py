@@ -0,0 +1,19 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_usersettings_data_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyrollup',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='finance.category'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_goaldeposit'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailyrollup',
+            name='reserved_available',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0011_remove_dailyrollup_reserved_available'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='categories', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='dailyrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='goal',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='goals', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='goaldeposit',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='goal_deposits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='transactions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='usersettings',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, related_name='settings', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
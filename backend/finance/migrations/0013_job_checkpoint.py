@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_user_fk_do_nothing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='checkpoint',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
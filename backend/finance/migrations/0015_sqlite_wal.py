@@ -0,0 +1,29 @@
+# Режим журнала WAL хранится в самом файле SQLite, поэтому включается один раз
+# при migrate, а не PRAGMA на каждом соединении (та переписывала заголовок базы
+# при любой команде manage.py, даже check).
+
+from django.db import migrations
+
+
+def set_journal_mode(mode):
+    def apply(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != "sqlite":
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode={mode}")
+
+    return apply
+
+
+class Migration(migrations.Migration):
+    # Сменить режим журнала внутри транзакции SQLite не даёт
+    atomic = False
+
+    dependencies = [
+        ('finance', '0014_user_fk_cascade'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_journal_mode("WAL"), set_journal_mode("DELETE")),
+    ]
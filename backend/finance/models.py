@@ -3,32 +3,26 @@ from __future__ import annotations
 from django.contrib.auth.models import User
 from django.db import models
 
-from finance.models_settings_goals import Goal, UserSettings  # noqa: F401
+from finance.models_settings_goals import Goal, GoalDeposit, UserSettings  # noqa: F401
+from finance.models_rollups import DailyRollup  # noqa: F401
+from finance.models_jobs import Job  # noqa: F401
 
 
-def distribute_to_future(tx: "Transaction") -> None:
+def build_reserve_children(tx: "Transaction") -> list["Transaction"]:
     """
-    Реализация распределения дохода на будущие месяцы (резерв).
+    Строит (без сохранения) будущие доходы-доли для дохода-резерва tx.
 
-    Правило прототипа:
-    - В БД сохраняется исходная транзакция-доход на полную сумму (amount), is_reserved=True
-    - Дополнительно создаются "виртуальные" доходы на следующие месяцы
-      (amount / reserve_months) с соответствующими датами.
-    - В текущем месяце в отчётах учитывается только доля (amount/reserve_months),
-      а оставшаяся часть считается "зарезервированной на будущее".
+    Дети создаются со 2-го месяца распределения: amount / reserve_months,
+    остаток копеек распределяется по первым месяцам (+0.01), чтобы сумма сошлась.
     """
 
     from decimal import Decimal, ROUND_HALF_UP
 
     if tx.reserve_parent_id is not None:
-        return
+        return []
     months = int(tx.reserve_months or 1)
     if months <= 1:
-        return
-
-    # Не создаём дубликаты при повторных сохранениях
-    if tx.reserve_children.exists():
-        return
+        return []
 
     total = tx.amount
     per = (total / Decimal(months)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
@@ -48,7 +42,6 @@ def distribute_to_future(tx: "Transaction") -> None:
         day = min(d.day, monthrange(y, m)[1])
         return d.__class__(y, m, day)
 
-    # Создаем будущие транзакции (со 2-го месяца распределения)
     children = []
     for i in range(1, months):
         amt = per
@@ -58,8 +51,8 @@ def distribute_to_future(tx: "Transaction") -> None:
 
         children.append(
             Transaction(
-                user=tx.user,
-                category=tx.category,
+                user_id=tx.user_id,
+                category_id=tx.category_id,
                 amount=amt,
                 date=add_months(tx.date, i),
                 is_income=True,
@@ -69,7 +62,25 @@ def distribute_to_future(tx: "Transaction") -> None:
                 comment=(tx.comment or "") + " (резерв)",
             )
         )
-    Transaction.objects.bulk_create(children)
+    return children
+
+
+def distribute_to_future(tx: "Transaction") -> None:
+    """
+    Реализация распределения дохода на будущие месяцы (резерв).
+
+    Правило прототипа:
+    - В БД сохраняется исходная транзакция-доход на полную сумму (amount), is_reserved=True
+    - Дополнительно создаются "виртуальные" доходы на следующие месяцы
+      (amount / reserve_months) с соответствующими датами.
+    - В текущем месяце в отчётах учитывается только доля (amount/reserve_months),
+      а оставшаяся часть считается "зарезервированной на будущее".
+    """
+
+    # Пакетный сервис: проверка существующих детей и вставка — по одному запросу
+    from finance.reserves import distribute_reserves
+
+    distribute_reserves([tx])
 
 
 class Category(models.Model):
@@ -93,7 +104,9 @@ class Transaction(models.Model):
     """Универсальная модель для операций – доходов или расходов."""
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="transactions")
-    category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    # RESTRICT, а не PROTECT: категорию с операциями не удалить, но пользователя — можно
+    # (Collector доходит до Category.user раньше, чем до Transaction.user)
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     date = models.DateField()
     is_income = models.BooleanField()  # True для дохода, False для расхода
@@ -114,10 +127,67 @@ class Transaction(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Списки и выборки за период: user + диапазон date, сортировка -date, -created_at
+            models.Index(fields=["user", "-date", "-created_at"], name="finance_tx_user_date_idx"),
+            # Отчёты, разделённые на доходы/расходы
+            models.Index(fields=["user", "is_income", "date"], name="finance_tx_user_income_idx"),
+            # Исходные доходы-резервы (их немного, поэтому частичный индекс)
+            models.Index(
+                fields=["user", "date"],
+                condition=models.Q(is_reserved=True, reserve_parent__isnull=True),
+                name="finance_tx_reserved_root_idx",
+            ),
+        ]
+
+    # Поля, от которых зависят доли резерва (см. rebalance_reserves). Комментарий сюда
+    # не входит: его правка не должна перезаписывать доли, изменённые вручную
+    RESERVE_SOURCE_FIELDS = ("amount", "date", "reserve_months", "is_reserved", "is_income", "category_id")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_reserve_synced()
+        return instance
+
+    def mark_reserve_synced(self) -> None:
+        """Запоминает значения RESERVE_SOURCE_FIELDS, под которые построены доли."""
+        deferred = self.get_deferred_fields()
+        self._reserve_source = {
+            f: getattr(self, f) for f in self.RESERVE_SOURCE_FIELDS if f.removesuffix("_id") not in deferred
+        }
+
+    def reserve_source_changed(self) -> bool:
+        """Изменились ли поля, от которых зависят доли (без снимка — считаем, что да)."""
+        source = getattr(self, "_reserve_source", None)
+        if source is None:
+            return True
+        return any(
+            f not in source or getattr(self, f) != source[f] for f in self.RESERVE_SOURCE_FIELDS
+        )
+
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         super().save(*args, **kwargs)
         # Переопределяем сохранение, чтобы автоматически распределять резерв, если нужно
-        if self.is_income and self.is_reserved and self.reserve_parent_id is None:
-            distribute_to_future(self)  # создает виртуальные транзакции
+        if self.reserve_parent_id is not None:
+            return
+        if adding:
+            if self.is_income and self.is_reserved:
+                distribute_to_future(self)  # создает виртуальные транзакции
+            self.mark_reserve_synced()
+        else:
+            # Изменение суммы/даты/срока (или снятие резерва) — перебалансируем доли
+            from finance.reserves import rebalance_reserves
+
+            rebalance_reserves([self])
+
+    def delete(self, *args, **kwargs):
+        # Каскадно удаляются и дети-резервы: агрегаты по их дням пересчитываем одним проходом
+        from finance.rollups import deferred_rollups
+
+        with deferred_rollups():
+            return super().delete(*args, **kwargs)
 
 
@@ -0,0 +1,63 @@
+"""
+Фоновые задачи (очередь в БД).
+
+Тяжёлые операции (очистка операций, пересчёт агрегатов) не выполняются внутри запроса:
+view ставит Job в очередь и сразу возвращает его id, а воркер (см. finance.jobs и команду
+run_jobs) выполняет задачу порциями и пишет прогресс в строку задачи. Внешний брокер не
+нужен — очередью служит эта таблица.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Job(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "В очереди"),
+        (STATUS_RUNNING, "Выполняется"),
+        (STATUS_DONE, "Готово"),
+        (STATUS_FAILED, "Ошибка"),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="jobs", null=True, blank=True)
+    kind = models.CharField(max_length=64)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+
+    progress_done = models.PositiveBigIntegerField(default=0)
+    progress_total = models.PositiveBigIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    # Состояние, сохранённое обработчиком вместе с последней зафиксированной порцией:
+    # повторная попытка (requeue_stale) продолжает с него, а не с начала
+    checkpoint = models.JSONField(null=True, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=128, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Выборка следующей задачи воркером: WHERE status = 'queued' ORDER BY id
+            models.Index(fields=["status", "id"], name="finance_job_status_idx"),
+        ]
+
+    @property
+    def percent(self) -> int | None:
+        if not self.progress_total:
+            return 100 if self.status == self.STATUS_DONE else None
+        return min(100, int(self.progress_done * 100 / self.progress_total))
+
+    def __str__(self) -> str:
+        return f"{self.kind}#{self.id} ({self.status})"
@@ -0,0 +1,41 @@
+"""
+Материализованные агрегаты операций (rollup-таблицы) для быстрых отчётов.
+
+DailyRollup хранит суммы операций пользователя за день в разрезе категории и типа
+(доход/расход). Строки пересчитываются из сырых Transaction при каждом изменении
+(см. finance.rollups), поэтому SummaryView читает уже сгруппированные данные
+вместо сканирования всей истории операций.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class DailyRollup(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_rollups")
+    date = models.DateField()
+    category = models.ForeignKey("finance.Category", on_delete=models.CASCADE, related_name="daily_rollups")
+    is_income = models.BooleanField()
+
+    # Сумма всех операций (доходы-резервы учитываются целиком, как в сырых данных)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    # Часть amount, приходящаяся на исходные доходы-резервы (reserve_parent is NULL).
+    # Их доля amount / reserve_months здесь не хранится: это бесконечная дробь, и отчёты
+    # считают её точно по самим резервам (см. finance.summary)
+    reserved_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    tx_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date", "category", "is_income"],
+                name="finance_dailyrollup_unique_key",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.date} {self.category_id}: {self.amount}"
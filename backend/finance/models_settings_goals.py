@@ -1,6 +1,7 @@
 """
 Дополнительные модели приложения finance:
 - Goal: цель накопления
+- GoalDeposit: журнал пополнений цели
 - UserSettings: настройки приложения пользователя
 
 Вынесены в отдельный файл, чтобы оставить models.py близко к описанным пользователем
@@ -27,6 +28,28 @@ class Goal(models.Model):
         return f"{self.name}: {self.saved_amount}/{self.target_amount}"
 
 
+class GoalDeposit(models.Model):
+    """
+    Запись журнала пополнений (только добавляется, см. finance.goals.deposit_to_goal).
+    balance_after — накопленная сумма цели сразу после этого пополнения.
+    """
+
+    goal = models.ForeignKey(Goal, on_delete=models.CASCADE, related_name="deposits")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="goal_deposits")
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # История пополнений цели, новые сверху (keyset-пагинация по id)
+            models.Index(fields=["goal", "-id"], name="finance_deposit_goal_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.goal_id}: +{self.amount} = {self.balance_after}"
+
+
 class UserSettings(models.Model):
     THEME_CHOICES = [
         ("light", "Light"),
@@ -40,7 +63,19 @@ class UserSettings(models.Model):
     notify_limit_exceeded = models.BooleanField(default=True)
     notify_monthly_email = models.BooleanField(default=False)
 
+    # Версия данных пользователя: растёт при любой записи (ETag для conditional GET)
+    data_version = models.PositiveBigIntegerField(default=0)
+
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        # data_version меняется только через F()-update (finance.conditional): не затираем
+        # его значением, прочитанным до параллельной записи
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != "data_version"
+            ]
+        super().save(*args, **kwargs)
+
 
 
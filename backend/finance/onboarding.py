@@ -0,0 +1,150 @@
+"""
+Создание пользователей вместе с настройками и стартовыми категориями.
+
+Новому пользователю нужны строка UserSettings и стартовые категории. Всё это
+создаётся через bulk_create, без get_or_create и сигналов на каждую строку:
+- одна регистрация (сигнал post_save у User) — два INSERT;
+- пакетная загрузка (onboard_users, `manage.py onboard_users`) — на порцию
+  пользователей один SELECT существующих логинов и по INSERT пользователей,
+  настроек и категорий (Django сам делит большие INSERT по лимиту параметров БД).
+
+Сигналы Category/UserSettings (версия данных, кэш отчётов) при этом не
+отправляются — у только что созданного пользователя нет ни кэша, ни выданных ETag.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Iterable
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db import transaction as db_transaction
+
+from finance.models import Category
+from finance.models_settings_goals import UserSettings
+
+
+DEFAULT_CATEGORIES = [
+    # income
+    ("Зарплата", "income", None),
+    ("Стипендия", "income", None),
+    ("Фриланс", "income", None),
+    ("Подарки", "income", None),
+    # expense
+    ("Еда", "expense", Decimal("20000.00")),
+    ("Жильё", "expense", Decimal("35000.00")),
+    ("Транспорт", "expense", Decimal("7000.00")),
+    ("Связь", "expense", Decimal("1200.00")),
+    ("Развлечения", "expense", Decimal("8000.00")),
+]
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class NewUser:
+    """Пользователь для пакетного создания: логин = email, как в RegisterView."""
+
+    email: str
+    name: str = ""
+    # None — пароль не задан (set_unusable_password), вход после сброса пароля
+    password: str | None = None
+
+
+@dataclass
+class OnboardingStats:
+    created: int = 0
+    existing: int = 0
+    duplicates: int = 0
+
+
+def create_user_defaults(user_ids: Iterable[int], using: str = "default") -> None:
+    """UserSettings и стартовые категории для только что созданных пользователей."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    # Одна транзакция на оба INSERT (внутри уже открытой — без лишней точки сохранения)
+    with db_transaction.atomic(using=using, savepoint=False):
+        # ignore_conflicts: настройки могли уже создать (OneToOne по user) — это не ошибка
+        UserSettings.objects.using(using).bulk_create(
+            [UserSettings(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+        )
+        Category.objects.using(using).bulk_create(
+            [
+                Category(user_id=user_id, name=name, type=typ, limit=limit)
+                for user_id in user_ids
+                for name, typ, limit in DEFAULT_CATEGORIES
+            ]
+        )
+
+
+def _hash_passwords(passwords: list[str | None], workers: int) -> list[str]:
+    # Хэширование (PBKDF2) — основная часть времени; hashlib отпускает GIL, поэтому
+    # потоки действительно считают параллельно
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+def _create_batch(batch: list[NewUser], stats: OnboardingStats, hash_workers: int, using: str) -> list[User]:
+    unique: dict[str, NewUser] = {}
+    for person in batch:
+        email = person.email.strip().lower()
+        if email in unique:
+            stats.duplicates += 1
+        else:
+            unique[email] = person
+
+    existing = set(User.objects.using(using).filter(username__in=list(unique)).values_list("username", flat=True))
+    stats.existing += len(existing)
+    people = [(email, person) for email, person in unique.items() if email not in existing]
+    if not people:
+        return []
+
+    hashes = _hash_passwords([person.password for _, person in people], hash_workers)
+    users = [
+        User(username=email, email=email, first_name=person.name.strip(), password=password)
+        for (email, person), password in zip(people, hashes)
+    ]
+    with db_transaction.atomic(using=using):
+        users = User.objects.using(using).bulk_create(users)
+        if not connections[using].features.can_return_rows_from_bulk_insert:
+            # MySQL и др. не возвращают id из bulk_create — дочитываем по логинам
+            ids = dict(
+                User.objects.using(using).filter(username__in=[u.username for u in users]).values_list("username", "id")
+            )
+            for user in users:
+                user.id = ids[user.username]
+        create_user_defaults([user.id for user in users], using=using)
+    stats.created += len(users)
+    return users
+
+
+def onboard_users(
+    people: Iterable[NewUser],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    hash_workers: int | None = None,
+    using: str = "default",
+    on_progress: Callable[[OnboardingStats], None] | None = None,
+) -> OnboardingStats:
+    """
+    Создаёт пользователей порциями по batch_size (каждая — своя транзакция).
+    Уже существующие логины и повторы внутри порции пропускаются. Пароли хэшируются
+    в hash_workers потоках (по умолчанию — по числу CPU).
+    """
+    stats = OnboardingStats()
+    hash_workers = hash_workers or os.cpu_count() or 1
+    people = iter(people)
+    while batch := list(islice(people, batch_size)):
+        _create_batch(batch, stats, hash_workers, using)
+        if on_progress:
+            on_progress(stats)
+    return stats
@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) пагинация для списка операций.
+
+В отличие от OFFSET, следующая страница выбирается условием по ключу сортировки
+(date, created_at, id) последней строки, поэтому стоимость страницы не растёт с глубиной
+истории и опирается на индекс finance_tx_user_date_idx.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, "REST_FRAMEWORK", {}).get(name, default))
+
+
+class TransactionCursorPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-date", "-created_at", "-id")
+    invalid_cursor_message = "Некорректный курсор."
+
+    def get_page_size(self, request) -> int:
+        default = _setting("TRANSACTIONS_PAGE_SIZE", 100)
+        max_size = _setting("TRANSACTIONS_MAX_PAGE_SIZE", 1000)
+        raw = request.query_params.get(self.page_size_query_param)
+        if not raw:
+            return min(default, max_size)
+        try:
+            size = int(raw)
+        except ValueError:
+            return min(default, max_size)
+        return max(1, min(size, max_size))
+
+    def encode_cursor(self, obj) -> str:
+        return self.encode_key(obj.date, obj.created_at, obj.id)
+
+    def encode_key(self, d: date, created_at: datetime, pk: int) -> str:
+        payload = [d.isoformat(), created_at.isoformat(), pk]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            d, created_at, pk = json.loads(base64.urlsafe_b64decode(raw.encode()))
+            return date.fromisoformat(d), datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def page_queryset(self, queryset, request):
+        """Срез queryset для текущей страницы (+1 строка — признак следующей страницы)."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            d, created_at, pk = cursor
+            # date__lte дублирует первое условие, чтобы планировщик использовал индекс по диапазону
+            queryset = queryset.filter(date__lte=d).filter(
+                Q(date__lt=d)
+                | Q(date=d, created_at__lt=created_at)
+                | Q(date=d, created_at=created_at, id__lt=pk)
+            )
+        return queryset[: self.page_size + 1]
+
+    def finish_page(self, rows: list, key=None) -> list:
+        """
+        Отрезает лишнюю строку и запоминает курсор следующей страницы. rows — объекты
+        модели или (с key, возвращающим (date, created_at, id)) строки values_list.
+        """
+        self.has_next = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        self.next_cursor = None
+        if self.has_next:
+            self.next_cursor = self.encode_key(*key(page[-1])) if key else self.encode_cursor(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request) -> list:
+        """То же через async ORM (для finance.async_views)."""
+        return self.finish_page([obj async for obj in self.page_queryset(queryset, request)])
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class GoalDepositPagination(CursorPagination):
+    """История пополнений цели: новые сверху, курсор по id (индекс finance_deposit_goal_idx)."""
+
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Некорректный курсор."
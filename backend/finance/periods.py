@@ -0,0 +1,91 @@
+"""
+Бюджетные периоды: календарный месяц или месяц с пользовательским днём начала.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from django.db.models import DateField
+
+
+@dataclass(frozen=True)
+class MonthRange:
+    start: date
+    end: date
+
+
+def as_date(value) -> date:
+    """
+    Дата из значения поля DateField: до сохранения это может быть строка 'YYYY-MM-DD'
+    или datetime (ORM принимает их в create()/save() и сам не приводит атрибут).
+    """
+    return DateField().to_python(value)
+
+
+def month_to_range(month: str) -> MonthRange:
+    """
+    month: 'YYYY-MM'
+    """
+    year_s, month_s = month.split("-", 1)
+    y = int(year_s)
+    m = int(month_s)
+    start = date(y, m, 1)
+    if m == 12:
+        end = date(y + 1, 1, 1)
+    else:
+        end = date(y, m + 1, 1)
+    # end exclusive -> convert to inclusive by subtracting one day at query time if needed,
+    # but we use < end with range filters elsewhere. Here return [start, end).
+    return MonthRange(start=start, end=end)
+
+
+def clamp_day(year: int, month: int, day: int) -> int:
+    """Clamp start-day to existing day in month (e.g. 31 -> 30/28)."""
+    from calendar import monthrange
+
+    last = monthrange(year, month)[1]
+    return max(1, min(last, day))
+
+
+def period_to_range(month: str, start_day: int) -> MonthRange:
+    """
+    Budget period range for selected month with custom start_day.
+    Example: month=2025-12, start_day=10 -> [2025-12-10, 2026-01-10)
+    """
+    year_s, month_s = month.split("-", 1)
+    y = int(year_s)
+    m = int(month_s)
+    sd = clamp_day(y, m, int(start_day))
+    start = date(y, m, sd)
+
+    if m == 12:
+        ny, nm = y + 1, 1
+    else:
+        ny, nm = y, m + 1
+    ed = clamp_day(ny, nm, int(start_day))
+    end = date(ny, nm, ed)
+    return MonthRange(start=start, end=end)
+
+
+def resolve_period(params) -> MonthRange | None:
+    """Период из query-параметров month (YYYY-MM) и start_day (None — вся история)."""
+    month = params.get("month")
+    if not month:
+        return None
+    start_day = params.get("start_day")
+    if start_day:
+        return period_to_range(month, int(start_day))
+    return month_to_range(month)
+
+
+def filter_by_period(qs, params):
+    """
+    Ограничивает queryset (с полем date) периодом из query-параметров month/start_day.
+    Без month возвращает qs как есть.
+    """
+    r = resolve_period(params)
+    if r is None:
+        return qs
+    return qs.filter(date__gte=r.start, date__lt=r.end)
@@ -0,0 +1,105 @@
+"""
+EXPLAIN горячих запросов finance: querysets view и SQL отчётов (summary, analytics,
+forecast). Используется тестами finance.tests.test_query_plans и командой
+check_query_plans; запрос, упавший в полное сканирование таблицы, — регрессия плана.
+"""
+
+from __future__ import annotations
+
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q, Sum
+from django.http import QueryDict
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from finance.analytics import MonthRange, analytics_query, month_buckets
+from finance.forecast import DEFAULT_HISTORY, DEFAULT_MONTHS, forecast_buckets, forecast_query
+from finance.models import Category, DailyRollup, Transaction
+from finance.rollups import RESERVED_ROOT_Q
+from finance.periods import filter_by_period, period_to_range
+from finance.summary import summary_query
+from finance.views import TransactionViewSet
+
+
+# Признаки полного сканирования таблицы в выводе EXPLAIN. SQLite в планах SQL-запросов
+# называет таблицу псевдонимом (SCAN r), поэтому имя не ограничено префиксом finance_
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (?!CONSTANT ROW\b)(\w+)\b(?! USING (?:COVERING )?INDEX)"),
+    "postgresql": re.compile(r"Seq Scan on (finance_\w+)"),
+}
+
+EXPLAIN_SQL = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def hot_querysets(user: User, month: str, start_day: int) -> dict[str, object]:
+    """Querysets горячих путей API в том виде, в каком их строят view."""
+    params = QueryDict(mutable=True)
+    params.update({"month": month, "start_day": str(start_day)})
+
+    request = Request(APIRequestFactory().get("/api/transactions/", params))
+    request.user = user
+    # action задаёт роутер; без него view не знает, что это список (см. get_projection)
+    tx_view = TransactionViewSet(request=request, format_kwarg=None, action="list")
+
+    rollups = filter_by_period(DailyRollup.objects.filter(user=user), params)
+    period_tx = filter_by_period(Transaction.objects.filter(user=user), params)
+    return {
+        "transactions.list": tx_view.get_queryset(),
+        "transactions.list(all)": Transaction.objects.filter(user=user).order_by("-date", "-created_at"),
+        "summary.by_category": rollups.values("category__name", "is_income").annotate(
+            total=Sum("amount")
+        ),
+        "summary.daily": rollups.values("date")
+        .annotate(income=Sum("amount", filter=Q(is_income=True)))
+        .order_by("date"),
+        "transactions.expense_split": period_tx.filter(is_income=False)
+        .values("category_id")
+        .annotate(total=Sum("amount")),
+        "rollups.reserved_roots": period_tx.filter(RESERVED_ROOT_Q).values_list("date", "amount"),
+        "reset.transactions": period_tx.values("id"),
+    }
+
+
+def hot_statements(user: User, month: str, start_day: int) -> dict[str, tuple[str, list]]:
+    """SQL-запросы отчётов (summary, analytics, forecast) с параметрами, как их выполняют view."""
+    params = {"month": month, "start_day": str(start_day)}
+    category_names = dict(Category.objects.filter(user=user).values_list("id", "name"))
+    year, mon = int(month[:4]), int(month[5:7])
+    months = month_buckets((year - 1, mon), (year, mon), start_day if start_day > 1 else None)
+    span = MonthRange(months[0].range.start, months[-1].range.end)
+    previous = MonthRange(period_to_range(f"{year - 2:04d}-{mon:02d}", start_day).start, months[0].range.start)
+    today = period_to_range(month, start_day).start
+    return {
+        "summary": summary_query(user, params, category_names),
+        "summary(names)": summary_query(user, params),
+        "summary(all)": summary_query(user, {}),
+        "analytics.range": analytics_query(user, [span]),
+        "analytics.range(previous_year)": analytics_query(user, [span, previous]),
+        "forecast": forecast_query(
+            user, forecast_buckets(today, start_day, DEFAULT_HISTORY, DEFAULT_MONTHS), DEFAULT_HISTORY
+        ),
+    }
+
+
+def explain_sql(vendor: str, sql: str, params: list) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(EXPLAIN_SQL[vendor] + sql, params)
+        rows = cursor.fetchall()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: строка плана в единственном столбце
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def hot_plans(user: User, month: str, start_day: int) -> dict[str, str]:
+    """Планы всех горячих запросов: {имя: текст EXPLAIN}; SQL отчётов — с префиксом sql:."""
+    plans = {name: qs.explain() for name, qs in hot_querysets(user, month, start_day).items()}
+    for name, (sql, params) in hot_statements(user, month, start_day).items():
+        plans[f"sql:{name}"] = explain_sql(connection.vendor, sql, params)
+    return plans
+
+
+def full_scans(plan: str, vendor: str | None = None) -> list[str]:
+    """Таблицы (или псевдонимы), которые план читает полным сканированием."""
+    return sorted(set(FULL_SCAN_PATTERNS[vendor or connection.vendor].findall(plan)))
@@ -0,0 +1,158 @@
+"""
+Пакетное распределение доходов-резервов на будущие месяцы.
+
+Работает сразу с набором исходных операций: одна проверка существующих детей на весь
+набор, одна вставка недостающих, а при изменении суммы/даты/срока резерва —
+точечная перебалансировка (обновляются, добавляются или удаляются только отличающиеся
+строки-доли).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import transaction as db_transaction
+
+from finance.models import Transaction, build_reserve_children
+from finance.rollups import deferred_rollups, refresh_rollups
+
+
+# Поля доли, которые зависят от исходного дохода
+CHILD_SYNC_FIELDS = ("user_id", "category_id", "amount", "date", "comment")
+
+logger = logging.getLogger(__name__)
+
+
+def _is_reserve_root(tx: Transaction) -> bool:
+    return (
+        tx.pk is not None
+        and tx.reserve_parent_id is None
+        and tx.is_income
+        and tx.is_reserved
+        and int(tx.reserve_months or 1) > 1
+    )
+
+
+def _is_inconsistent(tx: Transaction) -> bool:
+    # Резерв без срока: доли по такой строке построить нельзя, а удалять их — потерять данные
+    return tx.is_income and tx.is_reserved and not tx.reserve_months
+
+
+def _refresh(dates_by_user: dict[int, set]) -> None:
+    for user_id, dates in dates_by_user.items():
+        refresh_rollups(user_id, dates)
+
+
+def distribute_reserves(
+    parents: Iterable[Transaction],
+    *,
+    update_rollups: bool = True,
+    batch_size: int = 1000,
+) -> list[Transaction]:
+    """
+    Создаёт доли для исходных доходов-резервов, у которых их ещё нет.
+
+    Возвращает созданные доли. update_rollups=False — если вызывающий сам
+    пересобирает агрегаты (например, массовая загрузка).
+    """
+    roots = [tx for tx in parents if _is_reserve_root(tx)]
+    if not roots:
+        return []
+
+    # Не создаём дубликаты при повторных вызовах — одна проверка на весь набор
+    with_children = set(
+        Transaction.objects.filter(reserve_parent_id__in=[tx.pk for tx in roots])
+        .values_list("reserve_parent_id", flat=True)
+        .distinct()
+    )
+    children = [
+        child
+        for tx in roots
+        if tx.pk not in with_children
+        for child in build_reserve_children(tx)
+    ]
+    Transaction.objects.bulk_create(children, batch_size=batch_size)
+
+    if update_rollups:
+        # bulk_create не отправляет сигналы — агрегаты по дням детей обновляем явно
+        dates_by_user: dict[int, set] = defaultdict(set)
+        for child in children:
+            dates_by_user[child.user_id].add(child.date)
+        _refresh(dates_by_user)
+    return children
+
+
+def rebalance_reserves(parents: Iterable[Transaction], *, force: bool = False) -> dict[str, int]:
+    """
+    Приводит доли исходных операций в соответствие с их текущими суммой, датой,
+    категорией и сроком резерва.
+
+    Существующие доли сопоставляются с ожидаемыми по порядку месяцев: совпадающие не
+    трогаются, отличающиеся обновляются одним bulk_update, недостающие добавляются,
+    лишние (срок сократился или резерв снят) удаляются.
+
+    Операции, у которых эти поля не менялись с загрузки (Transaction.reserve_source_changed),
+    пропускаются — иначе, например, правка комментария перезаписала бы доли, изменённые
+    вручную; force=True пересобирает доли всех переданных операций. Резерв без срока
+    (несогласованная строка) не трогается вовсе.
+    """
+    candidates = [tx for tx in parents if tx.pk is not None and tx.reserve_parent_id is None]
+    parents = []
+    for tx in candidates:
+        if _is_inconsistent(tx):
+            logger.warning("Transaction %s: is_reserved without reserve_months, reserve shares left as is", tx.pk)
+        elif force or tx.reserve_source_changed():
+            parents.append(tx)
+    stats = {"created": 0, "updated": 0, "deleted": 0}
+    if not parents:
+        return stats
+
+    existing: dict[int, list[Transaction]] = defaultdict(list)
+    for child in Transaction.objects.filter(
+        reserve_parent_id__in=[tx.pk for tx in parents]
+    ).order_by("date", "id"):
+        existing[child.reserve_parent_id].append(child)
+
+    to_create: list[Transaction] = []
+    to_update: list[Transaction] = []
+    to_delete: list[int] = []
+    dates_by_user: dict[int, set] = defaultdict(set)
+
+    for tx in parents:
+        current = existing.get(tx.pk, [])
+        desired = build_reserve_children(tx) if _is_reserve_root(tx) else []
+
+        for old, new in zip(current, desired):
+            if any(getattr(old, f) != getattr(new, f) for f in CHILD_SYNC_FIELDS):
+                dates_by_user[old.user_id].add(old.date)
+                for f in CHILD_SYNC_FIELDS:
+                    setattr(old, f, getattr(new, f))
+                dates_by_user[old.user_id].add(old.date)
+                to_update.append(old)
+        for new in desired[len(current):]:
+            dates_by_user[new.user_id].add(new.date)
+            to_create.append(new)
+        for old in current[len(desired):]:
+            dates_by_user[old.user_id].add(old.date)
+            to_delete.append(old.pk)
+
+    if not (to_create or to_update or to_delete):
+        for tx in parents:
+            tx.mark_reserve_synced()
+        return stats
+
+    with db_transaction.atomic(), deferred_rollups():
+        if to_update:
+            Transaction.objects.bulk_update(to_update, [f.removesuffix("_id") for f in CHILD_SYNC_FIELDS])
+        if to_create:
+            Transaction.objects.bulk_create(to_create)
+        if to_delete:
+            Transaction.objects.filter(id__in=to_delete).delete()
+        _refresh(dates_by_user)
+    for tx in parents:
+        tx.mark_reserve_synced()
+
+    stats.update(created=len(to_create), updated=len(to_update), deleted=len(to_delete))
+    return stats
@@ -0,0 +1,180 @@
+"""
+Поддержка rollup-таблицы DailyRollup в актуальном состоянии.
+
+Агрегаты не накапливаются дельтами, а пересчитываются из сырых операций по затронутым
+ключам (пользователь + день). Это идемпотентно: повторный пересчёт не может "разъехаться"
+с данными, а изменение операции (смена даты, категории, суммы) сводится к пересчёту
+старого и нового дня.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Q, QuerySet, Sum
+
+from finance.cache import invalidate_all, invalidate_dates, invalidate_user
+from finance.conditional import bump_data_version
+from finance.models import DailyRollup, Transaction
+from finance.models_settings_goals import UserSettings
+from finance.periods import as_date
+
+
+# Исходные доходы-резервы: в отчётах текущего месяца учитывается только их доля
+RESERVED_ROOT_Q = Q(is_income=True, is_reserved=True, reserve_parent__isnull=True)
+
+ROLLUP_FIELDS = ("amount", "reserved_amount", "tx_count")
+
+_state = threading.local()
+
+
+def _build_rollups(tx_qs: QuerySet) -> dict[tuple, DailyRollup]:
+    """Строит агрегаты (без сохранения) для операций из tx_qs."""
+    grouped = (
+        tx_qs.values("user_id", "date", "category_id", "is_income")
+        .annotate(
+            total=Sum("amount"),
+            reserved_total=Sum("amount", filter=RESERVED_ROOT_Q),
+            cnt=Count("id"),
+        )
+        .order_by()
+    )
+    result: dict[tuple, DailyRollup] = {}
+    for row in grouped:
+        key = (row["user_id"], row["date"], row["category_id"], row["is_income"])
+        result[key] = DailyRollup(
+            user_id=row["user_id"],
+            date=row["date"],
+            category_id=row["category_id"],
+            is_income=row["is_income"],
+            amount=row["total"] or Decimal("0.00"),
+            reserved_amount=row["reserved_total"] or Decimal("0.00"),
+            tx_count=row["cnt"],
+        )
+    return result
+
+
+def rebuild_rollups(
+    user_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    dates: Iterable[date] | None = None,
+) -> int:
+    """
+    Пересчитывает агрегаты по сырым операциям.
+
+    Фильтры сужают область пересчёта: пользователь, диапазон [start, end) и/или
+    конкретный набор дней. Без фильтров пересобирается вся таблица.
+    Возвращает количество записанных строк агрегатов.
+    """
+    tx_qs = Transaction.objects.all()
+    rollup_qs = DailyRollup.objects.all()
+    if user_id is not None:
+        tx_qs = tx_qs.filter(user_id=user_id)
+        rollup_qs = rollup_qs.filter(user_id=user_id)
+    if start is not None:
+        tx_qs = tx_qs.filter(date__gte=start)
+        rollup_qs = rollup_qs.filter(date__gte=start)
+    if end is not None:
+        tx_qs = tx_qs.filter(date__lt=end)
+        rollup_qs = rollup_qs.filter(date__lt=end)
+    if dates is not None:
+        dates = sorted(set(map(as_date, dates)))
+        if not dates:
+            return 0
+        tx_qs = tx_qs.filter(date__in=dates)
+        rollup_qs = rollup_qs.filter(date__in=dates)
+
+    with db_transaction.atomic():
+        # Удаление и вставка по уникальному ключу (user, date, category, is_income) должны
+        # идти по одному на пользователя: иначе на PostgreSQL две параллельные пересборки
+        # одних дней обе вставят строки и вторая упадёт с IntegrityError. Блокируем строку
+        # настроек (на SQLite FOR UPDATE не поддерживается и не нужен — BEGIN IMMEDIATE)
+        locks = UserSettings.objects.select_for_update().order_by("id")
+        if user_id is not None:
+            locks = locks.filter(user_id=user_id)
+        list(locks.values_list("id", flat=True))
+
+        rollup_qs.delete()
+        objs = list(_build_rollups(tx_qs).values())
+        DailyRollup.objects.bulk_create(objs, batch_size=1000)
+
+        # Закэшированные отчёты по затронутым периодам больше не актуальны
+        if user_id is None:
+            invalidate_all()
+        elif dates is not None:
+            invalidate_dates(user_id, dates)
+        else:
+            invalidate_user(user_id)
+        bump_data_version(None if user_id is None else [user_id])
+    return len(objs)
+
+
+def refresh_rollups(user_id: int, dates: Iterable[date]) -> None:
+    """
+    Пересчитывает агрегаты пользователя за указанные дни.
+
+    Внутри deferred_rollups() пересчёт откладывается до выхода из блока,
+    чтобы массовые операции не пересчитывали один и тот же день многократно.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending[user_id].update(map(as_date, dates))
+        return
+    rebuild_rollups(user_id=user_id, dates=dates)
+
+
+@contextmanager
+def deferred_rollups():
+    """Копит затронутые дни и пересчитывает их один раз при выходе из блока."""
+    if getattr(_state, "pending", None) is not None:
+        # Вложенный блок — пересчитает внешний
+        yield
+        return
+
+    _state.pending = defaultdict(set)
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+    for user_id, dates in pending.items():
+        rebuild_rollups(user_id=user_id, dates=dates)
+
+
+@dataclass(frozen=True)
+class RollupMismatch:
+    key: tuple
+    expected: dict | None
+    actual: dict | None
+
+
+def verify_rollups(user_id: int | None = None) -> list[RollupMismatch]:
+    """Сравнивает сохранённые агрегаты с пересчитанными по сырым операциям."""
+    tx_qs = Transaction.objects.all()
+    rollup_qs = DailyRollup.objects.all()
+    if user_id is not None:
+        tx_qs = tx_qs.filter(user_id=user_id)
+        rollup_qs = rollup_qs.filter(user_id=user_id)
+
+    def as_dict(obj: DailyRollup) -> dict:
+        return {f: getattr(obj, f) for f in ROLLUP_FIELDS}
+
+    expected = {key: as_dict(obj) for key, obj in _build_rollups(tx_qs).items()}
+    actual = {
+        (obj.user_id, obj.date, obj.category_id, obj.is_income): as_dict(obj)
+        for obj in rollup_qs.iterator()
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        if expected.get(key) != actual.get(key):
+            mismatches.append(RollupMismatch(key=key, expected=expected.get(key), actual=actual.get(key)))
+    return mismatches
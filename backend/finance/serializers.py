@@ -3,7 +3,8 @@ from __future__ import annotations
 from rest_framework import serializers
 
 from finance.models import Category, Transaction
-from finance.models_settings_goals import Goal, UserSettings
+from finance.models_jobs import Job
+from finance.models_settings_goals import Goal, GoalDeposit, UserSettings
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,7 +13,29 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ("id", "name", "type", "limit")
 
 
+class CategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    PK категории. При пакетной обработке категории берутся из заранее загруженной
+    карты context["categories"] (id -> Category), без запроса на каждый элемент.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context.get("categories")
+        if categories is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return categories[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class TransactionSerializer(serializers.ModelSerializer):
+    category = CategoryField(queryset=Category.objects.all())
+
     class Meta:
         model = Transaction
         fields = (
@@ -29,6 +52,13 @@ class TransactionSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "created_at", "reserve_parent")
 
+    def __init__(self, *args, fields=None, **kwargs):
+        # fields — необязательная проекция для списков (?fields=id,amount,date)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def validate(self, attrs):
         request = self.context.get("request")
         user = getattr(request, "user", None)
@@ -56,14 +86,22 @@ class TransactionSerializer(serializers.ModelSerializer):
                 }
             )
 
-        # Для расходов резерв запрещаем (по текущей модели)
+        # При частичном обновлении неуказанные поля резерва берём из сохранённой операции:
+        # иначе PATCH {"reserve_months": N} выглядел бы как снятие резерва
         is_reserved = attrs.get("is_reserved")
+        if is_reserved is None and self.instance is not None:
+            is_reserved = self.instance.is_reserved
+        if "reserve_months" in attrs:
+            reserve_months = attrs["reserve_months"]
+        else:
+            reserve_months = getattr(self.instance, "reserve_months", None)
+
+        # Для расходов резерв запрещаем (по текущей модели)
         if is_reserved and not is_income:
             raise serializers.ValidationError(
                 {"is_reserved": "Резервирование возможно только для доходов."}
             )
 
-        reserve_months = attrs.get("reserve_months")
         if is_income and is_reserved:
             if reserve_months is None:
                 raise serializers.ValidationError(
@@ -75,7 +113,7 @@ class TransactionSerializer(serializers.ModelSerializer):
                 )
         else:
             # если не резерв или не доход — поле должно быть пустым
-            if "reserve_months" in attrs:
+            if reserve_months is not None:
                 attrs["reserve_months"] = None
 
         return attrs
@@ -136,6 +174,13 @@ class GoalSerializer(serializers.ModelSerializer):
         return int(ceil(days / 30))
 
 
+class GoalDepositSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GoalDeposit
+        fields = ("id", "amount", "balance_after", "created_at")
+        read_only_fields = fields
+
+
 class UserSettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserSettings
@@ -147,3 +192,22 @@ class UserSettingsSerializer(serializers.ModelSerializer):
         )
 
 
+class JobSerializer(serializers.ModelSerializer):
+    percent = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "kind",
+            "status",
+            "progress_done",
+            "progress_total",
+            "percent",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
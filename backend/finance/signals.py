@@ -1,53 +1,94 @@
 from __future__ import annotations
 
-from decimal import Decimal
-
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from finance.models import Category
-from finance.models_settings_goals import UserSettings
-
-
-DEFAULT_CATEGORIES = [
-    # income
-    ("Зарплата", "income", None),
-    ("Стипендия", "income", None),
-    ("Фриланс", "income", None),
-    ("Подарки", "income", None),
-    # expense
-    ("Еда", "expense", Decimal("20000.00")),
-    ("Жильё", "expense", Decimal("35000.00")),
-    ("Транспорт", "expense", Decimal("7000.00")),
-    ("Связь", "expense", Decimal("1200.00")),
-    ("Развлечения", "expense", Decimal("8000.00")),
-]
+from finance.cache import invalidate_user
+from finance.conditional import bump_data_version
+from finance.deletion import delete_user_data
+from finance.models import Category, Transaction
+from finance.models_settings_goals import Goal, UserSettings
+from finance.onboarding import create_user_defaults
+from finance.periods import as_date
+from finance.rollups import refresh_rollups
 
 
 @receiver(post_save, sender=User)
-def ensure_user_settings_and_defaults(sender, instance: User, created: bool, **kwargs):
+def ensure_user_settings_and_defaults(sender, instance: User, created: bool, using: str = "default", **kwargs):
     """
-    Гарантирует, что:
-    - каждый пользователь имеет свои уникальные настройки (UserSettings OneToOne)
-    - при регистрации создаются стартовые категории (для удобства использования)
+    При регистрации создаёт настройки (UserSettings OneToOne) и стартовые категории —
+    двумя INSERT (finance.onboarding). Пакетное создание пользователей (onboard_users)
+    идёт через bulk_create без сигнала и создаёт то же самое само.
     """
     if not created:
         return
+    create_user_defaults([instance.id], using=using)
+
+
+def _deleted_with_user(origin) -> bool:
+    """Удаление идёт от User (экземпляра или queryset): данные уже удалил движок."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is User
+
+
+@receiver(pre_delete, sender=User)
+def delete_user_finance_data(sender, instance: User, **kwargs):
+    """
+    Удаляет данные finance пользователя движком finance.deletion (DELETE по диапазонам
+    id, агрегаты и кэш — им же) до того, как Collector начнёт удалять собранное каскадом:
+    его DELETE уже ничего не находят. CASCADE у связей с User остаётся страховкой.
+    """
+    delete_user_data(instance.id)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_transaction_rollup_key(sender, instance: Transaction, **kwargs):
+    """Запоминает прежние пользователя и дату операции, чтобы пересчитать и старый день."""
+    instance._rollup_prev = None
+    if instance.pk is not None:
+        prev = Transaction.objects.filter(pk=instance.pk).values_list("user_id", "date").first()
+        if prev is not None:
+            instance._rollup_prev = (prev[0], as_date(prev[1]))
+
+
+@receiver(post_save, sender=Transaction)
+def refresh_rollups_on_save(sender, instance: Transaction, raw: bool = False, **kwargs):
+    if raw:
+        return
+    prev = getattr(instance, "_rollup_prev", None)
+    if prev is not None and prev[0] != instance.user_id:
+        refresh_rollups(prev[0], [prev[1]])
+    dates = [as_date(instance.date)]
+    if prev is not None and prev[0] == instance.user_id:
+        dates.append(prev[1])
+    refresh_rollups(instance.user_id, dates)
 
-    UserSettings.objects.get_or_create(user=instance)
 
-    for name, typ, limit in DEFAULT_CATEGORIES:
-        obj, _ = Category.objects.get_or_create(
-            user=instance,
-            name=name,
-            defaults={"type": typ, "limit": limit},
-        )
-        # Если категория существовала (например, при повторном импорте) — нормализуем поля
-        if obj.type != typ or obj.limit != limit:
-            obj.type = typ
-            obj.limit = limit
-            obj.save(update_fields=["type", "limit"])
+@receiver(post_delete, sender=Transaction)
+def refresh_rollups_on_delete(sender, instance: Transaction, origin=None, **kwargs):
+    if _deleted_with_user(origin):
+        return
+    refresh_rollups(instance.user_id, [as_date(instance.date)])
+
 
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_reports_on_category_change(sender, instance: Category, origin=None, **kwargs):
+    if _deleted_with_user(origin):
+        return
+    # Имя категории попадает в отчёты за все периоды
+    invalidate_user(instance.user_id)
 
 
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=UserSettings)
+def bump_data_version_on_write(sender, instance, origin=None, **kwargs):
+    if _deleted_with_user(origin):
+        return
+    # Изменения операций учитываются при пересчёте агрегатов (finance.rollups)
+    bump_data_version([instance.user_id])
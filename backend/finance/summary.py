@@ -0,0 +1,169 @@
+"""
+Расчёт сводки за период одним запросом и одним проходом по его строкам.
+
+Запрос — UNION ALL трёх частей: группировки DailyRollup по категориям (итоги и
+исходные доходы-резервы) и по дням (чистый итог дня), плюс строки самих исходных
+доходов-резервов (их единицы, читаются по частичному индексу). Суммы приводятся к
+целым копейкам прямо в запросе, так что по строкам агрегатов в Python идёт только
+целочисленное сложение. Доля резерва amount / reserve_months — бесконечная дробь,
+поэтому она считается из строк резервов на Decimal, так же как в исходной сводке
+по сырым операциям (эталон, см. `manage.py bench_summary`): хранить её в агрегатах
+округлённой значило бы менять итоги в младших разрядах. Деление int / int в Python
+округляется так же, как float(Decimal). На SQLite движок даже точнее эталона: SUM по
+REAL-колонкам теряет копейки в младших разрядах на больших итогах.
+
+SQL собирается вручную (как в finance.deletion): построение такого запроса через ORM
+с аннотациями стоит столько же, сколько сам запрос, а строки читаются прямо из
+курсора без конвертеров Django для каждого значения.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db import connections
+
+from finance.models import Category, DailyRollup, Transaction
+from finance.periods import resolve_period
+
+
+CENTS = 100
+
+# Исходные доходы-резервы (условие частичного индекса finance_tx_reserved_root_idx)
+RESERVED_ROOT_SQL = "t.is_income AND t.is_reserved AND t.reserve_parent_id IS NULL"
+
+_SUMMARY_SQL = """
+SELECT {category} AS category, NULL AS day, r.is_income AS is_income,
+       CAST(SUM(ROUND(r.amount * {cents})) AS BIGINT) AS amount,
+       CAST(SUM(ROUND(r.reserved_amount * {cents})) AS BIGINT) AS reserved,
+       NULL AS months
+FROM {rollups} r {join}
+WHERE r.user_id = %s {period}
+GROUP BY {category}, r.is_income
+UNION ALL
+SELECT NULL, r.date, NULL,
+       CAST(SUM(ROUND(CASE WHEN r.is_income THEN r.amount ELSE -r.amount END * {cents})) AS BIGINT),
+       0, NULL
+FROM {rollups} r
+WHERE r.user_id = %s {period}
+GROUP BY r.date
+UNION ALL
+SELECT NULL, NULL, NULL, CAST(ROUND(t.amount * {cents}) AS BIGINT), 0, t.reserve_months
+FROM {transactions} t
+WHERE t.user_id = %s AND {roots} {period_t}
+"""
+
+
+def reserve_share(amount: Decimal, reserve_months: int | None) -> Decimal:
+    """Доля резерва, доступная в месяце поступления (amount / reserve_months)."""
+    months = int(reserve_months or 1)
+    if months <= 0:
+        months = 1
+    return amount / months
+
+
+def summary_query(user, params, category_names: dict[int, str] | None = None, using: str = "default"):
+    """SQL и параметры запроса fetch_summary_rows() (отдельно — для EXPLAIN в check_query_plans)."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    if category_names is not None:
+        category, join = "r.category_id", ""
+    else:
+        category = f"c.{qn('name')}"
+        join = f"JOIN {qn(Category._meta.db_table)} c ON c.id = r.category_id"
+
+    period, period_t, period_params = "", "", []
+    r = resolve_period(params)
+    if r is not None:
+        period = "AND r.date >= %s AND r.date < %s"
+        period_t = "AND t.date >= %s AND t.date < %s"
+        period_params = [connection.ops.adapt_datefield_value(d) for d in (r.start, r.end)]
+
+    sql = _SUMMARY_SQL.format(
+        category=category,
+        join=join,
+        period=period,
+        period_t=period_t,
+        roots=RESERVED_ROOT_SQL,
+        rollups=qn(DailyRollup._meta.db_table),
+        transactions=qn(Transaction._meta.db_table),
+        cents=CENTS,
+    )
+    return sql, [user.id, *period_params] * 3
+
+
+def fetch_summary_rows(user, params, category_names: dict[int, str] | None = None, using: str = "default"):
+    """
+    Строки сводки (category, day, is_income, amount, reserved, months):
+    - по категориям: day=None, суммы в копейках;
+    - по дням: category=None, is_income=None, amount — доходы минус расходы дня;
+    - исходные доходы-резервы: category=None, day=None, amount — сумма резерва в
+      копейках, months — reserve_months.
+    Категория — id, если передана уже загруженная карта category_names, иначе имя
+    (JOIN с категориями в том же запросе). Даты на SQLite приходят строками
+    'YYYY-MM-DD', признаки — 0/1 (summarize это учитывает).
+    """
+    sql, sql_params = summary_query(user, params, category_names, using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, sql_params)
+        return cursor.fetchall()
+
+
+def summarize(rows, category_names: dict[int, str] | None = None) -> dict:
+    """Сводка (JSON-совместимый dict) за один проход по строкам fetch_summary_rows()."""
+    income_raw = expense = reserved = 0
+    shares = future = Decimal(0)
+    income_by_key: dict = {}
+    expense_by_key: dict = {}
+    daily: dict = {}
+
+    for category, day, is_income, amount, reserved_amount, months in rows:
+        if day is not None:
+            daily[day] = daily.get(day, 0) + amount
+        elif category is None:
+            root = Decimal(amount).scaleb(-2)
+            share = reserve_share(root, months)
+            shares += share
+            future += root - share
+        elif is_income:
+            income_raw += amount
+            reserved += reserved_amount
+            income_by_key[category] = income_by_key.get(category, 0) + amount
+        else:
+            expense += amount
+            expense_by_key[category] = expense_by_key.get(category, 0) + amount
+
+    # Доходы-резервы учитываются только долей, доступной в текущем месяце
+    income_total = Decimal(income_raw - reserved).scaleb(-2) + shares
+
+    def by_category(totals: dict) -> dict[str, float]:
+        if category_names is not None:
+            # Карта по id: категории с одинаковым именем складываются, как в эталоне
+            named: dict[str, int] = {}
+            for category_id, total in totals.items():
+                name = category_names[category_id]
+                named[name] = named.get(name, 0) + total
+            totals = named
+        ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return {name: total / CENTS for name, total in ordered}
+
+    running = 0
+    daily_balance: dict[str, float] = {}
+    for day in sorted(daily):
+        running += daily[day]
+        daily_balance[day if isinstance(day, str) else day.isoformat()] = running / CENTS
+
+    return {
+        "balance": float(income_total - Decimal(expense).scaleb(-2)),
+        "income_total": float(income_total),
+        "expense_total": expense / CENTS,
+        "income_by_category": by_category(income_by_key),
+        "expenses_by_category": by_category(expense_by_key),
+        "daily_balance": daily_balance,
+        "reserved_future_total": float(future),
+    }
+
+
+def compute_summary(user, params, category_names: dict[int, str] | None = None) -> dict:
+    """Сводка за период по материализованным агрегатам (один запрос)."""
+    return summarize(fetch_summary_rows(user, params, category_names), category_names)
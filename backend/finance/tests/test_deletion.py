@@ -0,0 +1,63 @@
+"""Удаление пользователя любым путём не оставляет данных finance; категорию с операциями не удалить."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models import RestrictedError
+from django.test import TestCase
+
+from finance.deletion import delete_user
+from finance.models import Category, DailyRollup, Job, Transaction
+from finance.models_settings_goals import Goal, GoalDeposit, UserSettings
+
+
+USER_MODELS = (Transaction, Category, DailyRollup, Goal, GoalDeposit, Job, UserSettings)
+
+
+class UserDeletionTests(TestCase):
+    def make_user(self, username: str) -> User:
+        user = User.objects.create(username=username)
+        category = Category.objects.filter(user=user, type="income").first()
+        Transaction.objects.create(
+            user=user,
+            category=category,
+            amount=Decimal("900.00"),
+            date=date(2025, 1, 5),
+            is_income=True,
+            is_reserved=True,
+            reserve_months=3,
+        )
+        goal = Goal.objects.create(user=user, name="Отпуск", target_amount=10, due_date=date(2027, 1, 1))
+        GoalDeposit.objects.create(goal=goal, user=user, amount=1, balance_after=1)
+        Job.objects.create(kind="rebuild_rollups", user=user, status="done")
+        return user
+
+    def assert_no_data(self, user_id: int) -> None:
+        for model in USER_MODELS:
+            self.assertFalse(model.objects.filter(user_id=user_id).exists(), model.__name__)
+        self.assertFalse(User.objects.filter(id=user_id).exists())
+
+    def test_user_delete(self):
+        user = self.make_user("del-instance")
+        self.assertEqual(Transaction.objects.filter(user=user).count(), 3)
+        user.delete()
+        self.assert_no_data(user.id)
+
+    def test_queryset_delete(self):
+        user = self.make_user("del-queryset")
+        User.objects.filter(id=user.id).delete()
+        self.assert_no_data(user.id)
+
+    def test_delete_user(self):
+        user = self.make_user("del-engine")
+        delete_user(user)
+        self.assert_no_data(user.id)
+
+    def test_category_with_transactions_is_restricted(self):
+        user = self.make_user("del-category")
+        category = Transaction.objects.filter(user=user).first().category
+        with self.assertRaises(RestrictedError):
+            category.delete()
@@ -0,0 +1,67 @@
+"""Параллельные пополнения цели: ни одно не теряется, итог цели сходится с журналом."""
+
+from __future__ import annotations
+
+import random
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+
+from finance.goals import deposit_to_goal
+from finance.management.commands.stress_goal_deposits import check_ledger
+from finance.models_settings_goals import Goal, GoalDeposit
+
+
+class ParallelDepositTests(TransactionTestCase):
+    threads = 8
+    deposits_per_thread = 25
+
+    def setUp(self):
+        self.user = User.objects.create(username="deposits")
+        self.initial = Decimal("100.00")
+        self.goal = Goal.objects.create(
+            user=self.user,
+            name="Отпуск",
+            target_amount=Decimal("9999999999.99"),
+            saved_amount=self.initial,
+            due_date=date.today() + timedelta(days=365),
+        )
+
+    def test_parallel_deposits_are_not_lost(self):
+        succeeded: list[Decimal] = []
+        errors: list[BaseException] = []
+        lock = threading.Lock()
+        start = threading.Barrier(self.threads)
+
+        def worker(i: int) -> None:
+            rnd = random.Random(i)
+            try:
+                start.wait()
+                for _ in range(self.deposits_per_thread):
+                    amount = Decimal(rnd.randint(1, 100000)) / 100
+                    self.assertIsNotNone(deposit_to_goal(self.user, self.goal.id, amount))
+                    with lock:
+                        succeeded.append(amount)
+            except BaseException as e:  # noqa: BLE001 — ошибка потока проверяется ниже
+                with lock:
+                    errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(self.threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(succeeded), self.threads * self.deposits_per_thread)
+        self.goal.refresh_from_db()
+        # Суммируем в Python: SUM() на SQLite считает DECIMAL как REAL и теряет копейки
+        ledger_total = sum(GoalDeposit.objects.filter(goal=self.goal).values_list("amount", flat=True), Decimal(0))
+        self.assertEqual(self.goal.saved_amount, self.initial + ledger_total)
+        self.assertEqual(check_ledger(self.goal, self.initial, succeeded), [])
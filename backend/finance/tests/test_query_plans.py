@@ -0,0 +1,47 @@
+"""
+Регрессия планов: горячие запросы finance не должны падать в полное сканирование таблицы.
+
+База засевается seed_demo на десять пользователей, чтобы фильтр по user_id был
+избирательным, как в рабочей базе (после ANALYZE планировщик SQLite иначе
+предпочитает сканирование); набор запросов — тот же, что проверяет команда check_query_plans.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from finance.models import Transaction
+from finance.query_plans import full_scans, hot_plans
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["plans", *(f"plans-other{i}" for i in range(9))]:
+            User.objects.create(username=name)
+            call_command("seed_demo", username=name, months=6, tx_per_month=40, bulk=True, stdout=StringIO())
+        cls.user = User.objects.get(username="plans")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assert_no_full_scans(self, month: str, start_day: int) -> None:
+        for name, plan in hot_plans(self.user, month, start_day).items():
+            with self.subTest(query=name, month=month, start_day=start_day):
+                self.assertEqual(full_scans(plan), [], f"{name}:\n{plan}")
+
+    def test_current_month(self):
+        self.assert_no_full_scans(date.today().strftime("%Y-%m"), 1)
+
+    def test_custom_start_day(self):
+        self.assert_no_full_scans(date.today().strftime("%Y-%m"), 10)
+
+    def test_detects_full_scan(self):
+        # Без фильтра по индексированным столбцам план обязан содержать сканирование
+        plan = Transaction.objects.filter(comment="x").explain()
+        self.assertNotEqual(full_scans(plan), [], plan)
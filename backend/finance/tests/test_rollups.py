@@ -0,0 +1,41 @@
+"""Агрегаты и кэш отчётов обновляются, даже если дата операции передана строкой."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.test import TestCase
+
+from finance.cache import generations
+from finance.models import Category, DailyRollup, Transaction
+
+
+class StringDateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="rollup-str")
+        self.category = Category.objects.filter(user=self.user, type="expense").first()
+
+    def day_total(self, day: date) -> Decimal | None:
+        rollups = DailyRollup.objects.filter(user=self.user, date=day)
+        return rollups.aggregate(total=Sum("amount"))["total"]
+
+    def test_create_and_move_with_string_dates(self):
+        october = (date(2026, 10, 1), date(2026, 11, 1))
+        before = generations(self.user.id, *october)
+
+        # Токены поколений меняются в on_commit
+        with self.captureOnCommitCallbacks(execute=True):
+            tx = Transaction.objects.create(
+                user=self.user, category=self.category, amount=Decimal("150.00"),
+                date="2026-10-01", is_income=False,
+            )
+        self.assertEqual(self.day_total(date(2026, 10, 1)), Decimal("150.00"))
+        self.assertNotEqual(generations(self.user.id, *october), before)
+
+        tx.date = "2026-11-02"
+        tx.save()
+        self.assertFalse(DailyRollup.objects.filter(user=self.user, date=date(2026, 10, 1)).exists())
+        self.assertEqual(self.day_total(date(2026, 11, 2)), Decimal("150.00"))
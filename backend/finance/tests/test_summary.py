@@ -0,0 +1,97 @@
+"""
+Сводка finance.summary против эталона — исходного расчёта SummaryView по сырым операциям
+на Decimal (reference_summary из bench_summary): календарные месяцы и периоды со
+start_day, доли резервов в следующих периодах, одноимённые категории.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finance.management.commands.bench_summary import diff, reference_summary
+from finance.models import Category, Transaction
+from finance.summary import compute_summary
+
+
+FIRST_DAY = date(2024, 10, 1)
+LAST_DAY = date(2025, 4, 30)
+# Доли резервов доходят до октября 2025
+MONTHS = [f"{2024 + (9 + i) // 12:04d}-{(9 + i) % 12 + 1:02d}" for i in range(13)]
+
+
+class SummaryParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = user = User.objects.create(username="summary-parity")
+        income = [
+            Category.objects.create(user=user, name="Зарплата", type="income"),
+            Category.objects.create(user=user, name="Прочее", type="income"),
+        ]
+        expense = [
+            Category.objects.create(user=user, name="Прочее", type="expense"),
+            Category.objects.create(user=user, name="Кафе", type="expense"),
+            Category.objects.create(user=user, name="Кафе", type="expense"),
+            Category.objects.create(user=user, name="Продукты", type="expense"),
+        ]
+        rnd = random.Random(18)
+        span = (LAST_DAY - FIRST_DAY).days + 1
+        for _ in range(300):
+            is_income = rnd.random() < 0.2
+            Transaction.objects.create(
+                user=user,
+                category=rnd.choice(income if is_income else expense),
+                amount=Decimal(rnd.randint(1, 5000000)) / 100,
+                date=FIRST_DAY + timedelta(days=rnd.randrange(span)),
+                is_income=is_income,
+            )
+        # Резервы: доли с остатком копеек, даты у границ периодов и в конце месяца
+        for amount, day, months in (
+            ("1000.00", date(2025, 1, 31), 3),
+            ("12345.67", date(2024, 11, 9), 7),
+            ("500.01", date(2025, 2, 10), 2),
+            ("777.77", date(2025, 3, 15), 1),
+            ("100.00", date(2024, 12, 31), 12),
+        ):
+            Transaction.objects.create(
+                user=user,
+                category=income[1],
+                amount=Decimal(amount),
+                date=day,
+                is_income=True,
+                is_reserved=True,
+                reserve_months=months,
+            )
+
+    def periods(self) -> list[dict]:
+        params = [{}]
+        for month in MONTHS:
+            params += [{"month": month}, {"month": month, "start_day": "10"}, {"month": month, "start_day": "31"}]
+        return params
+
+    def test_reserve_children_span_periods(self):
+        children = Transaction.objects.filter(user=self.user, reserve_parent__isnull=False)
+        self.assertEqual(children.count(), 2 + 6 + 1 + 11)
+        self.assertGreater(children.latest("date").date, date(2025, 9, 30))
+
+    def test_matches_reference(self):
+        names = dict(Category.objects.filter(user=self.user).values_list("id", "name"))
+        for params in self.periods():
+            expected = reference_summary(self.user, params)
+            for category_names in (None, names):
+                with self.subTest(params=params, by_id=category_names is not None):
+                    self.assertEqual(diff(expected, compute_summary(self.user, params, category_names)), [])
+
+    def test_api_matches_reference(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for params in ({}, {"month": "2025-01"}, {"month": "2025-02", "start_day": "10"}):
+            with self.subTest(params=params):
+                response = client.get("/api/summary/", params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(diff(reference_summary(self.user, params), response.json()), [])
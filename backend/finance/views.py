@@ -1,34 +1,81 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import date
+import os
+import shutil
+import tempfile
 
-from django.db.models import Q, Sum
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from django.db import transaction as db_transaction
-from django.db.models import F
 from rest_framework import status
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 
-from finance.models import Category, Transaction
+from config.metrics import serialization_timer
+from finance import cache as summary_cache
+from finance.analytics import AnalyticsError, range_analytics
+from finance.bulk import apply_bulk_operations
+from finance.dashboard import SECTIONS as DASHBOARD_SECTIONS, build_dashboard
+from finance.conditional import ConditionalGetMixin
+from finance.fast_serializers import FastJSONRenderer, goals_data, transaction_page
+from finance.forecast import ForecastError, cached_forecast
+from finance.goals import deposit_to_goal
+from finance.exporter import export_rows, iter_csv, iter_gzip, iter_jsonl
+from finance import jobs
+from finance.importer import import_transactions, iter_csv_rows, iter_jsonl_rows
+from finance.limits import current_period, limit_status
+from finance.models import Category, Job, Transaction
 from finance.models_settings_goals import Goal, UserSettings
+from finance.pagination import GoalDepositPagination, TransactionCursorPagination
+from finance.periods import filter_by_period, month_to_range, period_to_range, resolve_period  # noqa: F401
+from finance.summary import compute_summary
 from finance.serializers import (
     CategorySerializer,
     TransactionSerializer,
     GoalSerializer,
+    GoalDepositSerializer,
+    JobSerializer,
     UserSettingsSerializer,
 )
 
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.exceptions import ValidationError
+from datetime import date
 from decimal import Decimal, InvalidOperation
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def transaction_projection(params) -> list[str] | None:
+    """Поля из ?fields=...; None — все поля."""
+    raw = params.get("fields")
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = set(fields) - set(TransactionSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({"fields": f"Неизвестные поля: {', '.join(sorted(unknown))}."})
+    return fields
+
+
+def transaction_list_queryset(user, params, fields: list[str] | None = None):
+    qs = (
+        Transaction.objects.filter(user=user)
+        .select_related("category")
+        .order_by("-date", "-created_at", "-id")
+    )
+    if fields is not None:
+        # Не читаем из БД колонки, которые не попадут в ответ (ключ пагинации нужен всегда)
+        qs = qs.select_related(None).only(*(set(fields) | {"id", "date", "created_at"}))
+    return filter_by_period(qs, params)
+
+
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
 
@@ -39,180 +86,252 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TransactionCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get_projection(self) -> list[str] | None:
+        """Поля из ?fields=... (только для списка); None — все поля."""
+        if self.action != "list":
+            return None
+        return transaction_projection(self.request.query_params)
 
     def get_queryset(self):
-        qs = (
-            Transaction.objects.filter(user=self.request.user)
-            .select_related("category")
-            .order_by("-date", "-created_at")
-        )
-        month = self.request.query_params.get("month")
-        if month:
-            start_day = self.request.query_params.get("start_day")
-            if start_day:
-                r = period_to_range(month, int(start_day))
-            else:
-                r = month_to_range(month)
-            qs = qs.filter(date__gte=r.start, date__lt=r.end)
-        return qs
+        return transaction_list_queryset(self.request.user, self.request.query_params, self.get_projection())
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_projection()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Страница собирается из values_list, без TransactionSerializer (finance.fast_serializers)
+        with serialization_timer():
+            data = transaction_page(self.paginator, self.get_queryset(), request, self.get_projection())
+        return self.get_paginated_response(data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    # Максимум операций в одном запросе к /transactions/bulk/
+    bulk_max_operations = 1000
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Пакет create/update/delete операций: {"operations": [{"op": ..., "id": ..., "data": {...}}]}.
+        Применяется целиком в одной транзакции; в ответе — результат по каждому элементу.
+        """
+        operations = request.data.get("operations") if isinstance(request.data, dict) else request.data
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({"operations": "Ожидался непустой список операций."})
+        if len(operations) > self.bulk_max_operations:
+            raise ValidationError(
+                {"operations": f"Не больше {self.bulk_max_operations} операций за запрос."}
+            )
+
+        result = apply_bulk_operations(request.user, operations, request=request)
+        return Response(
+            {"results": result.results},
+            status=status.HTTP_200_OK if result.ok else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Импорт операций из файла (multipart, поле file): CSV или JSON Lines.
+        Формат определяется полем file_format (csv/jsonl) или расширением файла.
+        С background=1 файл сохраняется во временный каталог и импортируется фоновой
+        задачей: ответ 202 с задачей (прогресс — GET /api/jobs/<id>/).
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Приложите файл."})
+        file_format = (request.data.get("file_format") or "").lower()
+        if not file_format:
+            file_format = "jsonl" if upload.name.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+        if file_format not in ("csv", "jsonl"):
+            raise ValidationError({"file_format": "Поддерживаются форматы csv и jsonl."})
+
+        if request.data.get("background") in ("1", "true"):
+            upload_dir = settings.JOBS_UPLOAD_DIR or None
+            fd, path = tempfile.mkstemp(prefix="import-", dir=upload_dir)
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(upload.file, f)
+            job = jobs.enqueue("import_transactions", request.user, path=path, file_format=file_format)
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        rows = iter_csv_rows(upload.file) if file_format == "csv" else iter_jsonl_rows(upload.file)
+        result = import_transactions(request.user, rows)
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Потоковая выгрузка операций (фильтры month/start_day как у списка).
+        ?file_format=csv|jsonl (по умолчанию csv), ?gzip=1 — сжатие gzip.
+        """
+        file_format = (request.query_params.get("file_format") or "csv").lower()
+        if file_format not in ("csv", "jsonl"):
+            raise ValidationError({"file_format": "Поддерживаются форматы csv и jsonl."})
+
+        qs = filter_by_period(
+            Transaction.objects.filter(user=request.user).order_by("date", "created_at", "id"),
+            request.query_params,
+        )
+        rows = export_rows(qs)
+        chunks = iter_csv(rows) if file_format == "csv" else iter_jsonl(rows)
+        content_type = "text/csv" if file_format == "csv" else "application/x-ndjson"
+
+        use_gzip = request.query_params.get("gzip") in ("1", "true")
+        response = StreamingHttpResponse(
+            iter_gzip(chunks) if use_gzip else (c.encode("utf-8") for c in chunks),
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        month = request.query_params.get("month") or "all"
+        response["Content-Disposition"] = f'attachment; filename="transactions-{month}.{file_format}"'
+        return response
+
+
+def cached_summary(user, params, category_names: dict[int, str] | None = None) -> dict:
+    """compute_summary через кэш отчётов (finance.cache)."""
+    key = summary_cache.summary_key(user.id, params.get("month"), params.get("start_day"), resolve_period(params))
+    data = cache.get(key)
+    summary_cache.record("summary", hit=data is not None)
+    if data is None:
+        data = compute_summary(user, params, category_names)
+        cache.set(key, data, summary_cache.summary_timeout())
+    return data
+
+
+class SummaryView(ConditionalGetMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    # Нужен только id пользователя (config.authentication, JWT_STATELESS_READS)
+    stateless_auth = True
 
-@dataclass(frozen=True)
-class MonthRange:
-    start: date
-    end: date
+    def get(self, request):
+        return Response(cached_summary(request.user, request.query_params))
 
 
-def month_to_range(month: str) -> MonthRange:
+class DashboardView(ConditionalGetMixin, APIView):
     """
-    month: 'YYYY-MM'
+    Главный экран одним запросом: ?month=&start_day= (+ page_size/fields для операций),
+    ?sections=categories,transactions,summary,goals — подмножество секций.
+    Ответ: {секция: {"etag", "data"}}; секции с ETag из If-None-Match — {"etag", "not_modified"}.
+    Если не изменилось ничего (версия данных пользователя та же) — 304, как у остальных view.
     """
-    year_s, month_s = month.split("-", 1)
-    y = int(year_s)
-    m = int(month_s)
-    start = date(y, m, 1)
-    if m == 12:
-        end = date(y + 1, 1, 1)
-    else:
-        end = date(y, m + 1, 1)
-    # end exclusive -> convert to inclusive by subtracting one day at query time if needed,
-    # but we use < end with range filters elsewhere. Here return [start, end).
-    return MonthRange(start=start, end=end)
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    def get(self, request):
+        raw = request.query_params.get("sections")
+        sections = [s.strip() for s in raw.split(",") if s.strip()] if raw else list(DASHBOARD_SECTIONS)
+        unknown = set(sections) - set(DASHBOARD_SECTIONS)
+        if unknown:
+            raise ValidationError({"sections": f"Неизвестные секции: {', '.join(sorted(unknown))}."})
+        return Response(build_dashboard(request, sections))
 
 
-def clamp_day(year: int, month: int, day: int) -> int:
-    """Clamp start-day to existing day in month (e.g. 31 -> 30/28)."""
-    from calendar import monthrange
+class CacheStatsView(APIView):
+    """Счётчики попаданий/промахов кэша отчётов (для мониторинга)."""
 
-    last = monthrange(year, month)[1]
-    return max(1, min(last, day))
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(summary_cache.stats(["summary", "forecast"]))
 
 
-def period_to_range(month: str, start_day: int) -> MonthRange:
+class AnalyticsRangeView(ConditionalGetMixin, APIView):
     """
-    Budget period range for selected month with custom start_day.
-    Example: month=2025-12, start_day=10 -> [2025-12-10, 2026-01-10)
+    Тренд за диапазон: ?from=YYYY-MM&to=YYYY-MM&start_day=N&granularity=day|week|month
+    и &compare=previous_year для наложения того же диапазона год назад.
+    Один сгруппированный запрос на запрос (finance.analytics).
     """
-    year_s, month_s = month.split("-", 1)
-    y = int(year_s)
-    m = int(month_s)
-    sd = clamp_day(y, m, int(start_day))
-    start = date(y, m, sd)
-
-    if m == 12:
-        ny, nm = y + 1, 1
-    else:
-        ny, nm = y, m + 1
-    ed = clamp_day(ny, nm, int(start_day))
-    end = date(ny, nm, ed)
-    return MonthRange(start=start, end=end)
-
-
-class SummaryView(APIView):
+
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
 
     def get(self, request):
-        month = request.query_params.get("month")  # YYYY-MM
-        qs = Transaction.objects.filter(user=request.user)
-        start_day = request.query_params.get("start_day")
-
-        if month:
-            if start_day:
-                r = period_to_range(month, int(start_day))
-            else:
-                r = month_to_range(month)
-            qs = qs.filter(date__gte=r.start, date__lt=r.end)
-
-        # Доходы: обычные доходы считаем целиком, доходы-резервы учитываем только долей текущего месяца
-        reserved_roots = qs.filter(is_income=True, is_reserved=True, reserve_parent__isnull=True)
-        reserved_future_total = 0
-        reserved_available_total = 0
-        for tx in reserved_roots:
-            months = int(tx.reserve_months or 1)
-            if months <= 0:
-                months = 1
-            per = tx.amount / months
-            reserved_available_total += per
-            reserved_future_total += (tx.amount - per)
-
-        non_reserved_income_total = (
-            qs.filter(is_income=True)
-            .exclude(is_reserved=True, reserve_parent__isnull=True)
-            .aggregate(total=Sum("amount"))
-            .get("total")
-            or 0
-        )
-        income_total = non_reserved_income_total + reserved_available_total
-        expense_total = (
-            qs.filter(is_income=False).aggregate(total=Sum("amount")).get("total") or 0
-        )
-        balance = income_total - expense_total
+        try:
+            return Response(range_analytics(request.user, request.query_params))
+        except AnalyticsError as e:
+            raise ValidationError({e.field: e.message})
 
-        income_by_category_qs = (
-            qs.filter(is_income=True)
-            .values("category__name")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")
-        )
-        income_by_category = {
-            row["category__name"]: float(row["total"]) for row in income_by_category_qs
-        }
-
-        expenses_by_category_qs = (
-            qs.filter(is_income=False)
-            .values("category__name")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")
-        )
-        expenses_by_category = {
-            row["category__name"]: float(row["total"]) for row in expenses_by_category_qs
-        }
-
-        # Баланс по дням: поле `date` уже DateField, поэтому на SQLite безопаснее группировать
-        # напрямую по нему (без TruncDate, который может упираться в sqlite UDF).
-        daily_rows = (
-            qs.values("date")
-            .annotate(
-                income=Sum("amount", filter=Q(is_income=True)),
-                expense=Sum("amount", filter=Q(is_income=False)),
-            )
-            .order_by("date")
-        )
 
-        running = 0
-        daily_balance: dict[str, float] = {}
-        for row in daily_rows:
-            inc = row["income"] or 0
-            exp = row["expense"] or 0
-            running += inc - exp
-            daily_balance[row["date"].isoformat()] = float(running)
+class ForecastView(ConditionalGetMixin, APIView):
+    """
+    Прогноз доходов, расходов и баланса на будущие периоды:
+    ?months=N&history=M&method=trimmed|seasonal&start_day=N (finance.forecast).
+    Кэшируется до следующего изменения данных пользователя.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            return Response(cached_forecast(request.user, request.query_params))
+        except ForecastError as e:
+            raise ValidationError({e.field: e.message})
+
+
+class LimitStatusView(ConditionalGetMixin, APIView):
+    """
+    Расход по категориям относительно лимитов за период (?month=YYYY-MM&start_day=N).
+    Без month — текущий бюджетный период из настроек пользователя.
+    Считается одним сгруппированным запросом к DailyRollup.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
 
+    def get(self, request):
+        r = resolve_period(request.query_params)
+        if r is None:
+            settings_obj, _ = UserSettings.objects.get_or_create(user=request.user)
+            r = current_period(settings_obj.period_start_day, date.today())
+        items = limit_status(request.user, r)
         return Response(
             {
-                "balance": float(balance),
-                "income_total": float(income_total),
-                "expense_total": float(expense_total),
-                "income_by_category": income_by_category,
-                "expenses_by_category": expenses_by_category,
-                "daily_balance": daily_balance,
-                "reserved_future_total": float(reserved_future_total),
+                "start": r.start.isoformat(),
+                "end": r.end.isoformat(),
+                "items": [s.as_dict() for s in items],
             }
         )
 
 
-class GoalViewSet(viewsets.ModelViewSet):
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Статус и прогресс фоновых задач пользователя."""
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Клиент опрашивает статус до завершения — задача брошенного воркера не должна
+        # оставаться "running" навсегда
+        jobs.recover_stale()
+        return Job.objects.filter(user=self.request.user).order_by("-id")
+
+
+class GoalViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = GoalSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get_queryset(self):
         return Goal.objects.filter(user=self.request.user).order_by("due_date", "-created_at")
 
+    def list(self, request, *args, **kwargs):
+        with serialization_timer():
+            data = goals_data(self.get_queryset())
+        return Response(data)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -220,7 +339,8 @@ class GoalViewSet(viewsets.ModelViewSet):
     def deposit(self, request, pk=None):
         """
         Пополнить цель на сумму amount (дельта).
-        Делается атомарно, чтобы не потерять обновления при параллельных запросах.
+        Делается атомарно, чтобы не потерять обновления при параллельных запросах;
+        каждое пополнение записывается в журнал (GET .../deposits/).
         """
         raw = request.data.get("amount")
         if raw is None:
@@ -229,22 +349,29 @@ class GoalViewSet(viewsets.ModelViewSet):
             amount = Decimal(str(raw))
         except (InvalidOperation, ValueError):
             raise ValidationError({"amount": "Некорректная сумма."})
+        if not amount.is_finite():
+            raise ValidationError({"amount": "Некорректная сумма."})
         if amount <= 0:
             raise ValidationError({"amount": "Сумма должна быть больше 0."})
+        if amount.as_tuple().exponent < -2:
+            raise ValidationError({"amount": "Не больше двух знаков после запятой."})
 
-        with db_transaction.atomic():
-            updated = (
-                Goal.objects.filter(id=pk, user=request.user)
-                .update(saved_amount=F("saved_amount") + amount)
-            )
-            if updated != 1:
-                return Response({"detail": "Цель не найдена."}, status=status.HTTP_404_NOT_FOUND)
-
-        goal = Goal.objects.get(id=pk, user=request.user)
+        result = deposit_to_goal(request.user, int(pk), amount) if str(pk).isdigit() else None
+        if result is None:
+            return Response({"detail": "Цель не найдена."}, status=status.HTTP_404_NOT_FOUND)
+        goal, _ = result
         return Response(GoalSerializer(goal).data)
 
+    @action(detail=True, methods=["get"])
+    def deposits(self, request, pk=None):
+        """История пополнений цели (новые сверху, курсорная пагинация: ?cursor=, ?page_size=)."""
+        goal = self.get_object()
+        paginator = GoalDepositPagination()
+        page = paginator.paginate_queryset(goal.deposits.all(), request, view=self)
+        return paginator.get_paginated_response(GoalDepositSerializer(page, many=True).data)
 
-class SettingsView(APIView):
+
+class SettingsView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -290,13 +417,14 @@ class RegisterView(APIView):
 
         validate_password(password)
 
-        user = User.objects.create_user(
-            username=email,
-            email=email,
-            password=password,
-            first_name=name,
-        )
-        # UserSettings и дефолтные категории создадутся сигналом post_save(User).
+        # UserSettings и дефолтные категории создаются сигналом post_save(User) в той же транзакции
+        with db_transaction.atomic():
+            user = User.objects.create_user(
+                username=email,
+                email=email,
+                password=password,
+                first_name=name,
+            )
         return Response({"id": user.id, "email": user.email, "name": user.first_name})
 
 
@@ -313,31 +441,29 @@ class ForgotPasswordView(APIView):
 
 
 class ResetTransactionsView(APIView):
-    """Удаляет все операции текущего пользователя."""
+    """
+    Удаляет все операции текущего пользователя (или за период ?month=&start_day=).
+    Удаление выполняется фоновой задачей порциями; ответ 202 с задачей, результат
+    ({"deleted_transactions", "month"}) — в GET /api/jobs/<id>/.
+    """
 
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        month = request.query_params.get("month")  # optional YYYY-MM
-        start_day = request.query_params.get("start_day")
-
-        qs = Transaction.objects.filter(user=request.user)
-        if month:
-            if start_day:
-                r = period_to_range(month, int(start_day))
-            else:
-                r = month_to_range(month)
-            qs = qs.filter(date__gte=r.start, date__lt=r.end)
-
-        with db_transaction.atomic():
-            tx_deleted, _ = qs.delete()
-        return Response({"deleted_transactions": tx_deleted, "month": month})
+        params = request.query_params
+        job = jobs.enqueue(
+            "reset_transactions",
+            request.user,
+            month=params.get("month"),  # optional YYYY-MM
+            start_day=params.get("start_day"),
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 class ResetCategoriesView(APIView):
     """
     Удаляет все категории текущего пользователя.
-    Если есть операции, удаление категорий будет запрещено из-за PROTECT.
+    Если есть операции, удаление категорий будет запрещено из-за RESTRICT.
     """
 
     permission_classes = [IsAuthenticated]
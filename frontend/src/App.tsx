@@ -1,7 +1,7 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import Nav from "react-bootstrap/Nav";
 import ProgressBar from "react-bootstrap/ProgressBar";
-import { api } from "./api";
+import { api, fetchDashboard, fetchPage, Job, JobError, Page, sectionData, waitForJob } from "./api";
 import type { Category as CategoryT } from "./CategoryManager";
 import { Dashboard, Summary as DashboardSummary } from "./Dashboard";
 import { formatDateRu, formatMonthRu } from "./format";
@@ -58,6 +58,11 @@ export const App: React.FC = () => {
   // Operations page data
   const [opsMonth, setOpsMonth] = useState<string>(monthString(new Date()));
   const [opsTransactions, setOpsTransactions] = useState<Transaction[]>([]);
+  // Ссылка на следующую страницу операций (null — загружено всё)
+  const [opsNext, setOpsNext] = useState<string | null>(null);
+  const [opsLoadingMore, setOpsLoadingMore] = useState(false);
+  // Месяц последнего запроса списка: ответы по прежнему месяцу отбрасываются
+  const opsRequestMonth = useRef(opsMonth);
 
   const [loadError, setLoadError] = useState<string | null>(null);
 
@@ -90,18 +95,35 @@ export const App: React.FC = () => {
     setCategories(res.data);
   };
 
+  // ETag ответа /dashboard/ и его секций, уже загруженных на главный экран
+  const homeVersion = useRef<string | null>(null);
+  const homeEtags = useRef<Record<string, string>>({});
+
   const loadHome = async () => {
     try {
       setLoadError(null);
       const m = monthString(new Date());
-      const [catRes, txRes, sumRes] = await Promise.all([
-        api.get<CategoryT[]>("/categories/"),
-        api.get<Transaction[]>(`/transactions/?month=${encodeURIComponent(m)}${startDayQuery()}`),
-        api.get<Summary>(`/summary/?month=${encodeURIComponent(m)}${startDayQuery()}`)
-      ]);
-      setCategories(catRes.data);
-      setHomeTransactions(txRes.data);
-      setHomeSummary(sumRes.data);
+      const query = `month=${encodeURIComponent(m)}${startDayQuery()}`;
+      const known = Object.values(homeEtags.current);
+      if (homeVersion.current) known.unshift(homeVersion.current);
+      const { sections, etag, notModified } = await fetchDashboard<{
+        categories: CategoryT[];
+        transactions: Page<Transaction>;
+        summary: Summary;
+      }>(`${query}&sections=categories,transactions,summary&page_size=5`, known);
+      if (notModified) return;
+
+      const cats = sectionData(sections.categories);
+      if (cats) setCategories(cats);
+      const summary = sectionData(sections.summary);
+      if (summary) setHomeSummary(summary);
+      // На главном экране — только последние операции, полный список во вкладке "Операции"
+      const page = sectionData(sections.transactions);
+      if (page) setHomeTransactions(page.results);
+      homeEtags.current = Object.fromEntries(
+        Object.entries(sections).map(([name, section]) => [name, section!.etag])
+      );
+      homeVersion.current = etag;
     } catch (e) {
       console.error(e);
       setLoadError("Не удалось загрузить данные главного экрана.");
@@ -111,13 +133,37 @@ export const App: React.FC = () => {
   const loadOperations = async (m: string = opsMonth) => {
     try {
       setLoadError(null);
-      const res = await api.get<Transaction[]>(
+      opsRequestMonth.current = m;
+      const page = await fetchPage<Transaction>(
         `/transactions/?month=${encodeURIComponent(m)}${startDayQuery()}`
       );
-      setOpsTransactions(res.data);
+      if (opsRequestMonth.current !== m) return;
+      setOpsTransactions(page.results);
+      setOpsNext(page.next);
+    } catch (e) {
+      console.error(e);
+      setLoadError("Не удалось загрузить операции.");
+    }
+  };
+
+  const loadMoreOperations = async () => {
+    if (!opsNext || opsLoadingMore) return;
+    const m = opsRequestMonth.current;
+    setOpsLoadingMore(true);
+    try {
+      const page = await fetchPage<Transaction>(opsNext);
+      if (opsRequestMonth.current !== m) return;
+      // Операция могла сместиться между страницами после правки — не дублируем её
+      setOpsTransactions((prev) => {
+        const seen = new Set(prev.map((t) => t.id));
+        return [...prev, ...page.results.filter((t) => !seen.has(t.id))];
+      });
+      setOpsNext(page.next);
     } catch (e) {
       console.error(e);
       setLoadError("Не удалось загрузить операции.");
+    } finally {
+      setOpsLoadingMore(false);
     }
   };
 
@@ -143,9 +189,18 @@ export const App: React.FC = () => {
     const url = month
       ? `/reset/transactions/?month=${encodeURIComponent(month)}${startDayQuery()}`
       : "/reset/transactions/";
-    await api.post(url);
+    try {
+      setLoadError(null);
+      const res = await api.post<Job>(url);
+      await waitForJob(res.data);
+    } catch (e) {
+      console.error(e);
+      setLoadError(e instanceof JobError ? e.message : "Не удалось удалить операции.");
+      return;
+    }
     // Мгновенно очищаем UI, чтобы не ждать ручной перезагрузки/повторного запроса
     setOpsTransactions([]);
+    setOpsNext(null);
     const currentMonth = monthString(new Date());
     if (!month || month === currentMonth) setHomeTransactions([]);
     await loadHome();
@@ -361,8 +416,9 @@ export const App: React.FC = () => {
 
           {limitAlertsVisible && (
             <LimitAlerts
-              categories={categories}
-              transactions={homeTransactions}
+              month={monthString(new Date())}
+              startDay={localStorage.getItem("period_start_day")}
+              refreshKey={homeSummary}
               onClose={() => setLimitAlertsVisible(false)}
             />
           )}
@@ -459,6 +515,9 @@ export const App: React.FC = () => {
           onMonthChange={setOpsMonth}
           categories={categories}
           transactions={opsTransactions}
+          hasMore={opsNext !== null}
+          loadingMore={opsLoadingMore}
+          onLoadMore={loadMoreOperations}
           onEdit={(t) => {
             setTxModalMode("edit");
             setTxModalType(t.is_income ? "income" : "expense");
@@ -1,18 +1,21 @@
-import React, { useMemo } from "react";
+import React, { useEffect, useState } from "react";
+import { api } from "./api";
 
-export interface Category {
-  id: number;
+export interface LimitStatusItem {
+  category_id: number;
   name: string;
-  type: "income" | "expense";
   limit: number | null;
+  spent: number;
+  ratio: number | null;
+  projected: number;
+  projected_ratio: number | null;
+  status: "ok" | "warning" | "exceeded" | "no_limit";
 }
 
-export interface Transaction {
-  id: number;
-  category: number;
-  amount: number | string;
-  date: string;
-  is_income: boolean;
+interface LimitStatusResponse {
+  start: string;
+  end: string;
+  items: LimitStatusItem[];
 }
 
 const money = (v: number) =>
@@ -23,32 +26,25 @@ const money = (v: number) =>
   }).format(v);
 
 export const LimitAlerts: React.FC<{
-  categories: Category[];
-  transactions: Transaction[];
+  month: string;
+  startDay?: string | null;
+  refreshKey: unknown;
   onClose: () => void;
-}> = ({ categories, transactions, onClose }) => {
-  const alerts = useMemo(() => {
-    const expenseCats = categories.filter((c) => c.type === "expense" && c.limit != null);
-    const byCat = new Map<number, number>();
-    for (const t of transactions) {
-      if (t.is_income) continue;
-      const amt = typeof t.amount === "number" ? t.amount : Number(t.amount);
-      if (!Number.isFinite(amt)) continue;
-      byCat.set(t.category, (byCat.get(t.category) ?? 0) + amt);
-    }
+}> = ({ month, startDay, refreshKey, onClose }) => {
+  const [items, setItems] = useState<LimitStatusItem[]>([]);
 
-    const items = expenseCats
-      .map((c) => {
-        const spent = byCat.get(c.id) ?? 0;
-        const limit = c.limit ?? 0;
-        const ratio = limit > 0 ? spent / limit : 0;
-        return { c, spent, limit, ratio };
-      })
-      .filter((x) => x.limit > 0 && x.spent > 0 && x.ratio >= 0.8)
-      .sort((a, b) => b.ratio - a.ratio);
+  useEffect(() => {
+    const q = startDay ? `&start_day=${encodeURIComponent(startDay)}` : "";
+    api
+      .get<LimitStatusResponse>(`/limits/status/?month=${encodeURIComponent(month)}${q}`)
+      .then((res) => setItems(res.data.items))
+      .catch((e) => console.error(e));
+  }, [month, startDay, refreshKey]);
 
-    return items;
-  }, [categories, transactions]);
+  // Сервер уже отсортировал по доле лимита
+  const alerts = items
+    .filter((x) => x.spent > 0 && (x.status === "warning" || x.status === "exceeded"))
+    .map((x) => ({ c: { id: x.category_id, name: x.name }, spent: x.spent, limit: x.limit ?? 0, ratio: x.ratio ?? 0 }));
 
   if (alerts.length === 0) return null;
 
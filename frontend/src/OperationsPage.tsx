@@ -1,4 +1,4 @@
-import React, { useMemo } from "react";
+import React, { useEffect, useMemo, useRef } from "react";
 import { Form } from "react-bootstrap";
 import { formatDateRu, formatMonthRu } from "./format";
 
@@ -30,10 +30,25 @@ export const OperationsPage: React.FC<{
   onMonthChange: (m: string) => void;
   categories: Category[];
   transactions: Transaction[];
+  // Есть ли ещё страницы: список подгружается при прокрутке до конца или по кнопке
+  hasMore: boolean;
+  loadingMore: boolean;
+  onLoadMore: () => void;
   onEdit: (t: Transaction) => void;
   onDelete: (id: number) => void;
   onResetAll: (month: string) => void;
-}> = ({ month, onMonthChange, categories, transactions, onEdit, onDelete, onResetAll }) => {
+}> = ({
+  month,
+  onMonthChange,
+  categories,
+  transactions,
+  hasMore,
+  loadingMore,
+  onLoadMore,
+  onEdit,
+  onDelete,
+  onResetAll
+}) => {
   const catMap = useMemo(() => {
     const m = new Map<number, Category>();
     for (const c of categories) m.set(c.id, c);
@@ -58,6 +73,21 @@ export const OperationsPage: React.FC<{
     return opts;
   }, []);
 
+  // Отметка в конце списка: когда она видна, запрашиваем следующую страницу
+  const sentinel = useRef<HTMLDivElement | null>(null);
+  const loadMore = useRef(onLoadMore);
+  loadMore.current = onLoadMore;
+
+  useEffect(() => {
+    const el = sentinel.current;
+    if (!el || !hasMore || loadingMore || typeof IntersectionObserver === "undefined") return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some((e) => e.isIntersecting)) loadMore.current();
+    });
+    observer.observe(el);
+    return () => observer.disconnect();
+  }, [hasMore, loadingMore, transactions.length]);
+
   const minMonth = monthOptions[monthOptions.length - 1]?.value;
   const maxMonth = monthOptions[0]?.value;
   const canPrev = Boolean(minMonth) && month !== minMonth;
@@ -124,7 +154,8 @@ export const OperationsPage: React.FC<{
         <div className="card-header bg-white border-0 fw-semibold">
           Список операций
           <span className="text-muted ms-2" style={{ fontSize: "0.9rem" }}>
-            ({transactions.length})
+            ({transactions.length}
+            {hasMore ? "+" : ""})
           </span>
         </div>
         <ul className="list-group list-group-flush">
@@ -187,6 +218,18 @@ export const OperationsPage: React.FC<{
             </li>
           )}
         </ul>
+        {hasMore && (
+          <div ref={sentinel} className="card-body text-center">
+            <button
+              type="button"
+              className="btn btn-outline-secondary btn-sm"
+              onClick={onLoadMore}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Загрузка…" : "Показать ещё"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -25,6 +25,92 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+export interface Page<T> {
+  next: string | null;
+  results: T[];
+}
+
+// next — абсолютный URL бэкенда; запрашиваем его относительно baseURL (/api)
+function toApiPath(link: string): string {
+  const u = new URL(link, window.location.origin);
+  return u.pathname.replace(/^\/api/, "") + u.search;
+}
+
+// Список операций отдаётся keyset-страницами: url — первая страница или ссылка next
+// предыдущей; следующие страницы подгружаются по требованию (прокрутка, "Показать ещё")
+export async function fetchPage<T>(url: string): Promise<Page<T>> {
+  const res = await api.get<Page<T>>(/^https?:/.test(url) ? toApiPath(url) : url);
+  return res.data;
+}
+
+export type DashboardSection<T> = { etag: string; data: T } | { etag: string; not_modified: true };
+
+export interface Dashboard<T extends Record<string, unknown>> {
+  // Секции, ETag которых был передан в If-None-Match, приходят без data
+  sections: { [K in keyof T]?: DashboardSection<T[K]> };
+  // ETag ответа целиком (версия данных пользователя); при 304 — прежний
+  etag: string | null;
+  notModified: boolean;
+}
+
+// Главный экран одним запросом (/dashboard/): known — ETag ответа и секций, уже имеющихся у клиента.
+// Совпал ETag ответа — сервер отвечает 304, не собирая секции.
+export async function fetchDashboard<T extends Record<string, unknown>>(
+  query: string,
+  known: string[]
+): Promise<Dashboard<T>> {
+  const res = await api.get(`/dashboard/?${query}`, {
+    headers: known.length ? { "If-None-Match": known.join(", ") } : {},
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+  });
+  const etag: string | null = res.headers["etag"] ?? null;
+  if (res.status === 304) return { sections: {}, etag, notModified: true };
+  return { sections: res.data, etag, notModified: false };
+}
+
+export function sectionData<T>(section: DashboardSection<T> | undefined): T | undefined {
+  return section && "data" in section ? section.data : undefined;
+}
+
+export interface Job<R = unknown> {
+  id: number;
+  kind: string;
+  status: "queued" | "running" | "done" | "failed";
+  progress_done: number;
+  progress_total: number | null;
+  percent: number | null;
+  result: R | null;
+  error: string;
+}
+
+// Ошибка фоновой задачи (failed или не дождались) — текст можно показывать пользователю
+export class JobError extends Error {}
+
+// Тяжёлые операции (очистка, фоновый импорт) выполняются задачами: опрашиваем статус до завершения,
+// но не дольше maxWaitMs — зависшая задача должна стать ошибкой, а не бесконечным ожиданием
+export async function waitForJob<R = unknown>(
+  job: Job<R>,
+  onProgress?: (job: Job<R>) => void,
+  intervalMs = 500,
+  maxWaitMs = 15 * 60 * 1000
+): Promise<Job<R>> {
+  let current = job;
+  const deadline = Date.now() + maxWaitMs;
+  while (current.status === "queued" || current.status === "running") {
+    if (Date.now() >= deadline) {
+      throw new JobError("Фоновая задача не завершилась вовремя. Проверьте результат позже.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    const res = await api.get<Job<R>>(`/jobs/${current.id}/`);
+    current = res.data;
+    onProgress?.(current);
+  }
+  if (current.status === "failed") {
+    throw new JobError(current.error || "Фоновая задача завершилась с ошибкой.");
+  }
+  return current;
+}
+
 let isRefreshing = false;
 let refreshWaiters: Array<(token: string | null) => void> = [];
 